@@ -0,0 +1,93 @@
+"""Benchmark of the scene build, layout and repaint of the workflow editor.
+
+Measures Application.generateAll, Application.reGenerateAll, BlockVisual.updateChildrenPosition,
+GraphView.redrawDataLinks, rendering of the whole scene into a QImage and repaint of its window-sized part on
+synthetic workflows of given sizes.
+It runs on the Qt offscreen platform, so that no display is needed.
+
+    python benchmark_editor.py --sizes 10 100 1000 --save before.json
+    python benchmark_editor.py --sizes 10 100 1000 --compare before.json
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+import workfloweditor
+from workfloweditor import synthetic
+
+
+def measure(function, repeat, setup=None):
+    """Return the minimal time of given function in seconds, the setup is run before each call."""
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def renderScene(scene, size=1024, source=None):
+    """Render the whole scene or its given part scaled into a QImage."""
+    image = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(QtCore.Qt.white)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, size, size), source or scene.itemsBoundingRect())
+    painter.end()
+    return image
+
+
+def runBenchmarks(application, number_of_blocks, repeat):
+    application.setRealWorkflow(synthetic.generateWorkflow(width=number_of_blocks))
+    application.reGenerateAll()
+    widget = application.getWindow().widget
+    return {
+        'generateAll': measure(application.generateAll, repeat, application.clearAll),
+        'reGenerateAll': measure(application.reGenerateAll, repeat),
+        'updateChildrenPosition': measure(application.getWorkflowBlock().updateChildrenPosition, repeat),
+        'redrawDataLinks': measure(widget.view.redrawDataLinks, repeat),
+        'render': measure(lambda: renderScene(widget.scene), repeat),
+        # repaint of a window-sized part of the scene in the original scale
+        'repaint': measure(lambda: renderScene(widget.scene, 1024, QtCore.QRectF(0, 0, 1024, 1024)), repeat),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000], help="numbers of blocks")
+    parser.add_argument('--repeat', type=int, default=3, help="repetitions of each measurement")
+    parser.add_argument('--save', help="save the results into given JSON file")
+    parser.add_argument('--compare', help="compare the results with given JSON file")
+    args = parser.parse_args()
+
+    application = workfloweditor.Application.Application()
+    application.generateAll()
+    results = {}
+    for size in args.sizes:
+        # the editor prints the whole workflow structure on each regeneration
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[str(size)] = runBenchmarks(application, size, args.repeat)
+
+    reference = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            reference = json.load(f)['results']
+
+    print("%8s %24s %12s %12s" % ('blocks', 'benchmark', 'time [s]', 'ratio'))
+    for size, times in results.items():
+        for name, value in times.items():
+            ref = reference.get(size, {}).get(name)
+            print("%8s %24s %12.4f %12s" % (size, name, value, "%.2f" % (value / ref) if ref else '-'))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'qt_version': QtCore.QT_VERSION_STR, 'python_version': sys.version.split()[0],
+                       'results': results}, f, indent=2)
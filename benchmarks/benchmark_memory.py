@@ -0,0 +1,56 @@
+"""Memory benchmark of the scene items of the workflow editor.
+
+Measures the Python memory allocated by Application.generateAll for synthetic workflows with tracemalloc and the size
+of the instance dictionaries of DataSlots and DataLinks. The memory allocated by Qt in C++ is not traced.
+
+    python benchmark_memory.py --width 5000 --slots 5
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import io
+import sys
+import argparse
+import tracemalloc
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import workfloweditor
+from workfloweditor import synthetic
+
+
+def getDictSize(items):
+    """Return mean size of the instance dictionaries of given items in bytes."""
+    if not items:
+        return 0.
+    return sum(sys.getsizeof(item.__dict__) for item in items) / len(items)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=5000, help="number of model blocks")
+    parser.add_argument('--slots', type=int, default=5, help="number of inputs and outputs of each model")
+    parser.add_argument('--density', type=float, default=0.5, help="probability of connection of each input")
+    args = parser.parse_args()
+
+    application = workfloweditor.Application.Application(
+        synthetic.generateWorkflow(width=args.width, slots_per_block=args.slots, link_density=args.density))
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    with contextlib.redirect_stdout(io.StringIO()):
+        application.generateAll()
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    workflow_block = application.getWorkflowBlock()
+    slots = workflow_block.getAllDataSlots(True)
+    links = application.getWindow().widget.view.getDataLinks()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    print("%d data slots, %d data links" % (len(slots), len(links)))
+    print("allocated by generateAll: %.1f MB (peak %.1f MB)" % (allocated / 1e6, peak / 1e6))
+    print("per data slot: %.0f B" % (allocated / max(len(slots), 1)))
+    print("mean __dict__ size: DataSlot %.0f B, DataLink %.0f B" % (getDictSize(slots), getDictSize(links)))
+    print("\nTop allocations:")
+    for stat in after.compare_to(before, 'lineno')[:10]:
+        print(stat)
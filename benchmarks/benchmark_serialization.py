@@ -0,0 +1,70 @@
+"""Save/load benchmark of workflow files.
+
+Compares the former single-string JSON save/load with workfloweditor.serialization for all available codecs, which
+are chunked (one element per line) when the codec supports it, and with the available binary codecs.
+"""
+import sys
+import os
+import json
+import uuid
+import timeit
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from workfloweditor import serialization
+
+
+def generateElements(number_of_blocks, slots_per_block=4):
+    """Return synthetic workflow elements resembling the output of BlockWorkflow.convertToJSON."""
+    workflow_uid = str(uuid.uuid4())
+    elements = [{'classname': 'BlockWorkflow', 'uid': workflow_uid, 'parent_uid': None}]
+    for i in range(number_of_blocks):
+        block_uid = str(uuid.uuid4())
+        elements.append({
+            'classname': 'BlockModel', 'uid': block_uid, 'parent_uid': workflow_uid,
+            'model_classname': 'thermal_nonstat', 'model_input_file_name': 'inputT13.in',
+            'metadata': {'Name': 'Non-stationary thermal problem %d' % i, 'ID': 'NonStatThermo-1',
+                         'Description': 'Non-stationary heat conduction using finite elements on a rectangular domain',
+                         'Solver': {'Software': 'own', 'Language': 'Python', 'License': 'LGPL',
+                                    'Estim_comp_time': 1.e-3, 'Estim_time_step': 1}}})
+        for j in range(slots_per_block):
+            elements.append({
+                'classname': 'InputDataSlot' if j % 2 else 'OutputDataSlot', 'uid': str(uuid.uuid4()),
+                'parent_uid': block_uid, 'name': 'slot %d' % j, 'type': 'mupif.Field',
+                'obj_id': j, 'obj_type': 'mupif.FieldID.FID_Temperature'})
+    return elements
+
+
+def saveSingleString(file_path, elements):
+    with open(file_path, 'w') as f:
+        f.write(json.dumps({'elements': elements}))
+
+
+def loadSingleString(file_path):
+    with open(file_path, 'r') as f:
+        return json.loads(f.read())['elements']
+
+
+if __name__ == '__main__':
+    number_of_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    elements = generateElements(number_of_blocks)
+    file_path = os.path.join(tempfile.mkdtemp(), 'workflow.json')
+
+    cases = [('single string json', saveSingleString, loadSingleString)]
+    for codec in serialization.CODECS.values():
+        cases.append(('%s %s' % ('chunked' if codec.chunked else 'whole', codec.name),
+                      lambda fp, el, codec=codec: serialization.saveWorkflowToFile(fp, el, codec),
+                      lambda fp, codec=codec: serialization.loadWorkflowFromFile(fp, codec)))
+    for codec in serialization.BINARY_CODECS.values():
+        cases.append(('binary v%d %s' % (codec.version, codec.name),
+                      lambda fp, el, codec=codec: serialization.saveWorkflowToBinaryFile(fp, el, codec=codec),
+                      serialization.loadWorkflowFromFile))
+
+    print("%d blocks, %d elements" % (number_of_blocks, len(elements)))
+    print("%25s %12s %12s %12s" % ('', 'save [s]', 'load [s]', 'size [kB]'))
+    for name, save, load in cases:
+        time_save = min(timeit.repeat(lambda: save(file_path, elements), number=1, repeat=3))
+        size = os.path.getsize(file_path) / 1024.
+        time_load = min(timeit.repeat(lambda: load(file_path), number=1, repeat=3))
+        assert load(file_path) == elements
+        print("%25s %12.4f %12.4f %12.1f" % (name, time_save, time_load, size))
+    os.remove(file_path)
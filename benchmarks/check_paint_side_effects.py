@@ -0,0 +1,54 @@
+"""Check that painting of the editor scene has no side effects.
+
+The scene of a synthetic workflow is rendered repeatedly without any change. Each paint method changing the state
+of an item schedules another update, which is reported by the QGraphicsScene.changed signal, so the number of the
+signals emitted during the idle repaint has to be zero. The exit status is 1 otherwise.
+
+    python check_paint_side_effects.py --width 50
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import io
+import sys
+import argparse
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
+import workfloweditor
+from workfloweditor import synthetic
+
+
+def renderScene(scene, size=1024):
+    image = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, size, size), scene.itemsBoundingRect())
+    painter.end()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=50, help="number of model blocks")
+    parser.add_argument('--repeat', type=int, default=3, help="number of the idle repaints")
+    args = parser.parse_args()
+
+    application = workfloweditor.Application.Application(synthetic.generateWorkflow(depth=1, width=args.width))
+    with contextlib.redirect_stdout(io.StringIO()):
+        application.generateAll()
+    application.getWindow().show()
+    scene = application.getWindow().widget.scene
+
+    # let the scene settle after its construction
+    renderScene(scene)
+    QtWidgets.QApplication.processEvents()
+
+    changes = []
+    scene.changed.connect(lambda regions: changes.append(len(regions)))
+    for i in range(args.repeat):
+        renderScene(scene)
+        application.getWindow().widget.view.viewport().repaint()
+        QtWidgets.QApplication.processEvents()
+
+    print("scene changed signals during %d idle repaints: %d" % (args.repeat, len(changes)))
+    sys.exit(1 if changes else 0)
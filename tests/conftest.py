@@ -0,0 +1,19 @@
+"""Test configuration.
+
+The workfloweditor package imports the whole editor, which needs workflowgenerator and PyQt5. When they are not
+installed, the package is registered without running its __init__, so that the modules which do not need them can
+still be imported and tested one by one.
+"""
+import os
+import sys
+import types
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+try:
+    import workfloweditor
+except ImportError:
+    workfloweditor = types.ModuleType('workfloweditor')
+    workfloweditor.__path__ = [os.path.join(ROOT, 'workfloweditor')]
+    sys.modules['workfloweditor'] = workfloweditor
@@ -0,0 +1,72 @@
+from workfloweditor import GraphIndex
+
+
+class Block:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+class Slot:
+    def __init__(self, block):
+        self.block = block
+
+    def getParentBlock(self):
+        return self.block
+
+
+class Link:
+    temporary = False
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+
+
+def connect(index, block_1, block_2):
+    link = Link(Slot(block_1), Slot(block_2))
+    index.addDataLink(link)
+    return link
+
+
+def test_add_and_remove_links_of_blocks():
+    index = GraphIndex.GraphIndex()
+    a, b, c = Block('a'), Block('b'), Block('c')
+    link_1 = connect(index, a, b)
+    link_2 = connect(index, b, a)
+    link_3 = connect(index, b, c)
+    index.addDataLink(link_1)
+    assert len(index) == 3
+    assert index.getDataLinks(a) == [link_1, link_2]
+    assert index.getDataLinks(b) == [link_1, link_2, link_3]
+    assert index.getDataLinks(c) == [link_3]
+
+    index.removeDataLink(link_1)
+    assert len(index) == 2
+    assert index.getDataLinks(a) == [link_2] and index.getDataLinks(b) == [link_2, link_3]
+    index.removeDataLink(link_1)
+    index.removeDataLink(link_2)
+    index.removeDataLink(link_3)
+    assert len(index) == 0
+    assert index.getDataLinks(a) == [] and index.getDataLinks(b) == [] and not index.links_by_block
+
+
+def test_link_within_one_block():
+    index = GraphIndex.GraphIndex()
+    a = Block('a')
+    link = connect(index, a, a)
+    assert index.getDataLinks(a) == [link]
+    index.removeDataLink(link)
+    assert not index.links_by_block
+
+
+def test_temporary_and_unfinished_links_are_ignored():
+    index = GraphIndex.GraphIndex()
+    a, b = Block('a'), Block('b')
+    temporary = Link(Slot(a), Slot(b))
+    temporary.temporary = True
+    index.addDataLink(temporary)
+    index.addDataLink(Link(Slot(a), None))
+    assert len(index) == 0 and index.getDataLinks(a) == []
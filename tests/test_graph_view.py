@@ -0,0 +1,51 @@
+import os
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('PyQt5')
+pytest.importorskip('workflowgenerator')
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
+from workfloweditor import DataLink
+from workfloweditor import GraphView
+
+Qt = QtCore.Qt
+
+
+@pytest.fixture
+def view():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    scene = QtWidgets.QGraphicsScene()
+    view = GraphView.GraphView(scene)
+    DataLink.DataLink.removal_mode = False
+    yield view
+    DataLink.DataLink.removal_mode = False
+    del app
+
+
+def press(view, key, modifiers=Qt.NoModifier):
+    view.keyPressEvent(QtGui.QKeyEvent(QtCore.QEvent.KeyPress, key, modifiers))
+    return DataLink.DataLink.removal_mode
+
+
+def release(view, key, modifiers=Qt.NoModifier):
+    view.keyReleaseEvent(QtGui.QKeyEvent(QtCore.QEvent.KeyRelease, key, modifiers))
+    return DataLink.DataLink.removal_mode
+
+
+def getDeleteKey():
+    return Qt.Key_Alt if DataLink.DELETE_MODIFIER_KEY == Qt.AltModifier else Qt.Key_Control
+
+
+def test_shift_alone_does_not_toggle_removal_mode(view):
+    assert not press(view, Qt.Key_Shift, Qt.ShiftModifier)
+    assert not release(view, Qt.Key_Shift, Qt.ShiftModifier)
+
+
+def test_removal_mode_needs_exactly_the_delete_modifier(view):
+    delete_key = getDeleteKey()
+    assert press(view, delete_key)
+    assert not press(view, Qt.Key_Shift, DataLink.DELETE_MODIFIER_KEY)
+    assert release(view, Qt.Key_Shift, DataLink.DELETE_MODIFIER_KEY | Qt.ShiftModifier)
+    assert not release(view, delete_key, DataLink.DELETE_MODIFIER_KEY)
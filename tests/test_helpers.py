@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('PyQt5')
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+from workfloweditor import helpers
+
+Qt = QtCore.Qt
+
+
+def getModifiers(event_type, key, modifiers=Qt.NoModifier):
+    return helpers.getModifiersAfterKeyEvent(QtGui.QKeyEvent(event_type, key, modifiers))
+
+
+@pytest.mark.parametrize('held', [Qt.NoModifier, Qt.ControlModifier], ids=['without', 'with'])
+def test_pressed_modifier_key_is_held(held):
+    # the modifiers of the event of the key itself are platform dependent
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Control, held) == Qt.ControlModifier
+    assert getModifiers(QtCore.QEvent.KeyRelease, Qt.Key_Control, held) == Qt.NoModifier
+
+
+def test_shift_alone_is_not_control():
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Shift) == Qt.ShiftModifier
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Shift) != Qt.ControlModifier
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Shift) != Qt.AltModifier
+
+
+def test_modifier_combinations():
+    shift_control = Qt.ShiftModifier | Qt.ControlModifier
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Control, Qt.ShiftModifier) == shift_control
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_Control, Qt.ShiftModifier) != Qt.ControlModifier
+    # releasing Shift leaves exactly Control held
+    assert getModifiers(QtCore.QEvent.KeyRelease, Qt.Key_Shift, shift_control) == Qt.ControlModifier
+    assert getModifiers(QtCore.QEvent.KeyPress, Qt.Key_A, Qt.ControlModifier) == Qt.ControlModifier
@@ -0,0 +1,380 @@
+import copy
+import pytest
+
+pytest.importorskip('PyQt5')
+from PyQt5 import QtWidgets
+from workfloweditor import History
+
+
+class RealSlot:
+    def __init__(self, element):
+        self.element = dict(element)
+
+    def getUID(self):
+        return self.element['uid']
+
+    def getDictForJSON(self):
+        return dict(self.element)
+
+
+class RealBlock(RealSlot):
+    def __init__(self, element):
+        super(RealBlock, self).__init__(element)
+        self.blocks = []
+        self.slots = []
+
+    def getBlocks(self):
+        return list(self.blocks)
+
+    def getDataSlots(self):
+        return list(self.slots)
+
+    def addBlock(self, block):
+        self.blocks.append(block)
+
+    def addDataSlot(self, slot):
+        self.slots.append(slot)
+
+    def getPreOrder(self):
+        items = [self] + self.slots
+        for block in self.blocks:
+            items.extend(block.getPreOrder())
+        return items
+
+
+class RealWorkflow(RealBlock):
+    """
+    Workflow of blocks with input and output data slots, which is written as elements by convertToJSON.
+
+    Connecting an input data slot replaces its former DataLink, as in the workflowgenerator.
+    """
+    def __init__(self, elements=None):
+        super(RealWorkflow, self).__init__({'classname': 'BlockWorkflow', 'uid': 'w', 'parent_uid': None})
+        self.links = []
+        self.constructed = 0
+        if elements is not None:
+            self.constructFromJSON(elements)
+
+    def constructFromJSON(self, elements):
+        self.constructed += 1
+        self.blocks = []
+        self.slots = []
+        self.links = []
+        items = {}
+        for elem in copy.deepcopy(elements):
+            if elem['classname'] == 'DataLink':
+                self.links.append([elem['ds1_uid'], elem['ds2_uid']])
+            elif elem['parent_uid'] is None:
+                self.element = elem
+                items[elem['uid']] = self
+            elif elem['classname'] in ('Input', 'Output'):
+                items[elem['uid']] = RealSlot(elem)
+                items[elem['parent_uid']].addDataSlot(items[elem['uid']])
+            else:
+                items[elem['uid']] = RealBlock(elem)
+                items[elem['parent_uid']].addBlock(items[elem['uid']])
+
+    def convertToJSON(self):
+        return [item.getDictForJSON() for item in self.getPreOrder()] + [
+            {'classname': 'DataLink', 'ds1_uid': uid_1, 'ds2_uid': uid_2} for uid_1, uid_2 in self.links]
+
+    def getItem(self, uid):
+        return next((item for item in self.getPreOrder() if item.getUID() == uid), None)
+
+    def getParent(self, uid):
+        return next(item for item in self.getPreOrder()
+                    if isinstance(item, RealBlock) and any(child.getUID() == uid for child in item.slots + item.blocks))
+
+    def removeItem(self, uid):
+        item = self.getItem(uid)
+        uids = set(elem.getUID() for elem in (item.getPreOrder() if isinstance(item, RealBlock) else [item]))
+        parent = self.getParent(uid)
+        parent.blocks = [block for block in parent.blocks if block is not item]
+        parent.slots = [slot for slot in parent.slots if slot is not item]
+        self.links = [link for link in self.links if link[0] not in uids and link[1] not in uids]
+
+    def connectSlotsWithUID(self, uid_1, uid_2):
+        slot_1 = self.getItem(uid_1)
+        slot_2 = self.getItem(uid_2)
+        if slot_1 is None or slot_2 is None or \
+                {slot_1.element['classname'], slot_2.element['classname']} != {'Input', 'Output'}:
+            return
+        if [uid_1, uid_2] in self.links or [uid_2, uid_1] in self.links:
+            return
+        input_uid = uid_1 if slot_1.element['classname'] == 'Input' else uid_2
+        self.links = [link for link in self.links if input_uid not in link] + [[uid_1, uid_2]]
+
+    def modificationQuery(self, keyword, value):
+        if keyword == 'delete_datalink':
+            self.links = [link for link in self.links if set(link) != set(value)]
+        elif keyword == 'set_dataslot_name':
+            self.getItem(value[0]).element['name'] = value[1]
+        elif keyword == 'delete_dataslot':
+            self.removeItem(value)
+
+    def modificationQueryForItemWithUID(self, uid, keyword, value):
+        if keyword == 'delete_block':
+            self.removeItem(uid)
+        elif keyword == 'add_block':
+            block = RealBlock({'classname': 'Block', 'uid': value, 'parent_uid': uid, 'name': value})
+            block.addDataSlot(RealSlot({'classname': 'Input', 'uid': value + '.in', 'parent_uid': value, 'name': 'in'}))
+            self.getItem(uid).addBlock(block)
+        elif keyword == 'set_name':
+            self.getItem(uid).element['name'] = value
+
+
+class Journal:
+    def __init__(self):
+        self.entries = []
+
+    def append(self, query, args):
+        self.entries.append((query, copy.deepcopy(args)))
+
+
+class Link:
+    temporary = False
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        source.dataLinks.append(self)
+        target.dataLinks.append(self)
+
+    def giveTheOtherSlot(self, slot):
+        return self.target if slot is self.source else self.source
+
+
+class Slot:
+    def __init__(self, real, parent):
+        self.real = real
+        self.parent = parent
+        self.name = real.element['name']
+        self.maxConnections = 1 if real.element['classname'] == 'Input' else -1
+        self.dataLinks = []
+
+    def getUID(self):
+        return self.real.getUID()
+
+    def getRealSlot(self):
+        return self.real
+
+    def getParentBlock(self):
+        return self.parent
+
+    def getConnectionError(self, target):
+        if {self.real.element['classname'], target.real.element['classname']} != {'Input', 'Output'}:
+            return "Only Input and Output can be connected."
+        return None
+
+
+class Block:
+    """Visual mirror of a block of RealWorkflow."""
+    def __init__(self, real, parent):
+        self.real = real
+        self.parent = parent
+        self.slots = []
+        self.blocks = []
+
+    def getUID(self):
+        return self.real.getUID()
+
+    def getRealBlock(self):
+        return self.real
+
+    def getDataSlots(self):
+        return list(self.slots)
+
+    def getBlocks(self):
+        return list(self.blocks)
+
+    def getDataSlotWithUID(self, uid, recursive_search=False):
+        for slot in self.slots:
+            if slot.getUID() == uid:
+                return slot
+        for block in self.blocks:
+            slot = block.getDataSlotWithUID(uid, True)
+            if slot is not None:
+                return slot
+        return None
+
+
+class Application:
+    def __init__(self, elements):
+        self.workflow = RealWorkflow(elements)
+        self.workflow_block = None
+        self.journal = Journal()
+        self.generateAll()
+
+    def getRealWorkflow(self):
+        return self.workflow
+
+    def getWorkflowBlock(self):
+        return self.workflow_block
+
+    def generateAll(self):
+        items = {}
+        for item in self.workflow.getPreOrder():
+            parent = items.get(item.element['parent_uid'])
+            if isinstance(item, RealBlock):
+                items[item.getUID()] = Block(item, parent)
+                if parent is None:
+                    self.workflow_block = items[item.getUID()]
+                else:
+                    parent.blocks.append(items[item.getUID()])
+            else:
+                items[item.getUID()] = Slot(item, parent)
+                parent.slots.append(items[item.getUID()])
+        for uid_1, uid_2 in self.workflow.links:
+            Link(items[uid_1], items[uid_2])
+
+    def executeQueries(self, queries):
+        for query, args in queries:
+            History.getQueryFunction(self.workflow, query)(*args)
+            self.journal.append(query, args)
+        self.generateAll()
+
+    def restoreItemState(self, state):
+        self.executeQueries(state.getQueries(self))
+
+
+def getElements():
+    """Workflow with blocks a and b inside the workflow w and block c inside block b, a.out is connected to c.in."""
+    return [
+        {'classname': 'Block', 'uid': 'w', 'parent_uid': None, 'name': 'workflow'},
+        {'classname': 'Output', 'uid': 'w.ext', 'parent_uid': 'w', 'name': 'external'},
+        {'classname': 'Block', 'uid': 'a', 'parent_uid': 'w', 'name': 'a'},
+        {'classname': 'Input', 'uid': 'a.in', 'parent_uid': 'a', 'name': 'in'},
+        {'classname': 'Output', 'uid': 'a.out', 'parent_uid': 'a', 'name': 'out'},
+        {'classname': 'Block', 'uid': 'b', 'parent_uid': 'w', 'name': 'b'},
+        {'classname': 'Output', 'uid': 'b.out', 'parent_uid': 'b', 'name': 'out'},
+        {'classname': 'Block', 'uid': 'c', 'parent_uid': 'b', 'name': 'c'},
+        {'classname': 'Input', 'uid': 'c.in', 'parent_uid': 'c', 'name': 'in'},
+        {'classname': 'DataLink', 'ds1_uid': 'a.out', 'ds2_uid': 'c.in'},
+    ]
+
+
+def getState(application):
+    """Return the elements of the workflow items in their order and its DataLinks in any order."""
+    workflow = application.getRealWorkflow()
+    return [item.getDictForJSON() for item in workflow.getPreOrder()], sorted(workflow.links)
+
+
+def replayJournal(elements, journal):
+    """Return the workflow recovered from given elements and the journal recorded after them."""
+    workflow = RealWorkflow(elements)
+    for query, args in journal.entries:
+        History.getQueryFunction(workflow, query)(*args)
+    application = Application([])
+    application.workflow = workflow
+    return getState(application)
+
+
+def checkUndoRedo(application, text, queries, reconstructed=False):
+    """
+    Push the command, check that its undo restores the workflow and that its redo repeats the change.
+
+    The undo has to be journaled, so that the journal recovers the workflow, and it must not construct the whole
+    workflow again, unless the workflow block itself is changed.
+    """
+    stack = QtWidgets.QUndoStack()
+    elements = application.getRealWorkflow().convertToJSON()
+    constructed = application.getRealWorkflow().constructed
+    before = getState(application)
+    stack.push(History.QueryCommand(application, text, queries))
+    after = getState(application)
+    stack.undo()
+    assert getState(application) == before
+    stack.redo()
+    assert getState(application) == after
+    stack.undo()
+    assert getState(application) == before
+    assert (application.getRealWorkflow().constructed > constructed) == reconstructed
+    assert replayJournal(elements, application.journal) == before
+    return before, after
+
+
+def test_connect_new_data_link():
+    before, after = checkUndoRedo(Application(getElements()), 'connect', [('connectSlotsWithUID', ['w.ext', 'a.in'])])
+    assert after != before
+
+
+def test_connect_replacing_data_link_of_input():
+    application = Application(getElements())
+    command = History.QueryCommand(application, 'connect', [('connectSlotsWithUID', ['b.out', 'c.in'])])
+    assert [query for query, args in command.inverse[0]] == ['modificationQuery', 'connectSlotsWithUID']
+    before, after = checkUndoRedo(application, 'connect', [('connectSlotsWithUID', ['b.out', 'c.in'])])
+    assert before[1] == [['a.out', 'c.in']] and after[1] == [['b.out', 'c.in']]
+
+
+def test_connect_existing_data_link_is_not_deleted_by_undo():
+    application = Application(getElements())
+    command = History.QueryCommand(application, 'connect', [('connectSlotsWithUID', ['c.in', 'a.out'])])
+    assert command.inverse == [[]]
+    before, after = checkUndoRedo(application, 'connect', [('connectSlotsWithUID', ['c.in', 'a.out'])])
+    assert after == before
+
+
+def test_connect_many():
+    checkUndoRedo(Application(getElements()), 'connect', [
+        ('connectSlotsWithUID', ['w.ext', 'a.in']), ('connectSlotsWithUID', ['b.out', 'c.in'])])
+
+
+def test_delete_data_link():
+    checkUndoRedo(Application(getElements()), 'delete', [('modificationQuery', ['delete_datalink', ['c.in', 'a.out']])])
+
+
+def test_rename_data_slot():
+    checkUndoRedo(Application(getElements()), 'rename', [('modificationQuery', ['set_dataslot_name', ['w.ext', 'x']])])
+
+
+def test_delete_data_slot_with_data_links():
+    application = Application(getElements())
+    application.executeQueries([('connectSlotsWithUID', ['w.ext', 'a.in'])])
+    command = History.QueryCommand(application, 'delete', [('modificationQuery', ['delete_dataslot', 'a.out'])])
+    # only the touched data slot is recorded
+    assert [elem['uid'] for elem in command.inverse[0].elements] == ['a.out']
+    checkUndoRedo(application, 'delete', [('modificationQuery', ['delete_dataslot', 'a.out'])])
+
+
+@pytest.mark.parametrize('uid', ['a', 'b', 'c'])
+def test_delete_block(uid):
+    checkUndoRedo(Application(getElements()), 'delete', [
+        ('modificationQueryForItemWithUID', [uid, 'delete_block', None])])
+
+
+def test_block_menu_query_records_only_the_block():
+    application = Application(getElements())
+    queries = [('modificationQueryForItemWithUID', ['b', 'set_name', 'renamed'])]
+    command = History.QueryCommand(application, 'rename', queries)
+    assert [elem['uid'] for elem in command.inverse[0].elements] == ['b', 'b.out', 'c', 'c.in']
+    checkUndoRedo(application, 'rename', queries)
+
+
+@pytest.mark.parametrize('uid', ['w', 'b', 'c'])
+def test_add_block(uid):
+    application = Application(getElements())
+    queries = [('modificationQueryForItemWithUID', [uid, 'add_block', 'new'])]
+    command = History.QueryCommand(application, 'add', queries)
+    if uid == 'w':
+        # the workflow keeps only the UIDs of its child blocks
+        assert [elem['uid'] for elem in command.inverse[0].elements] == ['w', 'w.ext']
+    checkUndoRedo(application, 'add', queries)
+
+
+def test_workflow_block_query_reconstructs_the_workflow():
+    application = Application(getElements())
+    queries = [('modificationQueryForItemWithUID', ['w', 'set_name', 'renamed'])]
+    checkUndoRedo(application, 'rename', queries, reconstructed=True)
+
+
+def test_undo_is_journaled_as_queries():
+    application = Application(getElements())
+    stack = QtWidgets.QUndoStack()
+    queries = [('modificationQueryForItemWithUID', ['b', 'set_name', 'x'])]
+    stack.push(History.QueryCommand(application, 'rename', queries))
+    del application.journal.entries[:]
+    stack.undo()
+    assert [query for query, args in application.journal.entries] == [
+        'modificationQuery', 'removeItems', 'insertItems', 'connectSlotsWithUID']
+    # only the elements of the block are journaled
+    assert [elem['uid'] for elem in application.journal.entries[2][1][2]] == ['b', 'b.out', 'c', 'c.in']
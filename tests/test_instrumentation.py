@@ -0,0 +1,84 @@
+import json
+import threading
+import pytest
+from workfloweditor import instrumentation
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'enabled', True)
+    monkeypatch.setattr(instrumentation, '_active', True)
+    instrumentation.reset()
+    yield
+    instrumentation.stopTrace()
+    instrumentation.reset()
+
+
+@pytest.fixture
+def disabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'enabled', False)
+    monkeypatch.setattr(instrumentation, '_active', False)
+    instrumentation.reset()
+    yield
+    instrumentation.stopTrace()
+    instrumentation.reset()
+
+
+def square(x):
+    return x * x
+
+
+def test_inactive_decorator_records_nothing(disabled):
+    traced = instrumentation.timed('square')(square)
+    assert traced(3) == 9
+    with instrumentation.measure('block'):
+        traced(2)
+    assert instrumentation.getStatistics() == {}
+
+
+def test_trace_recorded_without_environment_variable(disabled):
+    # the function is decorated before the trace is started, as the editor methods at import time
+    traced = instrumentation.timed('square')(square)
+    instrumentation.startTrace()
+    assert instrumentation.isTracing()
+    traced(3)
+    assert instrumentation.stopTrace() == 1
+    traced(3)
+    assert instrumentation.getStatistics()['square']['count'] == 1
+
+
+def test_enabled_decorator_records_calls(enabled):
+    traced = instrumentation.timed('square')(square)
+    assert traced(3) == 9
+    with instrumentation.measure('block'):
+        traced(2)
+    statistics = instrumentation.getStatistics()
+    assert statistics['square']['count'] == 2
+    assert statistics['block']['count'] == 1
+
+
+def test_record_from_threads(enabled):
+    traced = instrumentation.timed('square')(square)
+    instrumentation.startTrace()
+
+    def _run():
+        for i in range(1000):
+            traced(i)
+    threads = [threading.Thread(target=_run) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert instrumentation.getStatistics()['square']['count'] == 8000
+    assert instrumentation.stopTrace() == 8000
+
+
+def test_trace_saved_in_chrome_format(enabled, tmp_path):
+    traced = instrumentation.timed('square')(square)
+    instrumentation.startTrace()
+    traced(1)
+    file_path = str(tmp_path / 'trace.json')
+    assert instrumentation.stopTrace(file_path) == 1
+    with open(file_path) as f:
+        events = json.load(f)['traceEvents']
+    assert events[0]['name'] == 'square' and events[0]['ph'] == 'X'
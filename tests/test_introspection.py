@@ -0,0 +1,116 @@
+import os
+import textwrap
+from workfloweditor import introspection
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workfloweditor', 'examples',
+                       'example02_tm_cantilever')
+
+
+def extract(source):
+    return introspection.extractMetadataFromSource(textwrap.dedent(source))
+
+
+def test_example_models():
+    models, unresolved = introspection.extractMetadataFromFile(os.path.join(EXAMPLE, 'models.py'))
+    assert unresolved == []
+    assert sorted(models) == ['mechanical', 'thermal', 'thermal_nonstat']
+    assert models['thermal']['Name'] == 'Stationary thermal problem'
+    assert models['thermal_nonstat']['Name'] == 'Non-stationary thermal problem'
+    assert models['mechanical']['Name'] == 'Plane stress linear elastic'
+
+
+def test_example_export_models():
+    models, unresolved = introspection.extractMetadataFromFile(os.path.join(EXAMPLE, 'field_to_vtk.py'))
+    assert unresolved == []
+    assert sorted(models) == ['field_export_to_VTK', 'field_export_to_image']
+
+
+def test_class_discovery():
+    models, unresolved = extract('''
+        import mupif
+
+        class Helper:
+            def __init__(self):
+                self.value = 1
+
+        class A(mupif.Model.Model):
+            def __init__(self, metaData={}):
+                metaData = {'Name': 'A', 'Inputs': [], 'Outputs': []}
+                super().__init__(metaData)
+
+        class B(Application):
+            def __init__(self):
+                super(B, self).__init__({'Name': 'B'})
+    ''')
+    assert models == {'A': {'Name': 'A', 'Inputs': [], 'Outputs': []}, 'B': {'Name': 'B'}}
+    assert unresolved == []
+
+
+def test_metadata_forms():
+    models, unresolved = extract('''
+        COMMON = {'Name': 'C', 'Inputs': []}
+
+        class C(Model):
+            def __init__(self):
+                self.metadata = COMMON
+                self.metadata.update({'Outputs': [1]})
+
+        class D(Model):
+            def __init__(self):
+                Model.__init__(self, metaData={'Name': 'D'})
+    ''')
+    assert models == {'C': {'Name': 'C', 'Inputs': [], 'Outputs': [1]}, 'D': {'Name': 'D'}}
+    assert unresolved == []
+
+
+def test_inherited_metadata():
+    models, unresolved = extract('''
+        class Base(Model):
+            def __init__(self, metaData={}):
+                if len(metaData) == 0:
+                    metaData = {'Name': 'Base', 'Inputs': [1]}
+                super().__init__(metaData)
+
+        class WithoutConstructor(Base):
+            pass
+
+        class Updated(Base):
+            def __init__(self):
+                super().__init__()
+                self.metadata.update({'Name': 'Updated'})
+
+        class Replaced(Base):
+            def __init__(self):
+                metaData = {'Name': 'Replaced'}
+                super(Replaced, self).__init__(metaData)
+    ''')
+    assert models['WithoutConstructor'] == {'Name': 'Base', 'Inputs': [1]}
+    assert models['Updated'] == {'Name': 'Updated', 'Inputs': [1]}
+    assert models['Replaced'] == {'Name': 'Replaced'}
+    assert unresolved == []
+
+
+def test_unresolvable_metadata_and_bases():
+    models, unresolved = extract('''
+        from somewhere import ExternalModel, makeMetadata
+
+        class Computed(Model):
+            def __init__(self):
+                super().__init__(makeMetadata())
+
+        class FromComputed(Computed):
+            pass
+
+        class FromExternal(ExternalModel):
+            pass
+
+        class NotModel:
+            def __init__(self):
+                self.metadata = makeMetadata()
+
+        class Error(Exception):
+            pass
+    ''')
+    assert models == {}
+    # the class derived from the imported base may be a model, the file has to be imported to know it
+    assert unresolved == ['Computed', 'FromComputed', 'FromExternal']
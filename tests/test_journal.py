@@ -0,0 +1,42 @@
+from workfloweditor import Journal
+
+
+def test_append_copies_arguments(tmp_path):
+    journal = Journal.Journal(str(tmp_path))
+    journal.reset([{'classname': 'BlockWorkflow', 'uid': 'w'}])
+    args = ['uid', 'set_name', {'name': 'before'}]
+    journal.append('modificationQueryForItemWithUID', args)
+    args[2]['name'] = 'after'
+    journal.close()
+
+    recovered = Journal.Journal(str(tmp_path))
+    elements, queries = recovered.loadRecovery()
+    recovered.close()
+    assert elements == [{'classname': 'BlockWorkflow', 'uid': 'w'}]
+    assert [entry['args'] for entry in queries] == [['uid', 'set_name', {'name': 'before'}]]
+
+
+def test_previous_autosave_survives_first_edit(tmp_path):
+    journal = Journal.Journal(str(tmp_path), snapshot_interval=2)
+    journal.reset([{'uid': 'first session'}])
+    for i in range(3):
+        journal.append('modificationQuery', ['set_name', str(i)])
+    journal.close()
+
+    journal = Journal.Journal(str(tmp_path))
+    assert journal.hasRecovery()
+    # the first edit of the new session starts its own autosave
+    journal.reset([{'uid': 'second session'}])
+    journal.append('modificationQuery', ['set_name', 'new'])
+    journal.flush()
+    assert journal.hasRecovery()
+    elements, queries = journal.loadRecovery()
+    journal.close()
+    assert elements == [{'uid': 'first session'}]
+    assert [entry['args'] for entry in queries] == [['set_name', '0'], ['set_name', '1'], ['set_name', '2']]
+
+
+def test_no_recovery_without_autosave(tmp_path):
+    journal = Journal.Journal(str(tmp_path))
+    assert not journal.hasRecovery()
+    journal.close()
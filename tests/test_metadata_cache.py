@@ -0,0 +1,81 @@
+import os
+import sys
+import textwrap
+import concurrent.futures
+import pytest
+from workfloweditor import MetadataCache
+
+MODEL_SOURCE = '''
+def makeMetadata(name):
+    return {'Name': name}
+
+class Model:
+    pass
+
+class ComputedModel(Model):
+    def __init__(self):
+        self.metadata = makeMetadata(%r)
+
+    def getMetadata(self):
+        return self.metadata
+'''
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Runs the imports in a thread of the test process and counts the spawned pools."""
+    spawned = 0
+
+    def __init__(self, max_workers=None, mp_context=None, initializer=None):
+        CountingExecutor.spawned += 1
+        super(CountingExecutor, self).__init__(max_workers=1)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    CountingExecutor.spawned = 0
+    monkeypatch.setattr(MetadataCache.concurrent.futures, 'ProcessPoolExecutor', CountingExecutor)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    monkeypatch.setattr(sys, 'modules', dict(sys.modules))
+    return CountingExecutor
+
+
+def writeModel(file_path, name):
+    with open(file_path, 'w') as f:
+        f.write(textwrap.dedent(MODEL_SOURCE % name))
+
+
+def test_unchanged_file_is_not_imported_again(tmp_path, executor):
+    file_path = str(tmp_path / 'computed_model.py')
+    writeModel(file_path, 'Computed')
+    cache_file = str(tmp_path / 'cache' / 'metadata_cache.json')
+    expected = {file_path: {'ComputedModel': {'Name': 'Computed'}}}
+
+    cache = MetadataCache.MetadataCache(cache_file)
+    assert cache.getMetadata([file_path]) == expected
+    assert executor.spawned == 1
+    assert cache.getMetadata([file_path]) == expected
+    assert executor.spawned == 1
+
+    # a new editor session reads the persistent cache, a touched file with the same content is not imported
+    os.utime(file_path, (0, 0))
+    cache = MetadataCache.MetadataCache(cache_file)
+    assert cache.getMetadata([file_path]) == expected
+    assert cache.getCached([file_path]) == expected[file_path]
+    assert executor.spawned == 1
+
+    writeModel(file_path, 'Changed')
+    assert cache.getMetadata([file_path]) == {file_path: {'ComputedModel': {'Name': 'Changed'}}}
+    assert executor.spawned == 2
+
+
+def test_static_metadata_need_no_process_pool(tmp_path, executor):
+    file_path = str(tmp_path / 'static_model.py')
+    with open(file_path, 'w') as f:
+        f.write(textwrap.dedent('''
+            class StaticModel(Model):
+                def __init__(self):
+                    super().__init__({'Name': 'Static'})
+        '''))
+    cache = MetadataCache.MetadataCache(str(tmp_path / 'metadata_cache.json'))
+    assert cache.getMetadata([file_path]) == {file_path: {'StaticModel': {'Name': 'Static'}}}
+    assert executor.spawned == 0
@@ -0,0 +1,39 @@
+"""Idle repaint of the editor scene must not schedule further updates, see benchmarks/check_paint_side_effects.py."""
+import os
+import io
+import contextlib
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('PyQt5')
+pytest.importorskip('workflowgenerator')
+from PyQt5 import QtCore
+from PyQt5 import QtGui
+from PyQt5 import QtWidgets
+from workfloweditor import Application
+from workfloweditor import synthetic
+
+
+def renderScene(scene, size=512):
+    image = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, size, size), scene.itemsBoundingRect())
+    painter.end()
+
+
+def test_idle_repaint_does_not_change_scene():
+    application = Application.Application(synthetic.generateWorkflow(depth=1, width=20))
+    with contextlib.redirect_stdout(io.StringIO()):
+        application.generateAll()
+    application.getWindow().show()
+    scene = application.getWindow().widget.scene
+    renderScene(scene)
+    QtWidgets.QApplication.processEvents()
+
+    changes = []
+    scene.changed.connect(lambda regions: changes.append(len(regions)))
+    for i in range(3):
+        renderScene(scene)
+        application.getWindow().widget.view.viewport().repaint()
+        QtWidgets.QApplication.processEvents()
+    assert not changes
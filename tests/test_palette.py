@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip('PyQt5')
+from workfloweditor import Palette
+
+
+def getIndex():
+    index = Palette.SearchIndex()
+    index.add('block:VariableBlock', 'VariableBlock', 'Block', ['Block of a variable'])
+    index.add('block:TimeLoopBlock', 'TimeLoopBlock', 'Block', ['Loop over time steps'])
+    index.add('api:thermal', 'thermal', 'API', Palette.getMetadataTexts({
+        'Name': 'Stationary thermal problem', 'ID': 'Thermal-1',
+        'Inputs': [{'Name': 'Edge temperature', 'Type': 'mupif.Property', 'Type_ID': 'PID_Temperature'}],
+        'Outputs': [{'Name': 'Temperature', 'Type': 'mupif.Field', 'Type_ID': 'FID_Temperature'}]}))
+    index.add('api:mechanical', 'mechanical', 'API', Palette.getMetadataTexts({
+        'Name': 'Plane stress linear elastic', 'ID': 'Mechanical-1',
+        'Inputs': [{'Name': 'Temperature', 'Type': 'mupif.Field', 'Type_ID': 'FID_Temperature'}]}))
+    return index
+
+
+def test_prefix_matching():
+    index = getIndex()
+    assert index.search('t') == ['api:thermal', 'block:TimeLoopBlock', 'api:mechanical']
+    assert index.search('therm') == ['api:thermal']
+    # words longer than MAX_PREFIX_LENGTH are checked against the whole terms
+    assert index.search('temperature') == ['api:mechanical', 'api:thermal']
+    assert index.search('temperatures') == []
+    assert index.search('elastic') == ['api:mechanical']
+
+
+def test_case_folding():
+    index = getIndex()
+    assert index.search('VARIABLE') == index.search('variable') == ['block:VariableBlock']
+    assert index.search('Fid_Temp') == ['api:mechanical', 'api:thermal']
+
+
+def test_multi_token_queries():
+    index = getIndex()
+    assert index.search('temperature field') == ['api:mechanical', 'api:thermal']
+    assert index.search('edge temperature') == ['api:thermal']
+    assert index.search('loop  time') == ['block:TimeLoopBlock']
+    assert index.search('loop thermal') == []
+
+
+def test_empty_query_lists_all_entries():
+    index = getIndex()
+    assert index.search(' ') == ['api:mechanical', 'api:thermal', 'block:TimeLoopBlock', 'block:VariableBlock']
+
+
+def test_fuzzy_fallback():
+    index = getIndex()
+    assert index.search('tlb') == ['block:TimeLoopBlock']
+
+
+def test_adding_and_removing_apis():
+    index = getIndex()
+    index.add('api:thermal_nonstat', 'thermal_nonstat', 'API', ['Non-stationary thermal problem'])
+    assert len(index) == 5
+    assert index.search('thermal') == ['api:thermal', 'api:thermal_nonstat']
+    assert index.search('non') == ['api:thermal_nonstat']
+
+    # re-adding an entry replaces its terms
+    index.add('api:thermal', 'thermal', 'API', ['Heat conduction'])
+    assert index.search('stationary') == ['api:thermal_nonstat']
+    assert index.search('heat') == ['api:thermal']
+
+    index.remove('api:thermal_nonstat')
+    assert 'api:thermal_nonstat' not in index and len(index) == 4
+    assert index.search('non') == []
+    assert index.search('thermal') == ['api:thermal']
+    for key in list(index.entries):
+        index.remove(key)
+    assert len(index) == 0 and not index.prefixes
@@ -0,0 +1,113 @@
+import io
+import pytest
+from workfloweditor import serialization
+
+
+def getElements():
+    workflow_uid = '0f8fad5b-d9cb-469f-a165-70867728950e'
+    block_uid = '7c9e6679-7425-40de-944b-e07fc1f90ae7'
+    return [
+        {'classname': 'BlockWorkflow', 'uid': workflow_uid, 'parent_uid': None},
+        {'classname': 'BlockModel', 'uid': block_uid, 'parent_uid': workflow_uid, 'model_classname': 'thermal',
+         'metadata': {'Name': 'Thermal problem', 'Estim_comp_time': 1.e-3, 'Estim_time_step': 1, 'Required': False}},
+        {'classname': 'OutputDataSlot', 'uid': 'c9bf9e57-1685-4c89-bafb-ff5af830be8a', 'parent_uid': block_uid,
+         'name': 'temperature', 'type': 'mupif.Field', 'obj_id': -1, 'obj_type': 'mupif.FieldID.FID_Temperature'},
+        {'classname': 'InputDataSlot', 'uid': 'a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11', 'parent_uid': block_uid,
+         'name': 'unicode é中', 'type': 'mupif.Property', 'obj_id': 2 ** 40, 'obj_type': 'not-an-uuid'},
+    ]
+
+
+@pytest.mark.parametrize('codec', list(serialization.CODECS.values()), ids=list(serialization.CODECS))
+def test_write_and_iterate_elements(codec):
+    elements = getElements()
+    f = io.BytesIO()
+    serialization.writeElements(f, elements, codec, chunk_size=2)
+    f.seek(0)
+    assert list(serialization.iterElements(f, codec)) == elements
+
+
+@pytest.mark.parametrize('codec', list(serialization.CODECS.values()), ids=list(serialization.CODECS))
+def test_save_and_load_file(tmp_path, codec):
+    elements = getElements()
+    file_path = str(tmp_path / 'workflow.json')
+    serialization.saveWorkflowToFile(file_path, elements, codec)
+    assert serialization.loadWorkflowFromFile(file_path, codec) == elements
+    # files are readable by any codec
+    for other in serialization.CODECS.values():
+        assert serialization.loadWorkflowFromFile(file_path, other) == elements
+
+
+def test_failed_save_keeps_original_file(tmp_path):
+    file_path = str(tmp_path / 'workflow.json')
+    serialization.saveWorkflowToFile(file_path, getElements())
+
+    def cancel(fraction):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        serialization.saveWorkflowToFile(file_path, getElements(), serialization.JsonCodec, cancel)
+    assert serialization.loadWorkflowFromFile(file_path) == getElements()
+    assert not (tmp_path / 'workflow.json.part').exists()
+
+
+@pytest.mark.parametrize('codec', list(serialization.BINARY_CODECS.values()), ids=list(
+    codec.name for codec in serialization.BINARY_CODECS.values()))
+def test_binary_file_matches_json_file(tmp_path, codec):
+    elements = getElements()
+    json_path = str(tmp_path / 'workflow.json')
+    binary_path = str(tmp_path / 'workflow.mwf')
+    serialization.saveWorkflowToFile(json_path, elements)
+    serialization.saveWorkflowToBinaryFile(binary_path, elements, codec=codec)
+    assert serialization.loadWorkflowFromFile(binary_path) == serialization.loadWorkflowFromFile(json_path)
+    assert (tmp_path / 'workflow.mwf').stat().st_size < (tmp_path / 'workflow.json').stat().st_size
+
+
+def test_binary_codec_values():
+    obj = {'none': None, 'bool': [True, False], 'int': [0, 1, -1, 127, 128, -2 ** 70, 2 ** 70], 'float': [0.5, -1e300],
+           'str': ['', 'a', 'a', 'é中'], 'tuple': (1, 'a'), 'uuid': ['0F8FAD5B-D9CB-469F-A165-70867728950E'] * 2}
+    expected = dict(obj, tuple=[1, 'a'])
+    assert serialization.BinaryCodec.decode(serialization.BinaryCodec.encode(obj)) == expected
+
+
+def test_msgpack_file_readable_without_msgpack(tmp_path, monkeypatch):
+    msgpack = pytest.importorskip('msgpack')
+    obj = {'none': None, 'bool': [True, False], 'str': ['', 'a' * 31, 'a' * 32, 'é中' * 30000],
+           'int': [0, 127, 128, -32, -33, 255, 2 ** 16, -2 ** 31, 2 ** 63, -2 ** 63, 2 ** 64 - 1],
+           'float': [0.5, -1e300], 'list': [list(range(15)), list(range(16)), list(range(70000))],
+           'dict': [{str(i): i for i in range(15)}, {str(i): i for i in range(16)}]}
+    data = serialization.MsgpackCodec.encode(obj)
+    monkeypatch.setattr(serialization, 'msgpack', None)
+    assert serialization.MsgpackCodec.decode(data) == obj
+
+    elements = getElements()
+    file_path = str(tmp_path / 'workflow.mwf')
+    monkeypatch.setattr(serialization, 'msgpack', msgpack)
+    serialization.saveWorkflowToBinaryFile(file_path, elements, codec=serialization.MsgpackCodec)
+    monkeypatch.setattr(serialization, 'msgpack', None)
+    assert serialization.loadWorkflowFromFile(file_path) == elements
+
+
+def test_big_integers_in_binary_file(tmp_path):
+    elements = getElements()
+    elements[3]['obj_id'] = 2 ** 70
+    elements[2]['obj_id'] = -2 ** 70
+    file_path = str(tmp_path / 'workflow.mwf')
+    for codec in serialization.BINARY_CODECS.values():
+        serialization.saveWorkflowToBinaryFile(file_path, elements, codec=codec)
+        # msgpack cannot store them, so the file is written by the version 1 codec
+        with open(file_path, 'rb') as f:
+            assert f.read(len(serialization.BINARY_MAGIC) + 1)[-1] == serialization.BinaryCodec.version
+        assert serialization.loadWorkflowFromFile(file_path) == elements
+
+
+def test_unknown_binary_version(tmp_path):
+    file_path = tmp_path / 'workflow.mwf'
+    file_path.write_bytes(serialization.BINARY_MAGIC + b'\xff')
+    with pytest.raises(ValueError):
+        serialization.loadWorkflowFromFile(str(file_path))
+
+
+def test_failed_open_raises_original_error(tmp_path):
+    file_path = str(tmp_path / 'missing' / 'workflow.json')
+    with pytest.raises(FileNotFoundError):
+        serialization.saveWorkflowToFile(file_path, getElements())
@@ -0,0 +1,121 @@
+from workfloweditor import Validator
+
+
+class Link:
+    def __init__(self, temporary=False):
+        self.temporary = temporary
+
+
+class Slot:
+    def __init__(self, uid, optional=False, external=False):
+        self.uid = uid
+        self.name = uid
+        self.optional = optional or external
+        self.external = external
+        self.invalid = False
+        self.dataLinks = []
+
+    def getUID(self):
+        return self.uid
+
+    def setInvalid(self, invalid):
+        self.invalid = invalid
+
+
+def getValidator(slots):
+    validator = Validator.Validator()
+    for slot in slots:
+        validator.addDataSlot(slot)
+    return validator
+
+
+def test_unconnected_and_external_slots():
+    compulsory, optional, external = Slot('a'), Slot('b', optional=True), Slot('c', external=True)
+    validator = getValidator([compulsory, optional, external])
+    assert not validator.isConsistent()
+    assert validator.getInvalidDataSlots() == [compulsory]
+    assert validator.getInvalidDataSlots(execution=True) == [compulsory, external]
+
+    compulsory.dataLinks.append(Link(temporary=True))
+    validator.updateDataSlot(compulsory)
+    assert not validator.isConsistent()
+    compulsory.dataLinks.append(Link())
+    validator.updateDataSlot(compulsory)
+    assert validator.isConsistent() and not validator.isConsistent(execution=True)
+    validator.removeDataSlot(external)
+    assert validator.isConsistent(execution=True)
+
+
+def test_highlight_is_removed_when_slot_gets_connected():
+    compulsory, external = Slot('a'), Slot('c', external=True)
+    validator = getValidator([compulsory, external])
+    assert validator.highlightErrors(execution=True) == [compulsory, external]
+    assert compulsory.invalid and external.invalid
+    compulsory.dataLinks.append(Link())
+    validator.updateDataSlot(compulsory)
+    assert not compulsory.invalid and external.invalid
+    validator.highlightDataSlots([])
+    assert not external.invalid
+
+
+def test_highlight_restored_after_regeneration():
+    validator = getValidator([Slot('a'), Slot('b'), Slot('c', external=True)])
+    uids = set(slot.getUID() for slot in validator.highlightErrors(execution=True))
+    # the regenerated scene has new DataSlots, b got connected meanwhile
+    a, b, c, d = Slot('a'), Slot('b'), Slot('c', external=True), Slot('d')
+    b.dataLinks.append(Link())
+    validator = getValidator([a, b, c, d])
+    slots = validator.highlightDataSlotsWithUID(uids)
+    assert slots == [a, c]
+    assert a.invalid and not b.invalid and c.invalid and not d.invalid
+
+
+class ConnectableSlot(Slot):
+    def __init__(self, uid, output=False, max_connections=-1):
+        super(ConnectableSlot, self).__init__(uid)
+        self.output = output
+        self.maxConnections = max_connections
+
+    def __repr__(self):
+        return self.uid
+
+    def getConnectionError(self, target):
+        if self.output == target.output:
+            return "Only InputDataSlot and OutputDataSlot can be connected."
+        return None
+
+
+def getSlots():
+    return [ConnectableSlot('in_1', max_connections=1), ConnectableSlot('in_2', max_connections=1),
+            ConnectableSlot('out', output=True)]
+
+
+def test_validate_connections_counts_the_batch_against_the_limits():
+    in_1, in_2, out = getSlots()
+    valid, errors = Validator.validateConnections([in_1, in_2, out], [
+        ('out', 'in_1'), ('out', 'in_2'), ('in_1', 'out'), ('in_2', 'in_1')])
+    assert valid == [(out, in_1), (out, in_2)]
+    assert errors == ["in_1 cannot have more DataLinks.", "Only InputDataSlot and OutputDataSlot can be connected."]
+
+
+def test_validate_connections_counts_existing_links():
+    in_1, in_2, out = getSlots()
+    in_1.dataLinks.append(Link())
+    valid, errors = Validator.validateConnections([in_1, in_2, out], [('out', 'in_1'), ('out', 'in_2')])
+    assert valid == [(out, in_2)] and errors == ["in_1 cannot have more DataLinks."]
+
+
+def test_validate_connections_with_missing_slots():
+    in_1, in_2, out = getSlots()
+    valid, errors = Validator.validateConnections([in_1, out], [('out', 'in_2'), ('missing', 'in_1'), ('out', 'in_1')])
+    assert valid == [(out, in_1)]
+    assert errors == ["One or both slots to be connected were not found."] * 2
+
+
+def test_validate_connections_without_limits():
+    in_1, in_2, out = getSlots()
+    in_1.dataLinks.append(Link())
+    valid, errors = Validator.validateConnections(
+        [in_1, in_2, out], [('out', 'in_1'), ('out', 'in_1'), ('in_1', 'in_2')], check_limits=False)
+    assert valid == [(out, in_1), (out, in_1)]
+    assert errors == ["Only InputDataSlot and OutputDataSlot can be connected."]
@@ -2,6 +2,9 @@ import workflowgenerator
 from . import Window
 from .GraphWidget import *
 from . import Block
+from . import Journal
+from . import History
+from . import instrumentation
 import sys
 
 
@@ -12,10 +15,19 @@ class Application:
         self.workflow = workflow
         if self.workflow is None:
             self.workflow = workflowgenerator.BlockWorkflow.BlockWorkflow()
+        self.journal = Journal.Journal()
+        self.undo_stack = QtWidgets.QUndoStack()
+        # UIDs of the DataSlots highlighted by the last consistency check, kept while the scene is regenerated
+        self.highlighted_slot_uids = set()
         self.window = Window.Window(self)
+        if self.journal.hasRecovery():
+            self.window.statusBar().showMessage(
+                "Autosaved workflow found, it can be recovered from the Workflow menu.")
 
     def run(self):
-        sys.exit(self.app.exec())
+        exit_code = self.app.exec()
+        self.journal.close()
+        sys.exit(exit_code)
 
     def exit(self):
         sys.exit()
@@ -42,28 +54,92 @@ class Application:
     def clearAll(self):
         self.getWorkflowBlock().destroy()
 
+    @instrumentation.timed('Application.generateAll')
     def generateAll(self):
         workflow = self.generateVisualBlockForRealBlock(self.getRealWorkflow(), None, None)
         self.window.widget.workflow = workflow
         self.window.widget.addNode(self.window.widget.workflow)
         self.generateChildItems(self.window.widget.workflow)
-        for dl in self.getRealWorkflow().getDataLinks():
-            slot_uids = dl.getSlotsUID()
-            slot1 = self.getWorkflowBlock().getDataSlotWithUID(slot_uids[0], True)
-            slot2 = self.getWorkflowBlock().getDataSlotWithUID(slot_uids[1], True)
-            if slot1 is not None and slot2 is not None:
-                slot1.connectTo(slot2)
-            else:
-                print("One or both slots to be connected were not found.")
+        self.getWorkflowBlock().connectMany(
+            [dl.getSlotsUID() for dl in self.getRealWorkflow().getDataLinks()], check_limits=False)
+        if self.highlighted_slot_uids:
+            slots = self.getWorkflowBlock().validator.highlightDataSlotsWithUID(self.highlighted_slot_uids)
+            self.highlighted_slot_uids = set(slot.getUID() for slot in slots)
 
-        self.getWindow().setFixedWidth(self.getWorkflowBlock().w + 32)
+        self.updateWindowWidth()
 
         self.getRealWorkflow().printStructure()
 
+    def updateWindowWidth(self):
+        if self.getWorkflowBlock() is not None:
+            self.getWindow().setFixedWidth(self.getWorkflowBlock().w + 32 + self.getWindow().getDockedPaletteWidth())
+
+    @instrumentation.timed('Application.reGenerateAll')
     def reGenerateAll(self):
         self.clearAll()
         self.generateAll()
 
+    @instrumentation.timed('Application.executeQueries')
+    def executeQueries(self, queries):
+        """
+        Apply the modification queries to the real workflow, record them in the autosave journal and regenerate
+        the scene once.
+
+        :param queries: list of (query, args)
+        """
+        if not self.journal.started:
+            self.journal.reset(self.getRealWorkflow().convertToJSON())
+        for query, args in queries:
+            with instrumentation.measure('query %s' % query):
+                History.getQueryFunction(self.getRealWorkflow(), query)(*args)
+            self.journal.append(query, args)
+        if self.journal.needsSnapshot():
+            self.journal.snapshot(self.getRealWorkflow().convertToJSON())
+        self.reGenerateAll()
+
+    def restoreItemState(self, state):
+        """
+        Replace the workflow item by its recorded state and connect its DataLinks again, the queries doing it are
+        journaled as any other modification.
+
+        :param History.ItemState state:
+        """
+        self.executeQueries(state.getQueries(self))
+
+    def pushQuery(self, text, query, *args):
+        """Execute the modification query as undoable command."""
+        self.undo_stack.push(History.QueryCommand(self, text, [(query, list(args))]))
+
+    def modificationQuery(self, keyword, value):
+        self.pushQuery(keyword.replace('_', ' '), 'modificationQuery', keyword, value)
+
+    def modificationQueryForItemWithUID(self, uid, keyword, value):
+        self.pushQuery(keyword.replace('_', ' '), 'modificationQueryForItemWithUID', uid, keyword, value)
+
+    def connectSlotsWithUID(self, slot_1_uid, slot_2_uid):
+        self.pushQuery('connect data slots', 'connectSlotsWithUID', slot_1_uid, slot_2_uid)
+
+    def resetHistory(self, elements=None):
+        """Restart the autosave journal and clear the undo history after the whole workflow was replaced."""
+        self.undo_stack.clear()
+        self.journal.reset(self.getRealWorkflow().convertToJSON() if elements is None else elements)
+
+    def recoverAutosave(self):
+        """
+        Construct the workflow from the last autosave snapshot and replay the journal recorded after it.
+
+        :rtype: bool
+        """
+        if not self.journal.hasRecovery():
+            return False
+        elements, queries = self.journal.loadRecovery()
+        self.getRealWorkflow().constructFromJSON(elements)
+        for entry in queries:
+            History.getQueryFunction(self.getRealWorkflow(), entry['query'])(*entry['args'])
+        self.resetHistory()
+        self.reGenerateAll()
+        return True
+
     def generateVisualBlockForRealBlock(self, block_real, parent, workflow):
         """
         :param workflowgenerator.Block.Block block_real:
@@ -6,9 +6,16 @@ from . import Label
 from . import Header
 from . import Application
 from . import helpers
+from . import GraphIndex
+from . import Validator
+from . import instrumentation
 
 
 class BlockVisual (QtWidgets.QGraphicsWidget):
+    fillColor = QtGui.QColor(220, 220, 220)
+    # the pens and brushes are shared by all the blocks, so that they are not created on each repaint
+    brush = QtGui.QBrush(fillColor)
+    pen = QtGui.QPen(QtGui.QColor(20, 20, 20))
 
     def __init__(self, block_real, parent, workflow, widget, scene):
         """
@@ -31,6 +38,9 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         if self.parent is None:
             self.workflow = self
             self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable)
+            # connectivity of all the blocks of the workflow
+            self.graph_index = GraphIndex.GraphIndex()
+            self.validator = Validator.Validator()
 
         self.setParentItem(parent)
 
@@ -41,7 +51,6 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
 
         self.spacing = 10
         self.roundness = 0
-        self.fillColor = QtGui.QColor(220, 220, 220)
 
         self.labels = []
 
@@ -60,6 +69,9 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         self.button_menu = Button(self, "...")
         self.button_menu.setParentItem(self)
 
+        # context menu, built when shown first and kept until the block is regenerated
+        self.menu = None
+
         self.generateItems()
 
         self.workflow.updateChildrenSizeAndPositionAndResizeSelf()
@@ -145,6 +157,52 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
                 return slot
         return None
 
+    def validateConnections(self, pairs, check_limits=True):
+        """
+        Return data slots of the subtree given by pairs of their UIDs, which can be connected, and the reasons why
+        the rest cannot, see Validator.validateConnections.
+
+        :rtype: (list of (DataSlot, DataSlot), list of str)
+        """
+        return Validator.validateConnections(self.getAllDataSlots(True), pairs, check_limits)
+
+    def connectMany(self, pairs, check_limits=True):
+        """
+        Create DataLinks between data slots given by pairs of their UIDs.
+
+        The pairs are validated first, then the paths of all the DataLinks are computed and the DataLinks are added
+        to the scene in one batch with the scene index rebuilt once.
+        :param bool check_limits: whether the maximal number of DataLinks of the data slots is checked, the DataLinks
+            mirroring the existing ones of the real workflow are not limited
+        :rtype: list of DataLink
+        """
+        valid, errors = self.validateConnections(pairs, check_limits)
+        for error in errors:
+            print(error)
+
+        data_links = []
+        for source, target in valid:
+            data_link = DataLink()
+            data_link.source = source
+            data_link.target = target
+            source.dataLinks.append(data_link)
+            target.dataLinks.append(data_link)
+            self.workflow.graph_index.addDataLink(data_link)
+            data_link.updatePath()
+            data_links.append(data_link)
+
+        scene = self.getScene()
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        for data_link in data_links:
+            scene.addItem(data_link)
+        scene.setItemIndexMethod(index_method)
+        for source, target in valid:
+            for slot in (source, target):
+                self.workflow.validator.updateDataSlot(slot)
+                slot.updateColor()
+        return data_links
+
     def getDataSlotWithName(self, name):
         """Return matching data slot by its name, None otherwise."""
         for slot in self.getDataSlots():
@@ -155,7 +213,7 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
     def getDataSlot(self, name=None, uuid=None, parent_uuid=None, recursive_search=False):
         if name or uuid or parent_uuid:
             for slot in self.getAllDataSlots(recursive_search):
-                if (not name or (slot.name == name and slot.name)) and (not uuid or (slot.uid == uuid and slot.uuid)) and (not parent_uuid or (slot.getParentUUID() == parent_uuid and slot.getParentUUID())):
+                if (not name or (slot.name == name and slot.name)) and (not uuid or slot.getUID() == uuid) and (not parent_uuid or (slot.getParentUUID() == parent_uuid and slot.getParentUUID())):
                     return slot
         return None
 
@@ -237,6 +295,7 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
     def sizeHint(self, which, constraint):
         return QtCore.QSizeF(self.w, self.h)
 
+    @instrumentation.timed('BlockVisual.updateChildrenPosition')
     def updateChildrenPosition(self):
 
         self.header.setX(0)
@@ -276,6 +335,10 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         self.w = width_child_max + self.spacing * 2
         self.h = height_of_all_content
 
+        # the header and menu button follow the block's width here, not when they are painted
+        self.header.updateWidth()
+        self.button_menu.updatePosition()
+
         #
         # set horizontal position of all elements
         #
@@ -375,14 +438,16 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
 
         self.updateChildrenPosition()
 
+    @instrumentation.timed('BlockVisual.callUpdatePositionOfWholeWorkflow')
     def callUpdatePositionOfWholeWorkflow(self):
         self.workflow.updateChildrenSizeAndPositionAndResizeSelf()
         self.workflow.widget.view.redrawDataLinks()
 
+    @instrumentation.timed('BlockVisual.paint')
     def paint(self, painter, option, widget):
         """Draw the Node's container rectangle."""
-        painter.setBrush(QtGui.QBrush(self.fillColor))
-        painter.setPen(QtGui.QPen(QtGui.QColor(20, 20, 20)))
+        painter.setBrush(self.brush)
+        painter.setPen(self.pen)
         painter.drawRoundedRect(self.x,
                                 self.y,
                                 self.w,
@@ -391,18 +456,34 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
                                 self.roundness)
 
     def getConnectedDataLinks(self):
-        answer = []
-        for dataslot in self.getDataSlots():
-            for datalink in dataslot.dataLinks:
-                answer.append(datalink)
-        return answer
+        """
+        :rtype: list of DataLink
+        """
+        return self.workflow.graph_index.getDataLinks(self)
+
+    def highlightConnectedDataLinks(self, highlight):
+        """Highlight the DataLinks connecting this block with the blocks it exchanges data with."""
+        for data_link in self.getConnectedDataLinks():
+            data_link.highlight(highlight)
+
+    def hoverEnterEvent(self, event):
+        # the workflow block covers the whole scene
+        if self.parent is not None:
+            self.highlightConnectedDataLinks(True)
+        super(BlockVisual, self).hoverEnterEvent(event)
+
+    def hoverLeaveEvent(self, event):
+        if self.parent is not None:
+            self.highlightConnectedDataLinks(False)
+        super(BlockVisual, self).hoverLeaveEvent(event)
 
     def updateDataLinksPath(self):
-        nodes = self.getChildExecutionBlocks(None, True)
-        for node in nodes:
-            for dataslot in node.getDataSlots():
-                for datalink in dataslot.dataLinks:
-                    datalink.updatePath()
+        """Update the paths of the DataLinks of all the nested child blocks, each DataLink once."""
+        data_links = {}
+        for node in self.getChildExecutionBlocks(None, True):
+            data_links.update(dict.fromkeys(node.getConnectedDataLinks()))
+        for data_link in data_links:
+            data_link.updatePath()
 
     def mouseMoveEvent(self, event):
         """Update selected item's (and children's) positions as needed.
@@ -414,9 +495,8 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         """
         nodes = self.scene.selectedItems()
         for node in nodes:
-            for knob in node.getDataSlots():
-                for edge in knob.dataLinks:
-                    edge.updatePath()
+            for edge in node.getConnectedDataLinks():
+                edge.updatePath()
         super(BlockVisual, self).mouseMoveEvent(event)
 
     def destroy(self):
@@ -424,6 +504,9 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         # TODO fix it
         self.header.destroy()
         self.button_menu.destroy()
+        if self.menu is not None:
+            self.menu.deleteLater()
+            self.menu = None
         for label in self.getLabels()[:]:
             label.destroy()
         for slot in self.getDataSlots()[:]:
@@ -439,8 +522,7 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
 
     def addMenuItems(self, menu):
         def _queryToWorkflowGenerator(uid, keyword, value):
-            self.getRealBlock().getWorkflowBlock().modificationQueryForItemWithUID(uid, keyword, value)
-            self.getApplication().reGenerateAll()
+            self.getApplication().modificationQueryForItemWithUID(uid, keyword, value)
 
         def _getTextValue(inp_caption):
             """
@@ -525,14 +607,23 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
             if new_value is not None:
                 _queryToWorkflowGenerator(uid, keyword, new_value)
 
+        def _addSubMenu(menu, wg_submenu):
+            """Add submenu, which is filled just before it is shown for the first time."""
+            sub_menu = menu.addMenu(wg_submenu.getName())
+
+            def _fillSubMenu():
+                sub_menu.aboutToShow.disconnect(_fillSubMenu)
+                _generateMenu(sub_menu, wg_submenu)
+
+            sub_menu.aboutToShow.connect(_fillSubMenu)
+
         def _generateMenu(menu, wg_menu):
             """
             :param menu:
             :param workflowgenerator.VisualMenu.VisualMenu wg_menu:
             """
             for wg_submenu in wg_menu.getMenus():
-                sub_menu = menu.addMenu(wg_submenu.getName())
-                _generateMenu(sub_menu, wg_submenu)
+                _addSubMenu(menu, wg_submenu)
 
             for wg_item in wg_menu.getItems():
                 action = menu.addAction(wg_item.getText())
@@ -548,19 +639,19 @@ class BlockVisual (QtWidgets.QGraphicsWidget):
         self.showMenu()
 
     def showMenu(self):
-        widget = self.workflow.widget
-        menu = QtWidgets.QMenu(widget)
-        self.addMenuItems(menu)
-        menu.exec(QtGui.QCursor.pos())
+        if self.menu is None:
+            self.menu = QtWidgets.QMenu(self.workflow.widget)
+            self.addMenuItems(self.menu)
+        self.menu.exec(QtGui.QCursor.pos())
 
     def getParentUUID(self):
         if self.parentItem():
-            return self.parentItem().uuid
+            return self.parentItem().getUID()
         else:
             return None
 
     def getDictForJSON(self):
-        answer = {'classname': self.__class__.__name__, 'uuid': self.uuid, 'parent_uuid': self.getParentUUID()}
+        answer = {'classname': self.__class__.__name__, 'uuid': self.getUID(), 'parent_uuid': self.getParentUUID()}
         return answer
 
     def convertToJSON(self):
@@ -2,10 +2,17 @@ from PyQt5 import QtGui
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from .helpers import getTextSize
+from . import instrumentation
 
 
 class Button(QtWidgets.QGraphicsItem):
     """ """
+    fillColor = QtGui.QColor(255, 255, 255)
+    textColor = QtGui.QColor(0, 0, 0)
+    # shared by all the buttons, so that they are not created on each repaint
+    brush = QtGui.QBrush(fillColor)
+    textPen = QtGui.QPen(textColor)
+
     def __init__(self, parent, text, **kwargs):
         QtWidgets.QGraphicsItem.__init__(self, **kwargs)
         self.parent = parent
@@ -15,9 +22,6 @@ class Button(QtWidgets.QGraphicsItem):
 
         # self.fillColor_normal = QtGui.QColor(255, 255, 255)
         # self.fillColor_hover = QtGui.QColor(200, 200, 200)
-        self.fillColor = QtGui.QColor(255, 255, 255)
-
-        self.textColor = QtGui.QColor(0, 0, 0)
 
     def boundingRect(self):
         rect = QtCore.QRectF(self.x(),
@@ -27,19 +31,16 @@ class Button(QtWidgets.QGraphicsItem):
         return rect
 
     def updatePosition(self):
-        self.setX(self.parent.header.w / 2 - self.w / 2)
-        self.setY(0)
+        self.setPos(self.parent.header.w / 2 - self.w / 2, 0)
 
+    @instrumentation.timed('Button.paint')
     def paint(self, painter, option, widget):
-        self.updatePosition()
         text_size = getTextSize(self.text, painter=painter)
 
-        painter.setPen(QtGui.QPen(self.textColor))
-        painter.setBrush(QtGui.QBrush(self.fillColor))
+        painter.setPen(self.textPen)
+        painter.setBrush(self.brush)
         painter.drawRoundedRect(self.boundingRect(), self.parent.roundness, self.parent.roundness)
 
-        painter.setPen(QtGui.QPen(self.textColor))
-
         painter.drawText(int(self.x() + (self.w - text_size.width()) / 2),
                          int(self.y() + (self.h + text_size.height() / 2) / 2),
                          self.text)
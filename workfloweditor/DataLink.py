@@ -4,6 +4,7 @@ from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 import uuid
 from . import helpers
+from . import instrumentation
 from .exceptions import DuplicateKnobNameError, KnobConnectionError
 import os
 from enum import Enum
@@ -26,7 +27,38 @@ def getLastStrAfterDot(val):
 class DataSlot(QtWidgets.QGraphicsItem):
     """
     Class describing input/output parameter of block
+
+    The constant sizes, colors and defaults are class attributes shared by all the instances, the instance attributes
+    are assigned only when they differ. Qt items cannot use __slots__, as the sip wrapper always has __dict__.
     """
+    w = 14
+    h = 14
+    spacing = 5
+    external = False
+    maxConnections = -1  # A negative value means 'unlimited'.
+    code_name = ""
+    hover = False
+    # highlighted by the Validator as the reason of inconsistency of the workflow
+    invalid = False
+    # Temp store for DataLink currently being created.
+    temp_data_link = None
+
+    labelColor = QtGui.QColor(10, 10, 10)
+    fillColor_not_connected = QtGui.QColor(255, 50, 50)
+    fillColor_regular = QtGui.QColor(100, 100, 100)
+    fillColor_optional = QtGui.QColor(50, 200, 50)
+    fillColor_highlight = QtGui.QColor(255, 255, 0)
+
+    # pens and brushes of the states, so that they are not created on each repaint
+    labelPen = QtGui.QPen(labelColor)
+    noPen = QtGui.QPen(QtCore.Qt.NoPen)
+    noBrush = QtGui.QBrush(QtCore.Qt.NoBrush)
+    fillBrush_not_connected = QtGui.QBrush(fillColor_not_connected)
+    fillBrush_regular = QtGui.QBrush(fillColor_regular)
+    fillBrush_optional = QtGui.QBrush(fillColor_optional)
+    fillBrush_highlight = QtGui.QBrush(fillColor_highlight)
+    invalidPen = QtGui.QPen(QtGui.QColor(255, 0, 0), 2)
+
     def __init__(self, slot_real, owner, name, type, optional=False, parent=None, obj_type=None, obj_id=0, uid=None):
         """
         :param workflowgenerator.DataSlot.DataSlot slot_real:
@@ -37,64 +69,37 @@ class DataSlot(QtWidgets.QGraphicsItem):
         :param Block.Block parent:
         :param obj_type:
         :param obj_id:
-        :param str or None uid:
+        :param str or None uid: ignored, the UID of the real slot is used
         """
         QtWidgets.QGraphicsItem.__init__(self, parent)
         self.name = name
         self.owner = owner
         self.type = type
-        self.optional = optional
-        self.external = False
+        self.optional = optional or isinstance(self, OutputDataSlot) or self.external
         self.obj_type = obj_type
         self.obj_id = obj_id
 
         self.slot_real = slot_real
 
-        self.code_name = ""
-
-        if isinstance(self, OutputDataSlot):
-            self.optional = True
-        if isinstance(self, ExternalInputDataSlot) or isinstance(self, ExternalOutputDataSlot):
-            self.optional = True
-            self.external = True
-
-        if uid:
-            self.uid = uid
-        else:
-            self.uid = str(uuid.uuid4())
-
         self.dataLinks = []  # data
-        self.hover = False
 
         # Qt
         self.x = 0
         self.y = 0
-        self.w = 14
-        self.h = 14
 
         self.w_tot = self.w
-        self.spacing = 5
-
-        self.maxConnections = -1  # A negative value means 'unlimited'.
-        if isinstance(self, InputDataSlot):
-            self.maxConnections = 1
 
         self.displayName = "DataSlot"
         self.updateDisplayName()
 
-        self.labelColor = QtGui.QColor(10, 10, 10)
-
-        self.fillColor_not_connected = QtGui.QColor(255, 50, 50)
-        self.fillColor_regular = QtGui.QColor(100, 100, 100)
-        self.fillColor_optional = QtGui.QColor(50, 200, 50)
-        self.fillColor_highlight = QtGui.QColor(255, 255, 0)
         self.fillColor = self.fillColor_regular
+        self.fillBrush = self.fillBrush_regular
         self.updateColor()
 
-        # Temp store for DataLink currently being created.
-        self.temp_data_link = None
         self.setAcceptHoverEvents(True)
 
+        self.owner.workflow.validator.addDataSlot(self)
+
     def __repr__(self):
         return "DataSlot (%s.%s %s)" % (self.getParentBlock(), self.name, self.type)
 
@@ -110,6 +115,10 @@ class DataSlot(QtWidgets.QGraphicsItem):
         """
         return self.getRealSlot().getUID()
 
+    @property
+    def uid(self):
+        return self.getUID()
+
     def getNeededWidth(self):
         """
         :rtype: int
@@ -128,28 +137,42 @@ class DataSlot(QtWidgets.QGraphicsItem):
         self.updateDisplayName()
 
     def updateColor(self):
+        """Select the color according to the state, it is called when the state changes instead of in paint()."""
         if self.hover:
-            self.fillColor = self.fillColor_highlight
+            fill_color, fill_brush = self.fillColor_highlight, self.fillBrush_highlight
         elif self.optional:
-            self.fillColor = self.fillColor_optional
+            fill_color, fill_brush = self.fillColor_optional, self.fillBrush_optional
         elif not self.connected():
-            self.fillColor = self.fillColor_not_connected
+            fill_color, fill_brush = self.fillColor_not_connected, self.fillBrush_not_connected
         else:
-            self.fillColor = self.fillColor_regular
+            fill_color, fill_brush = self.fillColor_regular, self.fillBrush_regular
+        if fill_brush is not self.fillBrush:
+            self.fillColor = fill_color
+            self.fillBrush = fill_brush
+            self.update()
 
-    def connectTo(self, target):
+    def getConnectionError(self, target):
+        """
+        Return the reason why this DataSlot cannot be connected to the target, None if it can.
 
+        :rtype: str or None
+        """
         if not isinstance(target, DataSlot):
-            print("Ignoring connection to all element types except DataSlot and derived classes.")
-            return
+            return "Ignoring connection to all element types except DataSlot and derived classes."
 
         if target is self:
-            print("Can't connect DataSlot to itself.")
-            return
+            return "Can't connect DataSlot to itself."
 
         if not ((isinstance(self, InputDataSlot) and isinstance(target, OutputDataSlot)) or (
                     isinstance(self, OutputDataSlot) and isinstance(target, InputDataSlot))):
-            print("Only InputDataSlot and OutputDataSlot can be connected.")
+            return "Only InputDataSlot and OutputDataSlot can be connected."
+
+        return None
+
+    def connectTo(self, target):
+        error = self.getConnectionError(target)
+        if error is not None:
+            print(error)
             return
 
         new_data_link = DataLink()
@@ -179,27 +202,33 @@ class DataSlot(QtWidgets.QGraphicsItem):
         Also make sure it is added to the QGraphicsScene, if not yet done.
         """
         self.dataLinks.append(data_link)
-        scene = self.scene()
-        if data_link not in scene.items():
-            scene.addItem(data_link)
+        self.owner.workflow.graph_index.addDataLink(data_link)
+        self.owner.workflow.validator.updateDataSlot(self)
+        if data_link.scene() is None:
+            self.scene().addItem(data_link)
+        self.updateColor()
 
     def removeDataConnection(self, data_link):
         """
         :param DataLink data_link:
         """
         self.dataLinks.remove(data_link)
-        scene = self.scene()
-        if data_link in scene.items():
-            scene.removeItem(data_link)
-
-    def setUUID(self, uid):
-        self.uid = uid
+        self.owner.workflow.graph_index.removeDataLink(data_link)
+        self.owner.workflow.validator.updateDataSlot(self)
+        if data_link.scene() is not None:
+            data_link.scene().removeItem(data_link)
+        self.updateColor()
 
     def boundingRect(self):
         """Return the bounding box of this element."""
         rect = QtCore.QRectF(self.x, self.y, self.w, self.h)
         return rect
 
+    def setInvalid(self, invalid):
+        if invalid != self.invalid:
+            self.invalid = invalid
+            self.update()
+
     def highlightConnectedDataLinks(self, highlight):
         for link in self.dataLinks:
             link.highlight(highlight)
@@ -215,15 +244,19 @@ class DataSlot(QtWidgets.QGraphicsItem):
             self.highlightConnectedDataLinks(False)
         self.updateColor()
 
+    @instrumentation.timed('DataSlot.paint')
     def paint(self, painter, option, widget):
         """Draw the DataSlot's shape and label."""
-        self.updateColor()
         bbox = self.boundingRect()
 
         # Draw a filled rectangle.
-        painter.setPen(QtGui.QPen(QtCore.Qt.NoPen))
-        painter.setBrush(QtGui.QBrush(self.fillColor))
+        painter.setPen(self.noPen)
+        painter.setBrush(self.fillBrush)
         painter.drawRect(bbox)
+        if self.invalid:
+            painter.setPen(self.invalidPen)
+            painter.setBrush(self.noBrush)
+            painter.drawRect(bbox.adjusted(1, 1, -1, -1))
 
         # Draw a text label next to it. Position depends on the flow.
         text_size = helpers.getTextSize(self.displayName, painter=painter)
@@ -234,7 +267,7 @@ class DataSlot(QtWidgets.QGraphicsItem):
             x = bbox.left() - self.spacing - text_size.width()
         y = bbox.bottom()
 
-        painter.setPen(QtGui.QPen(self.labelColor))
+        painter.setPen(self.labelPen)
         painter.drawText(int(x), int(y), self.displayName)
 
         # draw empty rect on the other side of the text in case of external DataSlot
@@ -245,8 +278,8 @@ class DataSlot(QtWidgets.QGraphicsItem):
                 empty_box_x = self.x - self.w_tot + self.w
 
             empty_box = QtCore.QRectF(empty_box_x, self.y, self.w, self.h)
-            painter.setPen(QtGui.QPen(self.labelColor))
-            painter.setBrush(QtGui.QBrush(QtCore.Qt.NoBrush))
+            painter.setPen(self.labelPen)
+            painter.setBrush(self.noBrush)
             painter.drawRect(empty_box)
 
     def hoverEnterEvent(self, event):
@@ -289,9 +322,7 @@ class DataSlot(QtWidgets.QGraphicsItem):
                 self.temp_data_link = None
                 target = block.scene.itemAt(x, y, qtr)
                 if isinstance(target, DataSlot):
-                    self.getParentBlock().getRealBlock().getWorkflowBlock().connectSlotsWithUID(
-                        self.getUID(), target.getUID())
-                    self.getParentBlock().getApplication().reGenerateAll()
+                    self.getParentBlock().getApplication().connectSlotsWithUID(self.getUID(), target.getUID())
                 else:
                     print("No DataSlot found.")
 
@@ -320,6 +351,7 @@ class DataSlot(QtWidgets.QGraphicsItem):
         datalink_to_be_deleted = self.dataLinks[::]  # Avoid shrinking during deletion.
         for data_link in datalink_to_be_deleted:
             data_link.destroy()
+        self.owner.workflow.validator.removeDataSlot(self)
         self.scene().removeItem(self)
         del self
 
@@ -334,22 +366,20 @@ class DataSlot(QtWidgets.QGraphicsItem):
             temp = QtWidgets.QInputDialog()
             new_name, ok_pressed = QtWidgets.QInputDialog.getText(temp, "Change name of the slot", "", text=self.name)
             if ok_pressed:
-                self.getParentBlock().getRealBlock().getWorkflowBlock().modificationQuery(
+                self.getParentBlock().getApplication().modificationQuery(
                     'set_dataslot_name',
                     [self.getUID(), new_name]
                 )
-                self.getParentBlock().getApplication().reGenerateAll()
 
         if self.external:
             rename_slot_action = sub_menu.addAction("Rename")
             rename_slot_action.triggered.connect(_rename)
 
         def _delete():
-            self.getParentBlock().getRealBlock().getWorkflowBlock().modificationQuery(
+            self.getParentBlock().getApplication().modificationQuery(
                 'delete_dataslot',
                 self.getUID()
             )
-            self.getParentBlock().getApplication().reGenerateAll()
 
         if self.external:
             delete_slot_action = sub_menu.addAction("Delete")
@@ -359,13 +389,10 @@ class DataSlot(QtWidgets.QGraphicsItem):
 
         def _delete_data_link(datalink_id):
             data_link_to_delete = self.dataLinks[datalink_id]
-            self.getParentBlock().getRealBlock().getWorkflowBlock().modificationQuery(
+            self.getParentBlock().getApplication().modificationQuery(
                 'delete_datalink',
                 [self.getUID(), data_link_to_delete.giveTheOtherSlot(self).getUID()]
             )
-            self.getParentBlock().getApplication().reGenerateAll()
-
-            self.getParentBlock().getApplication().reGenerateAll()
 
         data_links = self.dataLinks
         idx = 0
@@ -384,12 +411,12 @@ class DataSlot(QtWidgets.QGraphicsItem):
 
     def getParentUUID(self):
         if self.parentItem():
-            return self.parentItem().uid
+            return self.parentItem().getUID()
         else:
             return None
 
     def getDictForJSON(self):
-        answer = {'classname': self.__class__.__name__, 'uuid': self.uid, 'parent_uuid': self.getParentUUID()}
+        answer = {'classname': self.__class__.__name__, 'uuid': self.getUID(), 'parent_uuid': self.getParentUUID()}
         answer.update({'name': self.name, 'type': "%s" % self.type})
         answer.update({'obj_id': self.obj_id, 'obj_type': "%s" % self.obj_type})
         return answer
@@ -419,6 +446,7 @@ class DataSlot(QtWidgets.QGraphicsItem):
 
 
 class InputDataSlot (DataSlot):
+    maxConnections = 1
 
     def __init__(self, slot_real, owner, name, type, optional=False, parent=None, obj_type=None, obj_id=0, uid=None):
         """
@@ -459,6 +487,8 @@ class OutputDataSlot (DataSlot):
 
 
 class ExternalInputDataSlot(InputDataSlot):
+    external = True
+
     def __init__(self, slot_real, owner, name, type, optional=True, parent=None, obj_type=None, obj_id=0, uid=None):
         """
         :param workflowgenerator.DataSlot.DataSlot slot_real:
@@ -480,6 +510,8 @@ class ExternalInputDataSlot(InputDataSlot):
 
 
 class ExternalOutputDataSlot(OutputDataSlot):
+    external = True
+
     def __init__(self, slot_real, owner, name, type, optional=True, parent=None, obj_type=None, obj_id=0, uid=None):
         """
         :param workflowgenerator.DataSlot.DataSlot slot_real:
@@ -504,15 +536,36 @@ class DataLink(QtWidgets.QGraphicsPathItem):
     """
     Represents a connection between source and receiver DataSlots
     """
+    lineColor_default = QtGui.QColor(50, 200, 100)
+    lineColor_highlight = QtGui.QColor(255, 0, 0)
+    opacity_default = 1.0
+    removalColor = QtGui.QColor(QtCore.Qt.red)
+    thickness = 3
+    # pens of the normal, highlighted and removal state shared by all the links
+    pen_default = QtGui.QPen(lineColor_default, thickness)
+    pen_highlight = QtGui.QPen(lineColor_highlight, thickness)
+    pen_removal = QtGui.QPen(removalColor, thickness)
+    noBrush = QtGui.QBrush(QtCore.Qt.NoBrush)
+
+    curv1 = 0.6
+    curv3 = 0.4
+
+    curv2 = 0.2
+    curv4 = 0.8
+
+    # shared state of all the links switched by GraphView.setRemovalMode while the delete modifier is pressed
+    removal_mode = False
+
+    # the UID is created only when it is asked for
+    uuid = None
+    temporary = False
+
     def __init__(self, input=None, output=None, **kwargs):
         super(DataLink, self).__init__(**kwargs)
-        self.lineColor_default = QtGui.QColor(50, 200, 100)
         self.lineColor = self.lineColor_default
-        self.opacity_default = 1.0
+        self.setPen(self.pen_default)
+        self.setZValue(1)
         self.setOpacity(self.opacity_default)
-        self.removalColor = QtCore.Qt.red
-        self.thickness = 3
-        self.uuid = str(uuid.uuid4())
 
         self.source = None  # DataProvider slot
         self.target = None  # DataConsumer slot
@@ -520,16 +573,8 @@ class DataLink(QtWidgets.QGraphicsPathItem):
         self.sourcePos = QtCore.QPointF(0, 0)
         self.targetPos = QtCore.QPointF(0, 0)
 
-        self.curv1 = 0.6
-        self.curv3 = 0.4
-
-        self.curv2 = 0.2
-        self.curv4 = 0.8
-
         self.setAcceptHoverEvents(False)
 
-        self.temporary = False
-
     def __str__(self):
         return "Datalink (%s -> %s)" % (self.source, self.target)
 
@@ -537,6 +582,8 @@ class DataLink(QtWidgets.QGraphicsPathItem):
         return self.__str__()
 
     def getUID(self):
+        if self.uuid is None:
+            self.uuid = str(uuid.uuid4())
         return self.uuid
 
     def setUID(self, val):
@@ -544,10 +591,12 @@ class DataLink(QtWidgets.QGraphicsPathItem):
 
     def highlight(self, highlight):
         if highlight:
-            self.lineColor = QtGui.QColor(255, 0, 0)
+            self.lineColor = self.lineColor_highlight
+            self.setPen(self.pen_highlight)
             self.setOpacity(1.)
         else:
             self.lineColor = self.lineColor_default
+            self.setPen(self.pen_default)
             self.setOpacity(self.opacity_default)
 
     def mousePressEvent(self, event):
@@ -557,6 +606,7 @@ class DataLink(QtWidgets.QGraphicsPathItem):
         if left_mouse and mod:
             self.destroy()
 
+    @instrumentation.timed('DataLink.updatePath')
     def updatePath(self):
         """Adjust current shape based on DataSlots and curvature settings."""
         if self.source:
@@ -580,18 +630,16 @@ class DataLink(QtWidgets.QGraphicsPathItem):
         path.cubicTo(ctrl1, ctrl2, self.targetPos)
         self.setPath(path)
 
+    @instrumentation.timed('DataLink.paint')
     def paint(self, painter, option, widget):
-        """Paint DataLink color depending on modifier key pressed or not."""
-        mod = QtWidgets.QApplication.keyboardModifiers() == DELETE_MODIFIER_KEY
-        if mod:
-            self.setPen(QtGui.QPen(self.removalColor, self.thickness))
-        else:
-            self.setPen(QtGui.QPen(self.lineColor, self.thickness))
+        """Paint DataLink color depending on the removal mode.
 
-        # self.setBrush(QtCore.Qt.NoBrush)
-        self.setZValue(1)
-        # self.setOpacity(0.5)
-        super(DataLink, self).paint(painter, option, widget)
+        The pen of the item is set when its state changes, the removal pen is only passed to the painter, so that
+        painting does not change the item.
+        """
+        painter.setPen(self.pen_removal if self.removal_mode else self.pen())
+        painter.setBrush(self.noBrush)
+        painter.drawPath(self.path())
 
     def destroy(self):
         """Remove this DataLink and its reference in other objects."""
@@ -616,7 +664,7 @@ class DataLink(QtWidgets.QGraphicsPathItem):
         return None
 
     def getDictForJSON(self):
-        answer = {'classname': self.__class__.__name__, 'uuid': self.uuid}
-        answer.update({'ds1_uuid': self.source.uuid, 'ds2_uuid': self.target.uuid})
+        answer = {'classname': self.__class__.__name__, 'uuid': self.getUID()}
+        answer.update({'ds1_uuid': self.source.getUID(), 'ds2_uuid': self.target.getUID()})
         return answer
 
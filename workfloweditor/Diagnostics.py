@@ -0,0 +1,74 @@
+import os
+from PyQt5 import QtCore
+from PyQt5 import QtWidgets
+from . import instrumentation
+
+
+REFRESH_INTERVAL = 1000
+
+
+class DiagnosticsDock(QtWidgets.QDockWidget):
+    """Dockable live table of the operations recorded by the instrumentation."""
+    def __init__(self, parent):
+        super(DiagnosticsDock, self).__init__("Diagnostics", parent)
+        self.setAllowedAreas(QtCore.Qt.LeftDockWidgetArea | QtCore.Qt.RightDockWidgetArea)
+
+        self.table = QtWidgets.QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Operation", "Calls", "Total [ms]", "Mean [us]"])
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+
+        reset_button = QtWidgets.QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        dump_button = QtWidgets.QPushButton("Dump to JSON")
+        dump_button.clicked.connect(self.dump)
+
+        container = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(container)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(self.table)
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(reset_button)
+        buttons.addWidget(dump_button)
+        layout.addLayout(buttons)
+        self.setWidget(container)
+
+        # the table is refreshed only while it is visible
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.updateTable)
+        self.visibilityChanged.connect(self._visibilityChanged)
+
+    def _visibilityChanged(self, visible):
+        if visible:
+            self.updateTable()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def updateTable(self):
+        statistics = sorted(instrumentation.getStatistics().items(), key=lambda item: -item[1]['total'])
+        self.table.setRowCount(len(statistics))
+        for row, (name, entry) in enumerate(statistics):
+            values = [name, "%d" % entry['count'], "%.1f" % (entry['total'] * 1e3),
+                      "%.1f" % (entry['total'] / entry['count'] * 1e6)]
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset(self):
+        instrumentation.reset()
+        self.updateTable()
+
+    def dump(self):
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Dump Diagnostics to JSON File",
+            os.path.join(QtCore.QDir.currentPath(), "diagnostics.json"),
+            "JSON File (*.json)"
+        )
+        if file_path:
+            instrumentation.dumpToFile(file_path)
@@ -0,0 +1,45 @@
+class GraphIndex:
+    """
+    Index of the DataLinks of the workflow by the blocks they connect.
+
+    It is kept by the workflow BlockVisual and updated whenever a DataLink is added to or removed from DataSlots, so
+    that the DataLinks of a block, which are redrawn when it moves and highlighted when it is hovered, are obtained
+    without scanning its slots. A DataLink is indexed under the blocks of both its DataSlots.
+
+    The index is not kept across Application.reGenerateAll, which creates a new workflow BlockVisual and thus a new
+    index filled again by connectMany after each modification of the workflow.
+    """
+    def __init__(self):
+        self.links = set()
+        # dictionaries keep the order in which the DataLinks were connected
+        self.links_by_block = {}
+
+    def __len__(self):
+        return len(self.links)
+
+    def addDataLink(self, data_link):
+        """Add DataLink connecting two DataSlots, temporary and already indexed DataLinks are ignored."""
+        if data_link in self.links or data_link.temporary or data_link.source is None or data_link.target is None:
+            return
+        self.links.add(data_link)
+        for slot in (data_link.source, data_link.target):
+            self.links_by_block.setdefault(slot.getParentBlock(), {})[data_link] = None
+
+    def removeDataLink(self, data_link):
+        """Remove DataLink, which is not indexed, is ignored."""
+        if data_link not in self.links:
+            return
+        self.links.remove(data_link)
+        for slot in (data_link.source, data_link.target):
+            block = slot.getParentBlock()
+            links = self.links_by_block.get(block)
+            if links is not None:
+                links.pop(data_link, None)
+                if not links:
+                    del self.links_by_block[block]
+
+    def getDataLinks(self, block):
+        """
+        :rtype: list of DataLink.DataLink
+        """
+        return list(self.links_by_block.get(block, ()))
@@ -3,10 +3,11 @@ from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from . import DataLink
 from . import Block
+from . import helpers
+from . import instrumentation
 
 
 CURRENT_ZOOM = 1.0
-ALTERNATE_MODE_KEY = QtCore.Qt.Key_Alt
 
 
 class GraphView(QtWidgets.QGraphicsView):
@@ -46,23 +47,40 @@ class GraphView(QtWidgets.QGraphicsView):
         """Return all Edges in the scene."""
         return [i for i in self.scene().items() if isinstance(i, DataLink.DataLink)]
 
+    @instrumentation.timed('GraphView.redrawDataLinks')
     def redrawDataLinks(self):
         """Trigger a repaint of all Edges in the scene."""
         for edge in self.getDataLinks():
             edge.updatePath()
 
+    def setRemovalMode(self, removal_mode):
+        """Switch the pen of all the DataLinks to show that they are deleted on click and repaint the scene once."""
+        if DataLink.DataLink.removal_mode != removal_mode:
+            DataLink.DataLink.removal_mode = removal_mode
+            self.scene().update()
+
+    def updateRemovalMode(self, event):
+        """
+        Switch the DataLinks into the removal mode while exactly DataLink.DELETE_MODIFIER_KEY is held.
+
+        The DataLinks are deleted on click with exactly this modifier, so e.g. Shift held with it switches the mode off.
+        """
+        if event.key() in helpers.MODIFIER_OF_KEY:
+            self.setRemovalMode(helpers.getModifiersAfterKeyEvent(event) == DataLink.DELETE_MODIFIER_KEY)
+
     def keyPressEvent(self, event):
-        """Trigger a redraw of Edges to update their color."""
-        if event.key() == ALTERNATE_MODE_KEY:
-            self.redrawDataLinks()
+        self.updateRemovalMode(event)
         super(GraphView, self).keyPressEvent(event)
 
     def keyReleaseEvent(self, event):
-        """Trigger a redraw of Edges to update their color."""
-        if event.key() == ALTERNATE_MODE_KEY:
-            self.redrawDataLinks()
+        self.updateRemovalMode(event)
         super(GraphView, self).keyReleaseEvent(event)
 
+    def focusOutEvent(self, event):
+        # the key release is not received when the view loses focus
+        self.setRemovalMode(False)
+        super(GraphView, self).focusOutEvent(event)
+
     def mousePressEvent(self, event):
         """Initiate custom panning using middle mouse button."""
         if event.button() == QtCore.Qt.MiddleButton:
@@ -102,6 +120,10 @@ class GraphView(QtWidgets.QGraphicsView):
     #     global CURRENT_ZOOM
     #     CURRENT_ZOOM = self.transform().m11()
 
+    @instrumentation.timed('GraphView.paintEvent')
+    def paintEvent(self, event):
+        super(GraphView, self).paintEvent(event)
+
     def drawBackground(self, painter, rect):
         painter.setBrush(QtGui.QBrush(self.fillColor))
         painter.setPen(QtGui.QPen(self.lineColor))
@@ -2,6 +2,7 @@ from PyQt5 import QtGui
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from .helpers import getTextSize
+from . import instrumentation
 
 
 class Header(QtWidgets.QGraphicsItem):
@@ -9,42 +10,50 @@ class Header(QtWidgets.QGraphicsItem):
 
     Its width resizes automatically to match the block's width minus the menu button's width.
     """
+    fillColor = QtGui.QColor(90, 90, 90)
+    textColor = QtGui.QColor(240, 240, 240)
+    # the pens and brushes of the normal and selected state are shared by all the headers
+    pen = QtGui.QPen(fillColor)
+    brush = QtGui.QBrush(fillColor)
+    textPen = QtGui.QPen(textColor)
+    textPen_selected = QtGui.QPen(QtGui.QColor(255, 255, 0))
+
     def __init__(self, parent, text, **kwargs):
         QtWidgets.QGraphicsItem.__init__(self, **kwargs)
         self.parent = parent
         self.text = text
         self.h = 20
         self.w = 20
-        self.fillColor = QtGui.QColor(90, 90, 90)
-        self.textColor = QtGui.QColor(240, 240, 240)
 
     def updateWidth(self):
-        self.w = self.parent.w
+        if self.w != self.parent.w:
+            self.prepareGeometryChange()
+            self.w = self.parent.w
 
     def boundingRect(self):
-        self.updateWidth()
         rect = QtCore.QRectF(self.x(),
                              self.y(),
                              self.w,
                              self.h)
         return rect
 
+    @instrumentation.timed('Header.paint')
     def paint(self, painter, option, widget):
         text_size = getTextSize(self.text, painter=painter)
         bbox = self.boundingRect()
 
         # painter.setPen(QtGui.QPen(QtCore.Qt.NoPen))
-        painter.setPen(QtGui.QPen(self.fillColor))
-        painter.setBrush(QtGui.QBrush(self.fillColor))
+        painter.setPen(self.pen)
+        painter.setBrush(self.brush)
         painter.drawRoundedRect(bbox,
                                 self.parent.roundness,
                                 self.parent.roundness)
 
         # Draw header label.
         if self.parent.isSelected():
-            painter.setPen(QtGui.QPen(QtGui.QColor(255, 255, 0)))
+            painter.setPen(self.textPen_selected)
         else:
-            painter.setPen(QtGui.QPen(self.textColor))
+            painter.setPen(self.textPen)
 
         painter.drawText(self.x() + self.parent.spacing,
                          self.y() + (self.h + text_size.height() / 2) / 2,
@@ -0,0 +1,335 @@
+import functools
+from PyQt5 import QtWidgets
+
+
+def _findItem(block, uid):
+    """
+    Return block or data slot with given UID from the subtree of given block, None if it is not found.
+
+    :rtype: Block.BlockVisual or DataLink.DataSlot or None
+    """
+    if block.getUID() == uid:
+        return block
+    for slot in block.getDataSlots():
+        if slot.getUID() == uid:
+            return slot
+    for child in block.getBlocks():
+        item = _findItem(child, uid)
+        if item is not None:
+            return item
+    return None
+
+
+def _isBlock(item):
+    return hasattr(item, 'getRealBlock')
+
+
+def _getDataLinks(slot):
+    """Return real DataLinks of given data slot."""
+    return [data_link for data_link in slot.dataLinks
+            if not data_link.temporary and data_link.source is not None and data_link.target is not None]
+
+
+def _getPreOrder(block):
+    """Return the block, its data slots and its child blocks recursively in the order of the workflow elements."""
+    items = [block]
+    items.extend(block.getDataSlots())
+    for child in block.getBlocks():
+        items.extend(_getPreOrder(child))
+    return items
+
+
+def _findRealItem(block, uid, parent=None):
+    """
+    Return real block or data slot with given UID from the subtree of given real block and its parent block.
+
+    :rtype: (object, object) or (None, None)
+    """
+    if block.getUID() == uid:
+        return block, parent
+    for slot in block.getDataSlots():
+        if slot.getUID() == uid:
+            return slot, block
+    for child in block.getBlocks():
+        item, item_parent = _findRealItem(child, uid, block)
+        if item is not None:
+            return item, item_parent
+    return None, None
+
+
+def _getRealChildren(parent, item):
+    """
+    Return the list of child blocks or data slots of the real block, which contains given item.
+
+    The workflowgenerator blocks keep them in the lists blocks and slots, to which addBlock and addDataSlot append.
+    :rtype: list
+    """
+    return parent.blocks if hasattr(item, 'getBlocks') else parent.slots
+
+
+def removeItems(workflow, uids):
+    """
+    Remove the real blocks and data slots with given UIDs, their DataLinks have to be deleted before.
+
+    :param workflowgenerator.BlockWorkflow.BlockWorkflow workflow:
+    :param list uids:
+    """
+    for uid in uids:
+        item, parent = _findRealItem(workflow, uid)
+        if parent is not None:
+            _getRealChildren(parent, item).remove(item)
+
+
+def insertItems(workflow, parent_uid, position, elements):
+    """
+    Construct the real blocks or data slots from their elements and insert them into given parent block.
+
+    The elements are constructed by the workflowgenerator in a new workflow standing for the parent block, so that
+    the cost is proportional to their number, and then moved to the parent block starting at given position.
+    :param workflowgenerator.BlockWorkflow.BlockWorkflow workflow:
+    :param str parent_uid:
+    :param int position: index of the first item among the child blocks or data slots of the parent block
+    :param list elements: elements of the items in the order of BlockWorkflow.convertToJSON, without DataLinks
+    """
+    parent, _ = _findRealItem(workflow, parent_uid)
+    workflow_uid = workflow.getUID()
+    root = dict((key, parent_uid if val == workflow_uid else val) for key, val in workflow.getDictForJSON().items())
+    fragment = type(workflow)()
+    fragment.constructFromJSON([root] + list(elements))
+    for offset, item in enumerate(fragment.getBlocks() or fragment.getDataSlots()):
+        if hasattr(item, 'getBlocks'):
+            parent.addBlock(item)
+        else:
+            parent.addDataSlot(item)
+        children = _getRealChildren(parent, item)
+        children.remove(item)
+        children.insert(position + offset, item)
+
+
+# queries of the undo, which are applied by the editor, the other queries are methods of the real workflow
+ITEM_QUERIES = {
+    'removeItems': removeItems,
+    'insertItems': insertItems,
+}
+
+
+def getQueryFunction(workflow, query):
+    """
+    Return function applying given query to the real workflow, it is called with the arguments of the query.
+
+    :param workflowgenerator.BlockWorkflow.BlockWorkflow workflow:
+    :param str query:
+    """
+    if query in ITEM_QUERIES:
+        return functools.partial(ITEM_QUERIES[query], workflow)
+    return getattr(workflow, query)
+
+
+class ItemState:
+    """
+    State of a workflow item before a modification query, which is interpreted by the workflowgenerator.
+
+    The elements of the item (as in BlockWorkflow.convertToJSON) and the DataLinks of its data slots are recorded,
+    only for the touched item, not for the whole workflow. A data slot or a block is recorded with its data slots and
+    child blocks. The workflow block itself is recorded without its child blocks, only their UIDs are kept, so that
+    the child blocks added by the query are removed by the undo.
+
+    The undo is a list of queries replacing the current item by the recorded one, so that it costs only the size of
+    the item and it is journaled as any other modification: the DataLinks of the current item are deleted, the item
+    is removed (removeItems), the recorded one is constructed from its elements at the same position (insertItems)
+    and its DataLinks are connected again. Only when the query changed the element of the workflow block itself, which
+    cannot be separated from the rest of the workflow, the whole workflow is constructed again.
+    """
+    def __init__(self, item):
+        """:param Block.BlockVisual or DataLink.DataSlot item:"""
+        self.uid = item.getUID()
+        self.root = _isBlock(item) and item.parent is None
+        if not _isBlock(item):
+            slots = [item]
+            self.elements = [item.getRealSlot().getDictForJSON()]
+        elif self.root:
+            slots = item.getDataSlots()
+            self.elements = [item.getRealBlock().getDictForJSON()]
+            self.elements.extend(slot.getRealSlot().getDictForJSON() for slot in slots)
+            self.children = [child.getUID() for child in item.getBlocks()]
+        else:
+            items = _getPreOrder(item)
+            slots = [elem for elem in items if not _isBlock(elem)]
+            self.elements = [elem.getRealBlock().getDictForJSON() if _isBlock(elem)
+                             else elem.getRealSlot().getDictForJSON() for elem in items]
+        # position of the item among the child blocks or data slots of its parent
+        self.parent_uid = None
+        self.position = 0
+        if not self.root:
+            parent = item.getParentBlock() if not _isBlock(item) else item.parent
+            siblings = parent.getDataSlots() if not _isBlock(item) else parent.getBlocks()
+            self.parent_uid = parent.getUID()
+            self.position = siblings.index(item)
+        self.links = self._getLinks(slots)
+
+    @staticmethod
+    def _getLinks(slots):
+        links = {}
+        for slot in slots:
+            for data_link in _getDataLinks(slot):
+                links[data_link] = [data_link.source.getUID(), data_link.target.getUID()]
+        return list(links.values())
+
+    def getQueries(self, application):
+        """
+        Return queries replacing the current item by the recorded one.
+
+        :param Application.Application application:
+        :rtype: list of (str, list)
+        """
+        workflow_block = application.getWorkflowBlock()
+        queries = []
+        if not self.root:
+            item = _findItem(workflow_block, self.uid)
+            removed = [item] if item is not None else []
+            inserted = [('insertItems', [self.parent_uid, self.position, self.elements])]
+        else:
+            if workflow_block.getRealBlock().getDictForJSON() != self.elements[0]:
+                queries.append(('constructFromJSON', [self._getWorkflowElements(application.getRealWorkflow())]))
+            removed = [child for child in workflow_block.getBlocks() if child.getUID() not in self.children]
+            inserted = []
+            slots = workflow_block.getDataSlots()
+            if [slot.getRealSlot().getDictForJSON() for slot in slots] != self.elements[1:]:
+                removed.extend(slots)
+                inserted.append(('insertItems', [self.uid, 0, self.elements[1:]]))
+        removed_slots = [elem for item in removed for elem in (_getPreOrder(item) if _isBlock(item) else [item])
+                         if not _isBlock(elem)]
+        queries.extend(('modificationQuery', ['delete_datalink', link]) for link in self._getLinks(removed_slots))
+        if removed:
+            queries.append(('removeItems', [[item.getUID() for item in removed]]))
+        queries.extend(inserted)
+        queries.extend(('connectSlotsWithUID', list(link)) for link in self.links)
+        return queries
+
+    def _getWorkflowElements(self, workflow):
+        """Return elements of the whole workflow with the element of the workflow block replaced by the recorded one."""
+        elements = workflow.convertToJSON()
+        for i, elem in enumerate(elements):
+            # the first element referring to the workflow is the workflow itself
+            if any(isinstance(val, str) and val == self.uid for val in elem.values()):
+                elements[i] = self.elements[0]
+                break
+        return elements
+
+
+def _getInverseOfConnectSlotsWithUID(application, args):
+    """
+    The new DataLink is deleted and the DataLinks, which it replaced at the data slots with limited number of
+    connections, are connected again. Connecting already connected, incompatible or unknown data slots changes nothing.
+    """
+    workflow_block = application.getWorkflowBlock()
+    slot_1 = workflow_block.getDataSlotWithUID(args[0], True)
+    slot_2 = workflow_block.getDataSlotWithUID(args[1], True)
+    if slot_1 is None or slot_2 is None or slot_1.getConnectionError(slot_2) is not None:
+        return []
+    if any(data_link.giveTheOtherSlot(slot_1) is slot_2 for data_link in _getDataLinks(slot_1)):
+        return []
+    inverse = [('modificationQuery', ['delete_datalink', [args[0], args[1]]])]
+    for slot in (slot_1, slot_2):
+        data_links = _getDataLinks(slot)
+        if 0 <= slot.maxConnections <= len(data_links):
+            inverse.extend(('connectSlotsWithUID', [data_link.source.getUID(), data_link.target.getUID()])
+                           for data_link in data_links)
+    return inverse
+
+
+def _getInverseOfModificationQuery(application, args):
+    keyword, value = args
+    if keyword == 'delete_datalink':
+        slot = application.getWorkflowBlock().getDataSlotWithUID(value[0], True)
+        if slot is None:
+            return []
+        for data_link in _getDataLinks(slot):
+            if data_link.giveTheOtherSlot(slot).getUID() == value[1]:
+                return [('connectSlotsWithUID', [data_link.source.getUID(), data_link.target.getUID()])]
+        return []
+    if keyword == 'set_dataslot_name':
+        slot = application.getWorkflowBlock().getDataSlotWithUID(value[0], True)
+        if slot is not None:
+            return [('modificationQuery', ['set_dataslot_name', [value[0], slot.name]])]
+    return None
+
+
+INVERSE_QUERIES = {
+    'connectSlotsWithUID': _getInverseOfConnectSlotsWithUID,
+    'modificationQuery': _getInverseOfModificationQuery,
+}
+
+
+def getInverseQueries(application, query, args):
+    """
+    Return queries reverting given query applied to the current workflow, None if they are not known.
+
+    :rtype: list of (str, list) or None
+    """
+    function = INVERSE_QUERIES.get(query)
+    if function is not None:
+        return function(application, args)
+    return None
+
+
+def getTouchedUID(application, query, args):
+    """
+    Return UID of the workflow item modified by given query, the workflow itself if it is not known.
+
+    :rtype: str
+    """
+    workflow_block = application.getWorkflowBlock()
+    if query == 'modificationQueryForItemWithUID':
+        return args[0]
+    if query == 'modificationQuery':
+        value = args[1]
+        for uid in (value, value[0] if isinstance(value, list) and value else None):
+            if isinstance(uid, str) and _findItem(workflow_block, uid) is not None:
+                return uid
+    return workflow_block.getUID()
+
+
+class QueryCommand(QtWidgets.QUndoCommand):
+    """
+    Undoable batch of modification queries.
+
+    The undo applies the inverse queries in reverse order, so that the command costs only the size of the change.
+    The inverse queries are determined before the batch is applied. The queries, which are interpreted by the
+    workflowgenerator and whose inverse is therefore not known here, keep the state of the modified item before the
+    modification instead (see ItemState).
+    """
+    def __init__(self, application, text, queries):
+        """
+        :param Application.Application application:
+        :param str text:
+        :param queries: list of (query, args)
+        """
+        super(QueryCommand, self).__init__(text)
+        self.application = application
+        self.queries = [(query, list(args)) for query, args in queries]
+        # list of inverse queries or ItemState for each query
+        self.inverse = []
+        for query, args in self.queries:
+            inverse = getInverseQueries(application, query, args)
+            if inverse is None:
+                item = _findItem(application.getWorkflowBlock(), getTouchedUID(application, query, args))
+                inverse = ItemState(item if item is not None else application.getWorkflowBlock())
+            self.inverse.append(inverse)
+        self.inverse.reverse()
+
+    def redo(self):
+        self.application.executeQueries(self.queries)
+
+    def undo(self):
+        queries = []
+        for inverse in self.inverse:
+            if isinstance(inverse, ItemState):
+                if queries:
+                    self.application.executeQueries(queries)
+                    queries = []
+                self.application.restoreItemState(inverse)
+            else:
+                queries.extend(inverse)
+        if queries:
+            self.application.executeQueries(queries)
@@ -0,0 +1,176 @@
+import os
+import glob
+import queue
+import shutil
+import threading
+from . import serialization
+
+
+SNAPSHOT_INTERVAL = 100
+JOURNALED_QUERIES = ('modificationQuery', 'modificationQueryForItemWithUID', 'connectSlotsWithUID',
+                     'removeItems', 'insertItems', 'constructFromJSON')
+
+
+def getDefaultDirectory():
+    return os.path.join(os.path.expanduser('~'), '.workfloweditor', 'autosave')
+
+
+class Journal:
+    """
+    Append-only journal of the modification queries used for autosave and crash recovery.
+
+    Each query is written as one JSON line with increasing sequence number. Every snapshot_interval queries
+    a compacted snapshot of the whole workflow is written and the journal is truncated, so that the recovery
+    replays only the queries after the last snapshot. All the writing is done by a background thread.
+
+    The autosave of the previous session is moved into the recovery directory when the journal is created, so that
+    it stays recoverable after this session starts writing its own autosave.
+    """
+    def __init__(self, directory=None, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.directory = directory if directory is not None else getDefaultDirectory()
+        self.snapshot_interval = snapshot_interval
+        self.codec = serialization.getCodec()
+        self.seq = 0
+        self.entries_since_snapshot = 0
+        self.started = False
+        self.queue = queue.Queue()
+        self.journal_file = None
+        self.rotate()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def getRecoveryDirectory(self):
+        return os.path.join(self.directory, 'previous')
+
+    def getJournalPath(self, directory=None):
+        return os.path.join(self.directory if directory is None else directory, 'journal.jsonl')
+
+    def getSnapshotPath(self, seq):
+        return os.path.join(self.directory, 'snapshot-%08d.json' % seq)
+
+    def getSnapshots(self, directory=None):
+        """:rtype: list of (int, str)"""
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory if directory is None else directory, 'snapshot-*.json')):
+            try:
+                snapshots.append((int(os.path.basename(path)[9:-5]), path))
+            except ValueError:
+                pass
+        return sorted(snapshots)
+
+    def rotate(self):
+        """Move the autosave of the previous session into the recovery directory, replacing the older one."""
+        snapshots = self.getSnapshots()
+        if not snapshots:
+            return
+        try:
+            shutil.rmtree(self.getRecoveryDirectory(), ignore_errors=True)
+            os.makedirs(self.getRecoveryDirectory())
+            paths = [path for seq, path in snapshots]
+            if os.path.exists(self.getJournalPath()):
+                paths.append(self.getJournalPath())
+            for path in paths:
+                os.replace(path, os.path.join(self.getRecoveryDirectory(), os.path.basename(path)))
+        except OSError as e:
+            print("Autosave rotation failed: %s" % e)
+
+    def hasRecovery(self):
+        """Return True if there is an autosaved workflow of the previous session."""
+        return len(self.getSnapshots(self.getRecoveryDirectory())) > 0
+
+    def loadRecovery(self):
+        """
+        Return elements of the last snapshot of the previous session and the queries recorded after it.
+
+        :rtype: (list, list of dict)
+        """
+        seq, path = self.getSnapshots(self.getRecoveryDirectory())[-1]
+        elements = serialization.loadWorkflowFromFile(path)
+        queries = []
+        journal_path = self.getJournalPath(self.getRecoveryDirectory())
+        if os.path.exists(journal_path):
+            with open(journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = self.codec.decode(line)
+                    except ValueError:
+                        # the last line can be incomplete after a crash
+                        break
+                    if entry['seq'] > seq and entry['query'] in JOURNALED_QUERIES:
+                        queries.append(entry)
+        return elements, queries
+
+    def reset(self, elements):
+        """Start the journal from given workflow elements, autosave of this session is discarded."""
+        self.started = True
+        self.snapshot(elements)
+
+    def append(self, query, args):
+        """
+        The entry is encoded at once, so that later changes of the arguments by the caller do not affect it.
+
+        :param str query: name of the workflow method or of History.ITEM_QUERIES, one of JOURNALED_QUERIES
+        """
+        self.seq += 1
+        self.entries_since_snapshot += 1
+        try:
+            data = self.codec.encode({'seq': self.seq, 'query': query, 'args': list(args)})
+        except (TypeError, ValueError) as e:
+            print("Autosave failed: %s" % e)
+            return
+        self.queue.put(('entry', self.seq, data))
+
+    def needsSnapshot(self):
+        return self.entries_since_snapshot >= self.snapshot_interval
+
+    def snapshot(self, elements):
+        """:param list elements: output of BlockWorkflow.convertToJSON"""
+        self.entries_since_snapshot = 0
+        self.queue.put(('snapshot', self.seq, elements))
+
+    def flush(self):
+        """Wait until all the queued entries and snapshots are written."""
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    if self.journal_file is not None:
+                        self.journal_file.close()
+                    return
+                kind, seq, data = item
+                if kind == 'entry':
+                    self._writeEntry(data)
+                else:
+                    self._writeSnapshot(seq, data)
+            except (OSError, TypeError, ValueError) as e:
+                print("Autosave failed: %s" % e)
+            finally:
+                self.queue.task_done()
+
+    def _writeEntry(self, data):
+        if self.journal_file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.journal_file = open(self.getJournalPath(), 'ab')
+        self.journal_file.write(data + b'\n')
+        self.journal_file.flush()
+        if self.queue.empty():
+            os.fsync(self.journal_file.fileno())
+
+    def _writeSnapshot(self, seq, elements):
+        os.makedirs(self.directory, exist_ok=True)
+        serialization.saveWorkflowToFile(self.getSnapshotPath(seq), elements, self.codec)
+        for old_seq, path in self.getSnapshots():
+            if old_seq != seq:
+                os.remove(path)
+        # all the entries up to seq are contained in the snapshot
+        if self.journal_file is not None:
+            self.journal_file.close()
+        self.journal_file = open(self.getJournalPath(), 'wb')
@@ -2,10 +2,15 @@ from PyQt5 import QtGui
 from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from . import helpers
+from . import instrumentation
 
 
 class Label(QtWidgets.QGraphicsItem):
     """"""
+    text_color = QtGui.QColor(10, 10, 10)
+    # shared by all the labels, so that it is not created on each repaint
+    textPen = QtGui.QPen(text_color)
+
     def __init__(self, parent_block, text='', parent=None, **kwargs):
         QtWidgets.QGraphicsItem.__init__(self, parent)
         self.text = ""
@@ -23,8 +28,6 @@ class Label(QtWidgets.QGraphicsItem):
 
         self.spacing = 5
 
-        self.text_color = QtGui.QColor(10, 10, 10)
-
         self.setText(text, initialization=True)
 
     def __repr__(self):
@@ -36,14 +39,12 @@ class Label(QtWidgets.QGraphicsItem):
     def getHeight(self):
         return self.h
 
+    @instrumentation.timed('Label.paint')
     def paint(self, painter, option, widget):
         """Draw the label."""
         if self.shouldBePainted():
-            text_size = helpers.getTextSize(self.text, painter=painter)
-            self.w = text_size.width()
-            painter.setPen(QtGui.QPen(self.text_color))
+            painter.setPen(self.textPen)
             y = int(self.y+self.line_h)
-            self.lines = self.text.split('\n')
             for line in self.lines:
                 painter.drawText(int(self.x), y, line)
                 y += int(self.line_h)
@@ -61,9 +62,11 @@ class Label(QtWidgets.QGraphicsItem):
         return rect
 
     def setText(self, val, initialization=False):
+        self.prepareGeometryChange()
         self.text = val
         self.lines = self.text.split('\n')
         self.h = self.line_h*len(self.lines)
+        self.w = self.getNeededWidth()
         if not initialization:
             self.parent_block.callUpdatePositionOfWholeWorkflow()
 
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import hashlib
+import inspect
+import tempfile
+import importlib.util
+import multiprocessing
+import concurrent.futures
+from . import introspection
+
+
+CACHE_VERSION = 1
+
+
+def getDefaultCacheFile():
+    return os.path.join(os.path.expanduser('~'), '.workfloweditor', 'metadata_cache.json')
+
+
+def getFileHash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _initializeWorker():
+    # the imported models may write files into the working directory
+    os.chdir(tempfile.mkdtemp(prefix='workfloweditor_metadata_'))
+
+
+def importMetadataFromFile(file_path):
+    """
+    Import given Python file and return metadata of the model classes defined in it.
+
+    The model classes are instantiated to obtain their metadata, so this is meant to be run in a worker process.
+    :rtype: dict
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    module_name = os.path.splitext(os.path.basename(file_path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    answer = {}
+    for name, obj in vars(module).items():
+        if inspect.isclass(obj) and obj.__module__ == module_name and callable(getattr(obj, 'getMetadata', None)):
+            try:
+                metadata = getattr(obj(), 'metadata', None)
+            except Exception as e:
+                print("Metadata of %s could not be obtained: %s" % (name, e))
+                continue
+            if isinstance(metadata, dict):
+                # the cache is stored as JSON
+                answer[name] = json.loads(json.dumps(metadata, default=str))
+    return answer
+
+
+class MetadataCache:
+    """
+    Persistent cache of the model metadata keyed by the model file path.
+
+    An entry is valid while the modification time and size of the file are unchanged or while its content hash is
+    the same, so that the metadata of unchanged files are obtained without importing them.
+    """
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file if cache_file is not None else getDefaultCacheFile()
+        self.files = {}
+        self.modified = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == CACHE_VERSION:
+            self.files = data.get('files', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temporary_path = self.cache_file + '.part'
+        with open(temporary_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'files': self.files}, f)
+        os.replace(temporary_path, self.cache_file)
+        self.modified = False
+
+    def get(self, file_path):
+        """
+        Return cached metadata of the models defined in given file, None if they are not cached or outdated.
+
+        :rtype: dict or None
+        """
+        file_path = os.path.abspath(file_path)
+        entry = self.files.get(file_path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['models']
+        if entry['hash'] == getFileHash(file_path):
+            entry['mtime'] = stat.st_mtime
+            entry['size'] = stat.st_size
+            self.modified = True
+            return entry['models']
+        return None
+
+    def put(self, file_path, models):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        self.files[file_path] = {
+            'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': getFileHash(file_path), 'models': models}
+        self.modified = True
+
+    def getCached(self, file_paths):
+        """
+        Return cached metadata of the models defined in given files by their classnames, other files are skipped.
+
+        :rtype: dict
+        """
+        answer = {}
+        for file_path in file_paths:
+            models = self.get(file_path)
+            if models is not None:
+                answer.update(models)
+        return answer
+
+    def getMetadata(self, file_paths, max_workers=None):
+        """
+        Return metadata of the models defined in given files by the file paths.
+
+        The metadata of the files missing in the cache are extracted from their source code. Only the files with
+        models whose metadata cannot be determined statically are imported, in parallel in worker processes.
+        :rtype: dict
+        """
+        answer = {}
+        missing = []
+        for file_path in file_paths:
+            models = self.get(file_path)
+            if models is not None:
+                answer[file_path] = models
+                continue
+            try:
+                models, unresolved = introspection.extractMetadataFromFile(file_path)
+            except (OSError, SyntaxError, ValueError) as e:
+                print("Model file %s could not be parsed: %s" % (file_path, e))
+                continue
+            if unresolved:
+                missing.append(file_path)
+            else:
+                answer[file_path] = models
+                self.put(file_path, models)
+        if missing:
+            # the worker processes are spawned, forking the GUI process is not safe
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_initializeWorker) as executor:
+                futures = dict((executor.submit(importMetadataFromFile, file_path), file_path)
+                               for file_path in missing)
+                for future in concurrent.futures.as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        answer[file_path] = future.result()
+                    except Exception as e:
+                        print("Model file %s could not be imported: %s" % (file_path, e))
+                        continue
+                    self.put(file_path, answer[file_path])
+        if self.modified:
+            self.save()
+        return answer
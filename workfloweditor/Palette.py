@@ -0,0 +1,167 @@
+import re
+from PyQt5 import QtCore
+from PyQt5 import QtWidgets
+
+
+MAX_PREFIX_LENGTH = 6
+
+
+def getTerms(*texts):
+    """Return set of lowercase words of given texts."""
+    terms = set()
+    for text in texts:
+        if text:
+            terms.update(word.lower() for word in re.findall(r'[A-Za-z0-9]+', str(text)))
+    return terms
+
+
+def getMetadataTexts(metadata):
+    """Return searchable texts of the model metadata (Name, ID, names and types of Inputs and Outputs)."""
+    texts = [metadata.get('Name', ''), metadata.get('ID', '')]
+    for key in ('Inputs', 'Outputs'):
+        for item in metadata.get(key, []):
+            texts.extend([item.get('Name', ''), item.get('Type', ''), item.get('Type_ID', '')])
+    return texts
+
+
+def getPrefixes(terms):
+    """Return set of prefixes of given terms up to MAX_PREFIX_LENGTH characters."""
+    return set(term[:i] for term in terms for i in range(1, min(len(term), MAX_PREFIX_LENGTH) + 1))
+
+
+def isSubsequence(query, text):
+    """Return True if all the characters of query appear in text in the same order."""
+    it = iter(text)
+    return all(char in it for char in query)
+
+
+class SearchIndex:
+    """
+    Search index of palette entries.
+
+    Each entry is indexed by all the prefixes (up to MAX_PREFIX_LENGTH characters) of the words of its name and
+    metadata, so that the search of a word costs one dictionary lookup. When nothing is found by the prefixes,
+    entries whose name contains the query as a subsequence are returned.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.prefixes = {}
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, name, kind, texts=()):
+        """
+        :param str key: unique key of the entry
+        :param str name: displayed name
+        :param str kind: e.g. 'Block' or 'API'
+        :param texts: other searchable texts
+        """
+        if key in self.entries:
+            self.remove(key)
+        terms = getTerms(name, kind, *texts)
+        self.entries[key] = (name, kind, terms)
+        for prefix in getPrefixes(terms):
+            self.prefixes.setdefault(prefix, set()).add(key)
+
+    def remove(self, key):
+        name, kind, terms = self.entries.pop(key)
+        for prefix in getPrefixes(terms):
+            keys = self.prefixes[prefix]
+            keys.discard(key)
+            if not keys:
+                del self.prefixes[prefix]
+
+    def getName(self, key):
+        return self.entries[key][0]
+
+    def getKind(self, key):
+        return self.entries[key][1]
+
+    def _findWord(self, word):
+        keys = self.prefixes.get(word[:MAX_PREFIX_LENGTH], set())
+        if len(word) > MAX_PREFIX_LENGTH:
+            keys = set(key for key in keys if any(term.startswith(word) for term in self.entries[key][2]))
+        return keys
+
+    def search(self, query):
+        """
+        Return keys of entries matching all the words of the query, sorted by relevance.
+
+        :rtype: list of str
+        """
+        words = sorted(getTerms(query), key=len, reverse=True)
+        if not words:
+            return sorted(self.entries, key=lambda k: (self.entries[k][1], self.entries[k][0].lower()))
+        keys = self._findWord(words[0])
+        for word in words[1:]:
+            if not keys:
+                break
+            keys = keys & self._findWord(word)
+        if keys:
+            return sorted(keys, key=lambda k: (not self.entries[k][0].lower().startswith(words[0]),
+                                               self.entries[k][0].lower()))
+        fuzzy = ''.join(words)
+        keys = [key for key, (name, kind, terms) in self.entries.items() if isSubsequence(fuzzy, name.lower())]
+        return sorted(keys, key=lambda k: (len(self.entries[k][0]), self.entries[k][0].lower()))
+
+
+class PaletteDock(QtWidgets.QDockWidget):
+    """Dockable palette of the available blocks and model APIs with search."""
+    def __init__(self, parent):
+        super(PaletteDock, self).__init__("Palette", parent)
+        self.setAllowedAreas(QtCore.Qt.LeftDockWidgetArea | QtCore.Qt.RightDockWidgetArea)
+        self.index = SearchIndex()
+        self.tooltips = {}
+
+        self.search_line = QtWidgets.QLineEdit()
+        self.search_line.setPlaceholderText("Search blocks and APIs")
+        self.search_line.setClearButtonEnabled(True)
+        self.search_line.textChanged.connect(self.updateList)
+
+        self.list_widget = QtWidgets.QListWidget()
+
+        container = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(container)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(self.search_line)
+        layout.addWidget(self.list_widget)
+        self.setWidget(container)
+
+    def addBlockClasses(self, block_classes):
+        """Add block classes, which are not in the index yet."""
+        added = False
+        for block_class in block_classes:
+            key = 'Block:%s' % block_class.__name__
+            if key not in self.index:
+                self.index.add(key, block_class.__name__, 'Block', [block_class.__doc__])
+                self.tooltips[key] = (block_class.__doc__ or '').strip()
+                added = True
+        if added:
+            self.updateList()
+
+    def addModels(self, models):
+        """
+        Add model APIs, which are not in the index yet.
+
+        :param dict models: metadata of the models by their classnames
+        """
+        added = False
+        for classname, metadata in models.items():
+            key = 'API:%s' % classname
+            if key not in self.index:
+                self.index.add(key, classname, 'API', getMetadataTexts(metadata))
+                self.tooltips[key] = "%s\n%s" % (metadata.get('Name', ''), metadata.get('Description', ''))
+                added = True
+        if added:
+            self.updateList()
+
+    def updateList(self):
+        self.list_widget.clear()
+        for key in self.index.search(self.search_line.text()):
+            item = QtWidgets.QListWidgetItem("%s (%s)" % (self.index.getName(key), self.index.getKind(key)))
+            item.setToolTip(self.tooltips.get(key, ''))
+            self.list_widget.addItem(item)
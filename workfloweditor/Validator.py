@@ -0,0 +1,132 @@
+def validateConnections(slots, pairs, check_limits=True):
+    """
+    Return data slots given by pairs of their UIDs, which can be connected, and the reasons why the rest cannot.
+
+    All the pairs are checked in one pass against a single lookup table of the data slots. The DataLinks of the valid
+    pairs are counted towards the maximal number of DataLinks of the data slots of the following pairs.
+    :param slots: data slots which can be connected
+    :param pairs: list of (str, str)
+    :param bool check_limits: whether the maximal number of DataLinks of the data slots is checked
+    :rtype: (list of (DataLink.DataSlot, DataLink.DataSlot), list of str)
+    """
+    slots = dict((slot.getUID(), slot) for slot in slots)
+    new_connections = {}
+    valid = []
+    errors = []
+    for uid_1, uid_2 in pairs:
+        slot_1 = slots.get(uid_1)
+        slot_2 = slots.get(uid_2)
+        if slot_1 is None or slot_2 is None:
+            errors.append("One or both slots to be connected were not found.")
+            continue
+        error = slot_1.getConnectionError(slot_2)
+        if error is None and check_limits:
+            for slot in (slot_1, slot_2):
+                if 0 <= slot.maxConnections <= len(slot.dataLinks) + new_connections.get(slot, 0):
+                    error = "%s cannot have more DataLinks." % slot
+        if error is not None:
+            errors.append(error)
+            continue
+        new_connections[slot_1] = new_connections.get(slot_1, 0) + 1
+        new_connections[slot_2] = new_connections.get(slot_2, 0) + 1
+        valid.append((slot_1, slot_2))
+    return valid, errors
+
+
+class Validator:
+    """
+    Incremental consistency check of the workflow.
+
+    It is kept by the workflow BlockVisual and updated whenever a DataSlot is created or destroyed or gains or loses
+    a DataLink, so that the unconnected compulsory DataSlots and the external DataSlots, which are not allowed in
+    an execution workflow, are known at any time without scanning the workflow.
+    """
+    def __init__(self):
+        # dictionaries keep the order of the slots in the workflow
+        self.unconnected = {}
+        self.external = {}
+        self.invalid = set()
+
+    @staticmethod
+    def isConnected(slot):
+        return any(not data_link.temporary for data_link in slot.dataLinks)
+
+    def addDataSlot(self, slot):
+        if slot.external:
+            self.external[slot] = None
+        self.updateDataSlot(slot)
+
+    def removeDataSlot(self, slot):
+        self.unconnected.pop(slot, None)
+        self.external.pop(slot, None)
+        self.invalid.discard(slot)
+
+    def updateDataSlot(self, slot):
+        """Update the state of the DataSlot after its DataLinks changed."""
+        if slot.optional or self.isConnected(slot):
+            self.unconnected.pop(slot, None)
+            if slot in self.invalid and slot not in self.external:
+                self.invalid.discard(slot)
+                slot.setInvalid(False)
+        else:
+            self.unconnected[slot] = None
+
+    def isConsistent(self, execution=False):
+        """
+        :param bool execution: whether the workflow is checked as an execution workflow without external DataSlots
+        :rtype: bool
+        """
+        return not self.unconnected and not (execution and self.external)
+
+    def getInvalidDataSlots(self, execution=False):
+        """
+        :rtype: list of DataLink.DataSlot
+        """
+        answer = list(self.unconnected)
+        if execution:
+            answer.extend(slot for slot in self.external if slot not in self.unconnected)
+        return answer
+
+    def getErrors(self, execution=False):
+        """
+        :rtype: list of str
+        """
+        answer = ["Compulsory data slot '%s' of %s is not connected." % (slot.name, slot.getParentBlock().header.text)
+                  for slot in self.unconnected]
+        if execution:
+            answer.extend("Execution workflow cannot contain external data slot '%s'." % slot.name
+                          for slot in self.external)
+        return answer
+
+    def highlightDataSlots(self, slots):
+        """
+        Highlight given DataSlots in the scene and remove the highlight of the others.
+
+        :param list slots: DataSlots of the workflow
+        :rtype: list of DataLink.DataSlot
+        """
+        for slot in self.invalid.difference(slots):
+            slot.setInvalid(False)
+        self.invalid = set(slots)
+        for slot in slots:
+            slot.setInvalid(True)
+        return slots
+
+    def highlightErrors(self, execution=False):
+        """
+        Highlight the invalid DataSlots in the scene, the highlight of a DataSlot is removed when it gets connected.
+
+        :rtype: list of DataLink.DataSlot
+        """
+        return self.highlightDataSlots(self.getInvalidDataSlots(execution))
+
+    def highlightDataSlotsWithUID(self, uids):
+        """
+        Highlight again the DataSlots highlighted before the workflow was regenerated, if they are still invalid.
+
+        :param set uids: UIDs of the highlighted DataSlots
+        :rtype: list of DataLink.DataSlot
+        """
+        slots = [slot for slot in self.unconnected if slot.getUID() in uids]
+        slots.extend(slot for slot in self.external if slot.getUID() in uids)
+        return self.highlightDataSlots(slots)
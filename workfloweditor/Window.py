@@ -3,9 +3,16 @@ from PyQt5 import QtCore
 from PyQt5 import QtWidgets
 from . import GraphWidget
 from . import Application
+from . import Worker
+from . import Palette
+from . import MetadataCache
+from . import Diagnostics
+from . import instrumentation
+from . import serialization
 import workflowgenerator
+import subprocess
+import inspect
 import os
-import json
 
 
 CURRENT_ZOOM = 1.0
@@ -24,21 +31,55 @@ class Window(QtWidgets.QMainWindow):
         # self.setWindowIcon(QtGui.QIcon('pythonlogo.png'))
 
         self.widget = GraphWidget.GraphWidget(self)
+
+        # palette of available blocks and APIs, floating by default as the window width follows the workflow
+        self.palette = Palette.PaletteDock(self)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.palette)
+        self.palette.setFloating(True)
+        self.palette.hide()
+        self.palette.topLevelChanged.connect(lambda floating: self.getApplication().updateWindowWidth())
+        self.palette.visibilityChanged.connect(lambda visible: self.getApplication().updateWindowWidth())
+        self.metadata_cache = MetadataCache.MetadataCache()
+        # files of the model APIs loaded by the user, their metadata are cached by the file
+        self.model_files = []
+
+        # table of the instrumented operations, only when the instrumentation is switched on
+        self.diagnostics = None
+        if instrumentation.enabled:
+            self.diagnostics = Diagnostics.DiagnosticsDock(self)
+            self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.diagnostics)
+            self.diagnostics.setFloating(True)
+            self.diagnostics.hide()
+
         self.resizeEvent(None)
 
         self.statusBar()
 
+        # background tasks
+        self.thread_pool = QtCore.QThreadPool()
+        self.worker = None
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setMaximumWidth(150)
+        self.cancel_button = QtWidgets.QPushButton('Cancel')
+        self.cancel_button.clicked.connect(self.cancelBackgroundTask)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_button)
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
         # window menu definition
         main_menu = self.menuBar()
 
         def _new_blank_workflow():
             self.getApplication().getRealWorkflow().deleteAllItems()
+            self.getApplication().resetHistory()
             self.getApplication().reGenerateAll()
 
+        def _recover_autosave():
+            if not self.getApplication().recoverAutosave():
+                QtWidgets.QMessageBox.about(self, "Recover autosaved workflow", "No autosaved workflow was found.")
+
         def _save_to_json_file():
-            json_code = self.getApplication().getRealWorkflow().convertToJSON()
-            overall_json = {'elements': json_code}
-            json_to_be_saved = json.dumps(overall_json)
             file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
                 self,
                 "Save Workflow to JSON File",
@@ -46,9 +87,49 @@ class Window(QtWidgets.QMainWindow):
                 "JSON File (*.json)"
             )
             if file_path:
-                f = open(file_path, "w")
-                f.write(json_to_be_saved)
-                f.close()
+                json_code = self.getApplication().getRealWorkflow().convertToJSON()
+                self.runInBackground(
+                    "Saving workflow",
+                    lambda worker: serialization.saveWorkflowToFile(
+                        file_path, json_code, progress=worker.updateProgress))
+
+        def _save_to_binary_file():
+            file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                "Save Workflow to Binary File",
+                os.path.join(QtCore.QDir.currentPath(), "scene.mwf"),
+                "Binary Workflow File (*.mwf)"
+            )
+            if file_path:
+                json_code = self.getApplication().getRealWorkflow().convertToJSON()
+                self.runInBackground(
+                    "Saving workflow",
+                    lambda worker: serialization.saveWorkflowToBinaryFile(
+                        file_path, json_code, progress=worker.updateProgress))
+
+        def _load_from_file(file_path):
+            def _read(worker):
+                try:
+                    j_data = serialization.loadWorkflowFromFile(file_path, progress=worker.updateProgress)
+                except (KeyError, TypeError, ValueError, IndexError):
+                    raise ValueError("Wrong format of given workflow file.")
+                return j_data
+
+            def _construct(j_data):
+                # the workflow is modified only in the GUI thread, it is restored when the file cannot be constructed
+                workflow = self.getApplication().getRealWorkflow()
+                previous = workflow.convertToJSON()
+                try:
+                    workflow.constructFromJSON(j_data)
+                except Exception as e:
+                    workflow.constructFromJSON(previous)
+                    print("Loading workflow failed: %s" % e)
+                    QtWidgets.QMessageBox.about(self, "Loading workflow failed", str(e))
+                    return
+                self.getApplication().resetHistory(j_data)
+                self.getApplication().reGenerateAll()
+
+            self.runInBackground("Loading workflow", _read, _construct)
 
         def _load_from_json_file():
             file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
@@ -58,33 +139,44 @@ class Window(QtWidgets.QMainWindow):
                 "JSON File (*.json)"
             )
             if file_path:
-                f = open(file_path, "r")
-                json_loaded = f.read()
-                f.close()
-                json_data = json.loads(json_loaded)
-                j_data = None
-                try:
-                    j_data = json_data['elements']
-                except KeyError:
-                    print("Wrong format of given JSON file.")
-                if j_data is not None:
-                    self.getApplication().getRealWorkflow().constructFromJSON(j_data)
-                    self.getApplication().reGenerateAll()
+                _load_from_file(file_path)
 
-        def _load_default_models():
-            self.getApplication().getRealWorkflow().loadDefaultModels()
+        def _load_from_binary_file():
+            file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
+                self,
+                "Open Workflow Binary File",
+                os.path.join(QtCore.QDir.currentPath(), "scene.mwf"),
+                "Binary Workflow File (*.mwf)"
+            )
+            if file_path:
+                _load_from_file(file_path)
+
+        def _load_model_apis(register):
+            """Register the model APIs and add them to the palette, their metadata are collected in the background."""
+            register()
             self.updateMenuListOfAPIs()
 
+        def _load_default_models():
+            _load_model_apis(self.getApplication().getRealWorkflow().loadDefaultModels)
+
         def _load_models():
-            file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            file_paths, _ = QtWidgets.QFileDialog.getOpenFileNames(
                 self,
-                "Open Python File",
+                "Open Python Files",
                 os.path.join(QtCore.QDir.currentPath(), "model.py"),
                 "Python File (*.py)"
             )
-            if file_path:
-                self.getApplication().getRealWorkflow().loadModelsFromGivenFile(file_path)
-                self.updateMenuListOfAPIs()
+            if file_paths:
+                # the cached APIs are listed before their files are imported
+                self.palette.addModels(self.metadata_cache.getCached(file_paths))
+
+                def _register():
+                    for file_path in file_paths:
+                        self.getApplication().getRealWorkflow().loadModelsFromGivenFile(file_path)
+                        if os.path.abspath(file_path) not in self.model_files:
+                            self.model_files.append(os.path.abspath(file_path))
+
+                _load_model_apis(_register)
 
         def _load_custom_standard_blocks():
             file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
@@ -107,7 +199,7 @@ class Window(QtWidgets.QMainWindow):
             return text_code
 
         def _generate_class_code():
-            if self.getApplication().getRealWorkflow().checkConsistency(execution=False):
+            if self.checkWorkflowConsistency(execution=False):
                 # saving into file
                 file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
                     self,
@@ -116,32 +208,28 @@ class Window(QtWidgets.QMainWindow):
                     "Python File (*.py)"
                 )
                 if file_path:
-                    self.getApplication().getRealWorkflow().saveClassCodeToFile(file_path)
-            else:
-                print("Workflow.checkConsistency() returned False")
-                QtWidgets.QMessageBox.about(
-                    self,
-                    "Workflow consistency error",
-                    "Workflow.checkConsistency() returned False\nCheck whether all Compulsory DataSlots are connected.")
+                    self.runInBackground(
+                        "Generating class code",
+                        lambda worker: self.getApplication().getRealWorkflow().saveClassCodeToFile(file_path),
+                        indeterminate=True)
+
+        def _show_code(code):
+            self.code_editor = QtWidgets.QTextEdit()
+            for line in code:
+                self.code_editor.append(line)
+            self.code_editor.resize(300, 300)
+            self.code_editor.setReadOnly(True)
+            self.code_editor.show()
 
         def _show_class_code():
-            if self.getApplication().getRealWorkflow().checkConsistency(execution=False):
-                code = self.getApplication().getRealWorkflow().generateClassCode()
-                self.code_editor = QtWidgets.QTextEdit()
-                for line in code:
-                    self.code_editor.append(line)
-                self.code_editor.resize(300, 300)
-                self.code_editor.setReadOnly(True)
-                self.code_editor.show()
-            else:
-                print("Workflow.checkConsistency() returned False")
-                QtWidgets.QMessageBox.about(
-                    self,
-                    "Workflow consistency error",
-                    "Workflow.checkConsistency() returned False\nCheck whether all Compulsory DataSlots are connected.")
+            if self.checkWorkflowConsistency(execution=False):
+                self.runInBackground(
+                    "Generating class code",
+                    lambda worker: self.getApplication().getRealWorkflow().generateClassCode(),
+                    _show_code, indeterminate=True)
 
         def _generate_execution_code():
-            if self.getApplication().getRealWorkflow().checkConsistency(execution=True):
+            if self.checkWorkflowConsistency(execution=True):
                 # saving into file
                 file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
                     self,
@@ -150,75 +238,73 @@ class Window(QtWidgets.QMainWindow):
                     "Python File (*.py)"
                 )
                 if file_path:
-                    self.getApplication().getRealWorkflow().saveExecutionCodeToFile(file_path)
-            else:
-                print("Workflow.checkConsistency() returned False")
-                QtWidgets.QMessageBox.about(
-                    self,
-                    "Workflow consistency error",
-                    "Workflow.checkConsistency() returned False\nCheck whether all Compulsory DataSlots are connected."
-                    "\nExecution Workflow also cannot contain external DataSlots.")
+                    self.runInBackground(
+                        "Generating execution code",
+                        lambda worker: self.getApplication().getRealWorkflow().saveExecutionCodeToFile(file_path),
+                        indeterminate=True)
 
         def _show_execution_code():
-            if self.getApplication().getRealWorkflow().checkConsistency(execution=True):
-                code = self.getApplication().getRealWorkflow().generateExecutionCode()
-                self.code_editor = QtWidgets.QTextEdit()
-                for line in code:
-                    self.code_editor.append(line)
-                self.code_editor.resize(300, 300)
-                self.code_editor.setReadOnly(True)
-                self.code_editor.show()
-            else:
-                print("Workflow.checkConsistency() returned False")
-                QtWidgets.QMessageBox.about(
-                    self,
-                    "Workflow consistency error",
-                    "Workflow.checkConsistency() returned False\nCheck whether all Compulsory DataSlots are connected."
-                    "\nExecution Workflow also cannot contain external DataSlots.")
+            if self.checkWorkflowConsistency(execution=True):
+                self.runInBackground(
+                    "Generating execution code",
+                    lambda worker: self.getApplication().getRealWorkflow().generateExecutionCode(),
+                    _show_code, indeterminate=True)
 
         def _run_execution_code():
-            if self.getApplication().getRealWorkflow().checkConsistency(execution=True):
-                file_path = './temporary_execution_script.py'
-                self.getApplication().getRealWorkflow().saveExecutionCodeToFile(file_path)
-                os.system("python %s" % file_path)
-                os.remove(file_path)
-            else:
-                print("Workflow.checkConsistency() returned False")
-                QtWidgets.QMessageBox.about(
-                    self,
-                    "Workflow consistency error",
-                    "Workflow.checkConsistency() returned False\nCheck whether all Compulsory DataSlots are connected."
-                    "\nExecution Workflow also cannot contain external DataSlots.")
+            if self.checkWorkflowConsistency(execution=True):
+                def _run(worker):
+                    file_path = './temporary_execution_script.py'
+                    self.getApplication().getRealWorkflow().saveExecutionCodeToFile(file_path)
+                    process = subprocess.Popen(["python", file_path])
+                    try:
+                        while process.poll() is None:
+                            if worker.isCancelled():
+                                process.terminate()
+                            QtCore.QThread.msleep(100)
+                    finally:
+                        os.remove(file_path)
+                    worker.checkCancelled()
+
+                self.runInBackground("Running execution code", _run, indeterminate=True)
 
         main_menu.setNativeMenuBar(False)
         workflow_menu = main_menu.addMenu('Workflow')
         #
         workflow_action_new_blank_workflow = QtWidgets.QAction('New blank workflow', self)
-        workflow_action_new_blank_workflow.triggered.connect(_new_blank_workflow)
+        self.connectAction(workflow_action_new_blank_workflow, _new_blank_workflow)
         workflow_action_new_blank_workflow.setShortcut("Ctrl+N")
 
+        workflow_action_recover_autosave = QtWidgets.QAction('Recover autosaved workflow', self)
+        self.connectAction(workflow_action_recover_autosave, _recover_autosave)
+
         workflow_action_show_class_code = QtWidgets.QAction('Show class code', self)
-        workflow_action_show_class_code.triggered.connect(_show_class_code)
+        self.connectAction(workflow_action_show_class_code, _show_class_code)
 
         workflow_action_save_class_code = QtWidgets.QAction('Save class code', self)
-        workflow_action_save_class_code.triggered.connect(_generate_class_code)
+        self.connectAction(workflow_action_save_class_code, _generate_class_code)
 
         workflow_action_save_execution_code = QtWidgets.QAction('Save execution code', self)
-        workflow_action_save_execution_code.triggered.connect(_generate_execution_code)
+        self.connectAction(workflow_action_save_execution_code, _generate_execution_code)
 
         workflow_action_show_execution_code = QtWidgets.QAction('Show execution code', self)
-        workflow_action_show_execution_code.triggered.connect(_show_execution_code)
+        self.connectAction(workflow_action_show_execution_code, _show_execution_code)
 
         workflow_action_run_execution_code = QtWidgets.QAction('Run execution code', self)
-        workflow_action_run_execution_code.triggered.connect(_run_execution_code)
+        self.connectAction(workflow_action_run_execution_code, _run_execution_code)
 
         workflow_action_save_to_file = QtWidgets.QAction('Save to JSON file', self)
-        workflow_action_save_to_file.triggered.connect(_save_to_json_file)
+        self.connectAction(workflow_action_save_to_file, _save_to_json_file)
         workflow_action_save_to_file.setShortcut("Ctrl+S")
 
         workflow_action_load_from_file = QtWidgets.QAction('Load from JSON file', self)
-        workflow_action_load_from_file.triggered.connect(_load_from_json_file)
+        self.connectAction(workflow_action_load_from_file, _load_from_json_file)
         workflow_action_load_from_file.setShortcut("Ctrl+L")
+
+        workflow_action_save_to_binary_file = QtWidgets.QAction('Save to binary file', self)
+        self.connectAction(workflow_action_save_to_binary_file, _save_to_binary_file)
+
+        workflow_action_load_from_binary_file = QtWidgets.QAction('Load from binary file', self)
+        self.connectAction(workflow_action_load_from_binary_file, _load_from_binary_file)
         #
         workflow_menu.addAction(workflow_action_new_blank_workflow)
         workflow_menu.addAction(workflow_action_show_class_code)
@@ -228,52 +314,234 @@ class Window(QtWidgets.QMainWindow):
         workflow_menu.addAction(workflow_action_run_execution_code)
         workflow_menu.addAction(workflow_action_save_to_file)
         workflow_menu.addAction(workflow_action_load_from_file)
+        workflow_menu.addAction(workflow_action_save_to_binary_file)
+        workflow_menu.addAction(workflow_action_load_from_binary_file)
+        workflow_menu.addAction(workflow_action_recover_autosave)
+        #
+        edit_menu = main_menu.addMenu('Edit')
+        #
+        edit_action_undo = self.getApplication().undo_stack.createUndoAction(self, 'Undo')
+        edit_action_undo.setShortcut("Ctrl+Z")
+
+        edit_action_redo = self.getApplication().undo_stack.createRedoAction(self, 'Redo')
+        edit_action_redo.setShortcut("Ctrl+Y")
+        #
+        edit_menu.addAction(edit_action_undo)
+        edit_menu.addAction(edit_action_redo)
         #
         self.blocks_menu = main_menu.addMenu('Blocks')
         #
         apis_action_load_custom_blocks_from_file = QtWidgets.QAction('Load custom Block from file', self)
-        apis_action_load_custom_blocks_from_file.triggered.connect(_load_custom_standard_blocks)
+        self.connectAction(apis_action_load_custom_blocks_from_file, _load_custom_standard_blocks)
         self.blocks_menu.addAction(apis_action_load_custom_blocks_from_file)
         #
-        self.blocks_list_of_blocks = self.blocks_menu.addMenu('List of available Blocks')
-        for block in self.getApplication().getRealWorkflow().getListOfBlockClasses():
-            action = QtWidgets.QAction(block.__name__, self)
-            self.blocks_list_of_blocks.addAction(action)
+        self.blocks_menu.addAction(self.palette.toggleViewAction())
         #
         self.apis_menu = main_menu.addMenu('APIs')
         apis_action_load_from_file = QtWidgets.QAction('Load API from file', self)
-        apis_action_load_from_file.triggered.connect(_load_models)
+        self.connectAction(apis_action_load_from_file, _load_models)
         self.apis_menu.addAction(apis_action_load_from_file)
         #
-        self.apis_list_of_models = self.apis_menu.addMenu('List of available APIs')
-        for apiname in self.getApplication().getRealWorkflow().getListOfModelClassnames():
-            action = QtWidgets.QAction(apiname, self)
-            self.apis_list_of_models.addAction(action)
+        self.apis_menu.addAction(self.palette.toggleViewAction())
         #
         apis_action_load_default_models = QtWidgets.QAction('Load COMPOSELECTOR models', self)
-        apis_action_load_default_models.triggered.connect(_load_default_models)
+        self.connectAction(apis_action_load_default_models, _load_default_models)
         self.apis_menu.addAction(apis_action_load_default_models)
+        #
+        diagnostics_menu = main_menu.addMenu('Diagnostics')
+        if self.diagnostics is not None:
+            diagnostics_menu.addAction(self.diagnostics.toggleViewAction())
+        diagnostics_action_record_trace = QtWidgets.QAction('Record profiling trace', self)
+        diagnostics_action_record_trace.setCheckable(True)
+        diagnostics_action_record_trace.toggled.connect(self.setTraceRecording)
+        diagnostics_menu.addAction(diagnostics_action_record_trace)
+
+        self.updateMenuListOfBlocks()
+        self.updateMenuListOfAPIs()
 
         self.show()
 
+    def checkWorkflowConsistency(self, execution=False):
+        """
+        Check the consistency of the workflow before its code is generated, report the errors and highlight the
+        offending DataSlots in the scene.
+
+        The answer is given by the Validator of the workflow, which keeps the state of the DataSlots up to date, so
+        the workflow is not scanned. The check of the workflowgenerator is run only as a cross-check while the
+        instrumentation is switched on. The highlight is kept by the Application while the scene is regenerated and
+        it is removed when the workflow is consistent.
+        :param bool execution: whether the workflow is checked as an execution workflow without external DataSlots
+        :rtype: bool
+        """
+        application = self.getApplication()
+        validator = application.getWorkflowBlock().validator
+        consistent = validator.isConsistent(execution)
+        slots = validator.highlightErrors(execution)
+        application.highlighted_slot_uids = set(slot.getUID() for slot in slots)
+        if instrumentation.enabled and application.getRealWorkflow().checkConsistency(execution=execution) != consistent:
+            print("Validator and Workflow.checkConsistency() disagree, the workflow is %s by the Validator." % (
+                "consistent" if consistent else "not consistent"))
+        if consistent:
+            return True
+        errors = validator.getErrors(execution)
+        if len(errors) > 10:
+            errors = errors[:10] + ["... and %d more." % (len(errors) - 10)]
+        print("Workflow is not consistent:\n%s" % "\n".join(errors))
+        self.widget.view.ensureVisible(slots[0])
+        QtWidgets.QMessageBox.about(self, "Workflow consistency error", "\n".join(errors))
+        return False
+
+    def connectAction(self, action, function):
+        """Connect the menu action to given function called without arguments, the call is traced as one span."""
+        traced = instrumentation.timed('menu %s' % action.text())(function)
+        action.triggered.connect(lambda checked=False: traced())
+
+    def setTraceRecording(self, recording):
+        """Start recording of the profiling trace or stop it and save it in the Chrome trace format."""
+        if recording:
+            instrumentation.startTrace()
+            self.statusBar().showMessage("Recording profiling trace.")
+            return
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Save Profiling Trace",
+            os.path.join(QtCore.QDir.currentPath(), "trace.json"),
+            "Chrome Trace File (*.json)"
+        )
+        number_of_spans = instrumentation.stopTrace(file_path)
+        if file_path:
+            self.statusBar().showMessage("Profiling trace with %d spans saved to %s." % (number_of_spans, file_path))
+        else:
+            self.statusBar().showMessage("Profiling trace discarded.")
+
     def updateMenuListOfAPIs(self):
-        self.apis_list_of_models.clear()
-        for apiname in workflowgenerator.BlockWorkflow.BlockWorkflow.getListOfModelClassnames():
-            action = QtWidgets.QAction(apiname, self)
-            self.apis_list_of_models.addAction(action)
+        """Add newly loaded model APIs to the palette, their metadata are collected in the background."""
+        classnames_by_file = self.getModelClassnamesByFile()
+        model_files = list(self.model_files)
+        self.runInBackground(
+            "Loading APIs", lambda worker: self.getModelMetadata(classnames_by_file, model_files),
+            self.palette.addModels, indeterminate=True)
+
+    @staticmethod
+    def getModelClassnamesByFile():
+        """
+        Return classnames of the loaded model APIs by the files defining them, None stands for unknown file.
+
+        The list of the models is read from the workflowgenerator, so this is called in the GUI thread.
+        :rtype: dict
+        """
+        workflow_class = workflowgenerator.BlockWorkflow.BlockWorkflow
+        if not hasattr(workflow_class, 'getListOfModels'):
+            return {None: list(workflow_class.getListOfModelClassnames())}
+        classnames_by_file = {}
+        for model_class in workflow_class.getListOfModels():
+            try:
+                file_path = inspect.getsourcefile(model_class)
+            except TypeError:
+                file_path = None
+            classnames_by_file.setdefault(file_path, []).append(model_class.__name__)
+        return classnames_by_file
+
+    def getModelMetadata(self, classnames_by_file, model_files=()):
+        """
+        Return metadata of the loaded model APIs by their classnames.
+
+        The metadata are taken from the metadata cache, files of the models missing in it are imported in worker
+        processes. Only the model files and the cache are used, so this can run in a worker thread. The models
+        without known file are looked up in the model files loaded by the user, their metadata are empty if not
+        found there.
+        :param dict classnames_by_file: output of getModelClassnamesByFile
+        :param model_files: paths of the model files loaded by the user
+        :rtype: dict
+        """
+        file_paths = [fp for fp in classnames_by_file if fp is not None]
+        file_paths.extend(fp for fp in model_files if fp not in file_paths)
+        metadata_by_file = self.metadata_cache.getMetadata(file_paths)
+        metadata_of_model_files = {}
+        for file_path in model_files:
+            metadata_of_model_files.update(metadata_by_file.get(file_path, {}))
+        answer = {}
+        for file_path, classnames in classnames_by_file.items():
+            for classname in classnames:
+                if file_path is None:
+                    answer[classname] = metadata_of_model_files.get(classname, {})
+                else:
+                    answer[classname] = metadata_by_file.get(file_path, {}).get(classname, {})
+        return answer
 
     def updateMenuListOfBlocks(self):
-        self.blocks_list_of_blocks.clear()
-        for block in workflowgenerator.BlockWorkflow.BlockWorkflow.getListOfBlockClasses():
-            action = QtWidgets.QAction(block.__name__, self)
-            self.blocks_list_of_blocks.addAction(action)
+        """Add newly loaded block classes to the palette."""
+        self.palette.addBlockClasses(workflowgenerator.BlockWorkflow.BlockWorkflow.getListOfBlockClasses())
+
+    def getDockedPaletteWidth(self):
+        if self.palette.isVisible() and not self.palette.isFloating():
+            return self.palette.width()
+        return 0
+
+    def runInBackground(self, title, function, on_finished=None, indeterminate=False):
+        """
+        Run function(worker) in the thread pool, on_finished(result) is then called in the GUI thread.
+
+        The scene and the menu are disabled until the task finishes, so that the workflow cannot be modified
+        meanwhile.
+        :rtype: bool
+        """
+        if self.worker is not None:
+            self.statusBar().showMessage("Another task is running, wait until it finishes or cancel it.")
+            return False
+
+        def _finished(result):
+            self._finishBackgroundTask("%s finished." % title)
+            if on_finished is not None:
+                on_finished(result)
+
+        def _failed(error):
+            self._finishBackgroundTask("%s failed." % title)
+            print("%s failed: %s" % (title, error))
+            QtWidgets.QMessageBox.about(self, "%s failed" % title, str(error))
+
+        def _cancelled():
+            self._finishBackgroundTask("%s cancelled." % title)
+
+        self.worker = Worker.Worker(function)
+        self.worker.signals.progress.connect(self.progress_bar.setValue)
+        self.worker.signals.finished.connect(_finished)
+        self.worker.signals.failed.connect(_failed)
+        self.worker.signals.cancelled.connect(_cancelled)
+
+        self.progress_bar.setRange(0, 0 if indeterminate else 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.cancel_button.show()
+        self.widget.setEnabled(False)
+        self.menuBar().setEnabled(False)
+        self.statusBar().showMessage("%s..." % title)
+        self.thread_pool.start(self.worker)
+        return True
+
+    def cancelBackgroundTask(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.statusBar().showMessage("Cancelling...")
+
+    def _finishBackgroundTask(self, message):
+        self.worker = None
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+        self.widget.setEnabled(True)
+        self.menuBar().setEnabled(True)
+        self.statusBar().showMessage(message, 5000)
 
     @staticmethod
     def close_application():
         sys.exit()
 
     def resizeEvent(self, event):
-        self.widget.setGeometry(5, 15, self.width() - 10, self.height() - 20)
+        palette_width = self.getDockedPaletteWidth()
+        x = 5
+        if palette_width and self.dockWidgetArea(self.palette) == QtCore.Qt.LeftDockWidgetArea:
+            x += palette_width
+        self.widget.setGeometry(x, 15, self.width() - 10 - palette_width, self.height() - 20)
 
     def getApplication(self):
         """
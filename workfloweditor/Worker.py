@@ -0,0 +1,53 @@
+from PyQt5 import QtCore
+from . import exceptions
+
+
+class WorkerSignals(QtCore.QObject):
+    """Signals of the Worker, emitted from the worker thread and delivered in the GUI thread."""
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+    cancelled = QtCore.pyqtSignal()
+
+
+class Worker(QtCore.QRunnable):
+    """
+    Runs given function in a QThreadPool thread.
+
+    The function gets the worker as its first argument, so that it can report its progress with updateProgress()
+    and stop with checkCancelled() when the user requested cancellation. The function must not touch the scene or
+    the workflow, its result is handed over by the finished signal to the GUI thread.
+    """
+    def __init__(self, function, *args, **kwargs):
+        super(Worker, self).__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancel_requested = False
+
+    def run(self):
+        try:
+            result = self.function(self, *self.args, **self.kwargs)
+        except exceptions.OperationCancelledError:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def isCancelled(self):
+        return self.cancel_requested
+
+    def checkCancelled(self):
+        """Raise OperationCancelledError when the cancellation was requested."""
+        if self.cancel_requested:
+            raise exceptions.OperationCancelledError()
+
+    def updateProgress(self, fraction):
+        """Report the progress given as fraction and stop when cancelled, usable as a progress callback."""
+        self.checkCancelled()
+        self.signals.progress.emit(int(100 * fraction))
@@ -1,5 +1,6 @@
 from . import Application
 from . import Window
+from . import Worker
 from . import Block
 from . import DataLink
 from . import exceptions
@@ -8,8 +9,19 @@ from . import GraphWidget
 from . import Header
 from . import Button
 from . import helpers
+from . import Journal
+from . import History
+from . import Palette
+from . import MetadataCache
+from . import introspection
+from . import serialization
+from . import instrumentation
+from . import Diagnostics
+from . import GraphIndex
+from . import Validator
 
 __version__ = '1.0.0'
 
-__all__ = ['Application', 'Window', 'Block', 'DataLink', 'exceptions', 'GraphView', 'GraphWidget', 'Header', 'Button',
-           'helpers']
+__all__ = ['Application', 'Window', 'Worker', 'Block', 'DataLink', 'exceptions', 'GraphView', 'GraphWidget', 'Header',
+           'Button', 'helpers', 'Journal', 'History', 'Palette', 'MetadataCache', 'introspection', 'serialization',
+           'instrumentation', 'Diagnostics', 'GraphIndex', 'Validator']
@@ -0,0 +1,38 @@
+import models
+import timeit
+import numpy as np
+import mupif
+import mupif.Physics.PhysicalQuantities as PQ
+
+# Compares the element by element assembly of the mechanical model with the batched one, including the temperature
+# load from a registered temperature field.
+
+
+def linearTemperatureField(model):
+    # vertex based temperature field rising linearly along the domain, so that the thermal load is not zero
+    coords = model.getCoordinates()
+    values = (20. + 100. * coords[:, 0] / model.xl).reshape(-1, 1)
+    return mupif.Field.Field(model.mesh, mupif.FieldID.FID_Temperature, mupif.ValueType.Scalar, 'C',
+                             PQ.PhysicalQuantity(1.0, 's'), values)
+
+
+if __name__ == '__main__':
+
+    print("%10s %10s %14s %14s %10s" % ('elements', 'equations', 'loop [s]', 'batched [s]', 'speedup'))
+    for nx, ny in ((20, 8), (40, 16), (80, 32)):
+        model = models.mechanical()
+        model.initialize(file='inputM13.in', workdir='.')
+        model.nx = nx
+        model.ny = ny
+        model.prepareTask()
+        model.setField(linearTemperatureField(model))
+
+        A_loop, b_loop = model.assembleLoop()
+        A_batched, b_batched = model.assembleBatched()
+        assert np.allclose(A_loop, A_batched.toarray()) and np.allclose(b_loop, b_batched), "Assembled systems differ."
+        assert np.any(b_loop), "Temperature load is zero."
+
+        time_loop = min(timeit.repeat(model.assembleLoop, number=1, repeat=3))
+        time_batched = min(timeit.repeat(model.assembleBatched, number=1, repeat=3))
+        print("%10d %10d %14.4f %14.4f %10.1f" % (
+            nx * ny, model.neq, time_loop, time_batched, time_loop / time_batched))
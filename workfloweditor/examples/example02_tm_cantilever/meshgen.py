@@ -1,4 +1,5 @@
 from builtins import range
+import numpy as np
 from mupif import Mesh
 from mupif import Cell
 from mupif import Vertex
@@ -36,24 +37,121 @@ def meshgen(origin, size, nx, ny, tria=False):
 
     # generate cells
     num = 1
-    for ix in range(nx):
-        for iy in range(ny):
-            si = iy + ix * (ny + 1)  # index of lower left node
-            if not tria:
-                if debug:
-                    print("Adding quad %d: %d %d %d %d" % (num, si, si + ny + 1, si + ny + 2, si + 1))
-                celllist.append(Cell.Quad_2d_lin(mesh, num, num, vertices=(si, si + ny + 1, si + ny + 2, si + 1)))
-                num = num + 1
-            else:
-                if debug:
-                    print("Adding tria %d: %d %d %d" % (num, si, si + ny + 1, si + ny + 2))
-                celllist.append(Cell.Triangle_2d_lin(mesh, num, num, vertices=(si, si + ny + 1, si + ny + 2)))
-                num = num + 1
-                if debug:
-                    print("Adding tria %d: %d %d %d" % (num, si, si + ny + 2, si + 1))
-                celllist.append(Cell.Triangle_2d_lin(mesh, num, num, vertices=(si, si + ny + 2, si + 1)))
-                num = num + 1
+    for vertices in connectivity(nx, ny, tria):
+        if not tria:
+            if debug:
+                print("Adding quad %d: %d %d %d %d" % (num, *vertices))
+            celllist.append(Cell.Quad_2d_lin(mesh, num, num, vertices=tuple(int(v) for v in vertices)))
+        else:
+            if debug:
+                print("Adding tria %d: %d %d %d" % (num, *vertices))
+            celllist.append(Cell.Triangle_2d_lin(mesh, num, num, vertices=tuple(int(v) for v in vertices)))
+        num = num + 1
 
     mesh.setup(vertexlist, celllist)
     return mesh
 
+
+def connectivity(nx, ny, tria=False):
+    """
+    Returns the connectivity array of the mesh generated by meshgen with the same parameters
+    Params:
+      nx(int): number of elements in x direction
+      ny(int): number of elements in y direction
+      tria(bool): when True, triangular mesh connectivity returned, quad otherwise
+    Returns:
+      numpy array of vertex indices with shape (number of cells, 3 or 4), row e belongs to cell e
+    """
+    ix, iy = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    si = (iy + ix * (ny + 1)).ravel()  # indices of lower left nodes
+    if not tria:
+        return np.stack((si, si + ny + 1, si + ny + 2, si + 1), axis=1).astype(np.int32)
+    c = np.empty((2 * nx * ny, 3), dtype=np.int32)
+    c[0::2] = np.stack((si, si + ny + 1, si + ny + 2), axis=1)
+    c[1::2] = np.stack((si, si + ny + 2, si + 1), axis=1)
+    return c
+
+
+def coordinates(origin, size, nx, ny):
+    """
+    Returns the vertex coordinates of the mesh generated by meshgen with the same parameters
+    Params:
+      origin(tuple): x,y coordinates of origin (lower left corner)
+      size(tuple): tuple containing size in x and y directions
+      nx(int): number of elements in x direction
+      ny(int): number of elements in y direction
+    Returns:
+      numpy array with shape (number of vertices, 3), row i belongs to vertex i
+    """
+    dx = size[0] / nx
+    dy = size[1] / ny
+    ix, iy = np.meshgrid(np.arange(nx + 1), np.arange(ny + 1), indexing='ij')
+    coords = np.zeros(((nx + 1) * (ny + 1), 3))
+    coords[:, 0] = origin[0] + 1.0 * ix.ravel() * dx
+    coords[:, 1] = origin[1] + 1.0 * iy.ravel() * dy
+    return coords
+
+
+def edgeVertices(nx, ny, edge):
+    """
+    Returns indices of the vertices lying on given edge of the domain meshed by meshgen
+    Model edges
+        ----------3----------
+        |                   |
+        4                   2
+        |                   |
+        ----------1---------
+    Params:
+      nx(int): number of elements in x direction
+      ny(int): number of elements in y direction
+      edge(int): model edge number (1..4)
+    Returns:
+      numpy array of vertex indices, empty for unknown edge number
+    """
+    if edge == 1:
+        return np.arange(nx + 1) * (ny + 1)
+    elif edge == 2:
+        return (ny + 1) * nx + np.arange(ny + 1)
+    elif edge == 3:
+        return ny + (ny + 1) * np.arange(nx + 1)
+    elif edge == 4:
+        return np.arange(ny + 1)
+    return np.zeros(0, dtype=np.int64)
+
+
+def edgeCells(nx, ny, edge, tria=False):
+    """
+    Returns indices of the cells adjacent to given edge of the domain meshed by meshgen
+    Params:
+      nx(int): number of elements in x direction
+      ny(int): number of elements in y direction
+      edge(int): model edge number (1..4), see edgeVertices
+      tria(bool): when True, triangular mesh assumed, quad otherwise
+    Returns:
+      tuple of numpy array of cell indices and local number of the cell side lying on the edge
+    """
+    if edge == 1:
+        return (2 * ny * np.arange(nx), 0) if tria else (ny * np.arange(nx), 0)
+    elif edge == 2:
+        return ((nx - 1) * 2 * ny + 2 * np.arange(ny), 1) if tria else ((nx - 1) * ny + np.arange(ny), 1)
+    elif edge == 3:
+        return (2 * ny * (np.arange(nx) + 1) - 1, 1) if tria else (ny * (np.arange(nx) + 1) - 1, 2)
+    elif edge == 4:
+        return (2 * np.arange(ny) + 1, 2) if tria else (np.arange(ny), 3)
+    return np.zeros(0, dtype=np.int64), 0
+
+
+def edgeSegments(conn, coords, cells, side):
+    """
+    Returns vertex pairs and lengths of the cell sides lying on a domain edge
+    Params:
+      conn(numpy array): connectivity array, see connectivity
+      coords(numpy array): vertex coordinates, see coordinates
+      cells(numpy array): indices of the cells, see edgeCells
+      side(int): local number of the cell side
+    Returns:
+      tuple of numpy array of vertex pairs with shape (number of cells, 2) and numpy array of their lengths
+    """
+    nodes = np.stack((conn[cells, side], conn[cells, (side + 1) % conn.shape[1]]), axis=1)
+    d = coords[nodes[:, 1], :2] - coords[nodes[:, 0], :2]
+    return nodes, np.sqrt(d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1])
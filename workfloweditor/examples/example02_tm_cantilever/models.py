@@ -4,6 +4,12 @@ import Pyro4
 import meshgen
 import math
 import numpy as np
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    # without scipy the mechanical model assembles a dense matrix element by element
+    scipy = None
 import time as timeTime
 import os
 import logging
@@ -111,8 +117,12 @@ class thermal(mupif.Model.Model):
         self.nx = None
         self.ny = None
 
-        self.dirichletBCs = None
-        self.convectionBC = None
+        self.dirichletMask = None
+        self.dirichletValues = None
+        self.convectionNodes = None
+        self.convectionLengths = None
+        self.convectionH = None
+        self.convectionTe = None
 
         self.loc = None
         self.neq = 0  # number of unknowns
@@ -127,6 +137,12 @@ class thermal(mupif.Model.Model):
         self.b = None
         self.bp = None
 
+        self.meshParams = None
+        self.connectivity = None
+        self.connectivityMesh = None
+        self.coordinates = None
+        self.coordinatesMesh = None
+
     def initialize(self, file='', workdir='', metaData={}, validateMetaData=False, **kwargs):
         super().initialize(file, workdir, metaData, validateMetaData, **kwargs)
 
@@ -180,8 +196,29 @@ class thermal(mupif.Model.Model):
                 self.morphologyType = 'Inclusion'
                 self.scaleInclusion = float(rec[1])
 
+    def generateMesh(self):
+        # the mesh is regenerated only when its geometry changes, so that the cached connectivity stays valid
+        params = (self.xl, self.yl, self.nx, self.ny, self.tria)
+        if self.mesh is None or self.meshParams != params:
+            self.mesh = meshgen.meshgen((0., 0.), (self.xl, self.yl), self.nx, self.ny, self.tria)
+            self.meshParams = params
+        return self.mesh
+
+    def getConnectivity(self):
+        # connectivity array (vertex indices of each cell) computed once per mesh instance
+        if self.connectivityMesh is not self.mesh:
+            self.connectivity = meshgen.connectivity(self.nx, self.ny, self.tria)
+            self.connectivityMesh = self.mesh
+        return self.connectivity
+
+    def getCoordinates(self):
+        # vertex coordinates array computed once per mesh instance
+        if self.coordinatesMesh is not self.mesh:
+            self.coordinates = meshgen.coordinates((0., 0.), (self.xl, self.yl), self.nx, self.ny)
+            self.coordinatesMesh = self.mesh
+        return self.coordinates
+
     def prepareTask(self):
-        self.mesh = mupif.Mesh.UnstructuredMesh()
         # generate a simple mesh here, either triangles or rectangles
         # self.xl = 0.5 # domain (0..xl)(0..yl)
         # self.yl = 0.3
@@ -189,7 +226,7 @@ class thermal(mupif.Model.Model):
         # self.ny = 10 # number of elements in y direction
         # self.dx = self.xl / self.nx
         # self.dy = self.yl / self.ny
-        self.mesh = meshgen.meshgen((0., 0.), (self.xl, self.yl), self.nx, self.ny, self.tria)
+        self.generateMesh()
 
         #
         # Model edges
@@ -201,83 +238,50 @@ class thermal(mupif.Model.Model):
         #
 
         # self.dirichletModelEdges=(3,4,1)#
-        self.dirichletBCs = {}  # key is node number, value is prescribed temperature
+        # Dirichlet b.c. as mask of prescribed vertices and prescribed temperatures of all vertices
+        numVertices = self.mesh.getNumberOfVertices()
+        self.dirichletMask = np.zeros(numVertices, dtype=bool)
+        self.dirichletValues = np.zeros(numVertices)
         for (ide, value) in self.dirichletModelEdges:
             # print ("Dirichlet", ide)
-            if ide == 1:
-                for i in range(self.nx + 1):
-                    self.dirichletBCs[i * (self.ny + 1)] = value
-            elif ide == 2:
-                for i in range(self.ny + 1):
-                    self.dirichletBCs[(self.ny + 1) * self.nx + i] = value
-            elif ide == 3:
-                for i in range(self.nx + 1):
-                    self.dirichletBCs[self.ny + (self.ny + 1) * i] = value
-            elif ide == 4:
-                for i in range(self.ny + 1):
-                    self.dirichletBCs[i] = value
+            nodes = meshgen.edgeVertices(self.nx, self.ny, ide)
+            self.dirichletMask[nodes] = True
+            self.dirichletValues[nodes] = value
 
         # self.convectionModelEdges=(2,)
-        self.convectionBC = []
+        # convection b.c. as arrays of boundary segments (vertex pairs), their lengths, h and ambient temperatures
+        c = self.getConnectivity()
+        coords = self.getCoordinates()
+        nodes = [np.zeros((0, 2), dtype=np.int32)]
+        lengths = [np.zeros(0)]
+        hs = [np.zeros(0)]
+        values = [np.zeros(0)]
         for (ice, value, h) in self.convectionModelEdges:
             # print ("Convection", ice)
-            if ice == 1:
-                for i in range(self.nx):
-                    if self.tria:
-                        self.convectionBC.append((2 * self.ny * i, 0, h, value))
-                    else:
-                        self.convectionBC.append((self.ny * i, 0, h, value))
-            elif ice == 2:
-                for i in range(self.ny):
-                    if self.tria:
-                        self.convectionBC.append(((self.nx - 1) * 2 * self.ny + 2 * i, 1, h, value))
-                    else:
-                        self.convectionBC.append(((self.nx - 1) * self.ny + i, 1, h, value))
-            elif ice == 3:
-                for i in range(self.nx):
-                    if self.tria:
-                        self.convectionBC.append((2 * self.ny * (i + 1) - 1, 1, h, value))
-                    else:
-                        self.convectionBC.append((self.ny * (i + 1) - 1, 2, h, value))
-            elif ice == 4:
-                for i in range(self.ny):
-                    if self.tria:
-                        self.convectionBC.append((2 * i + 1, 2, h, value))
-                    else:
-                        self.convectionBC.append((i, 3, h, value))
-
-        self.loc = np.zeros(self.mesh.getNumberOfVertices(), dtype=np.int32)
-        self.neq = 0  # number of unknowns
-        self.pneq = 0  # number of prescribed equations (Dirichlet b.c.)
-        # print (self.mesh.getNumberOfVertices())
-        for i in range(self.mesh.getNumberOfVertices()):
-            # print(i)
-            if i in self.dirichletBCs:
-                self.pneq += 1
-            else:
-                self.neq += 1
-        # print ("Neq", self.neq, "Pneq", self.pneq)
-        # print(self.loc)
-        ineq = 0  # unknowns numbering starts from 0..neq-1
-        ipneq = self.neq  # prescribed unknowns numbering starts neq..neq+pneq-1
-
-        for i in range(self.mesh.getNumberOfVertices()):
-            if i in self.dirichletBCs:
-                self.loc[i] = ipneq
-                ipneq += 1
-            else:
-                self.loc[i] = ineq
-                ineq += 1
+            cells, side = meshgen.edgeCells(self.nx, self.ny, ice, self.tria)
+            edge_nodes, edge_lengths = meshgen.edgeSegments(c, coords, cells, side)
+            nodes.append(edge_nodes)
+            lengths.append(edge_lengths)
+            hs.append(np.full(len(cells), h))
+            values.append(np.full(len(cells), value))
+        self.convectionNodes = np.concatenate(nodes)
+        self.convectionLengths = np.concatenate(lengths)
+        self.convectionH = np.concatenate(hs)
+        self.convectionTe = np.concatenate(values)
+
+        # unknowns numbering starts from 0..neq-1, prescribed unknowns numbering starts neq..neq+pneq-1
+        free = ~self.dirichletMask
+        self.neq = int(np.count_nonzero(free))  # number of unknowns
+        self.pneq = numVertices - self.neq  # number of prescribed equations (Dirichlet b.c.)
+        self.loc = np.where(free, np.cumsum(free) - 1, self.neq + np.cumsum(self.dirichletMask) - 1).astype(np.int32)
         # print (self.loc)
 
     def getField(self, fieldID, time, objectID=0):
         if fieldID == mupif.FieldID.FID_Temperature:
-            values = []
-            for i in range(self.mesh.getNumberOfVertices()):
-                if time.getValue() == 0.0:  # put zeros everywhere
-                    values.append((0.,))
-                else:
-                    values.append((self.T[self.loc[i]],))
+            if time.getValue() == 0.0:  # put zeros everywhere
+                values = np.zeros((self.mesh.getNumberOfVertices(), 1))
+            else:
+                values = self.T[self.loc].reshape(-1, 1)
             return mupif.Field.Field(
                 self.mesh, mupif.FieldID.FID_Temperature,
                 mupif.ValueType.Scalar,
@@ -286,12 +290,9 @@ class thermal(mupif.Model.Model):
                 values
             )
         elif fieldID == mupif.FieldID.FID_Material_number:
-            values = []
-            for e in self.mesh.cells():
-                if self.isInclusion(e) and self.morphologyType == 'Inclusion':
-                    values.append((1,))
-                else:
-                    values.append((0,))
+            values = np.zeros((self.mesh.getNumberOfCells(), 1), dtype=np.int32)
+            if self.morphologyType == 'Inclusion':
+                values[self.getInclusionMask(), 0] = 1
             # print (values)
             return mupif.Field.Field(
                 self.mesh,
@@ -321,6 +322,14 @@ class thermal(mupif.Model.Model):
             # print (xCell,yCell)
         return False
 
+    def getInclusionMask(self):
+        # vectorized isInclusion, returns boolean array with True for cells whose vertex center is in the inclusion
+        centers = self.getCoordinates()[self.getConnectivity()].mean(axis=1)
+        radius = min(self.xl, self.yl) * self.scaleInclusion
+        dx = centers[:, 0] - self.xl / 2.  # distance from domain center
+        dy = centers[:, 1] - self.yl / 2.
+        return np.sqrt(dx * dx + dy * dy) < radius
+
     def solveStep(self, tstep, stageID=0, runInBackground=False):
         self.prepareTask()
         mesh = self.mesh
@@ -328,7 +337,7 @@ class thermal(mupif.Model.Model):
         self.integral = 0.0
 
         # numNodes = mesh.getNumberOfVertices()
-        numElements = mesh.getNumberOfCells()
+        # numElements = mesh.getNumberOfCells()
         ndofs = 4
 
         # print numNodes
@@ -340,10 +349,7 @@ class thermal(mupif.Model.Model):
         log.info("Number of equations: %d" % self.neq)
 
         # connectivity
-        c = np.zeros((numElements, 4), dtype=np.int32)
-        for e in range(0, numElements):
-            for i in range(0, 4):
-                c[e, i] = self.mesh.getVertex(mesh.getCell(e).vertices[i]).label
+        c = self.getConnectivity()
         # print "connectivity :",c
 
         # Global matrix and global vector
@@ -356,10 +362,7 @@ class thermal(mupif.Model.Model):
         self.T = np.zeros(self.neq + self.pneq)  # vector of temperatures
 
         # initialize prescribed Temperatures in current solution vector (T):
-        for i in range(self.mesh.getNumberOfVertices()):
-            if i in self.dirichletBCs:
-                ii = self.loc[i]
-                self.T[ii] = self.dirichletBCs[i]  # assign temperature
+        self.T[self.loc[self.dirichletMask]] = self.dirichletValues[self.dirichletMask]
 
         log.info("Assembling ...")
         for e in mesh.cells():
@@ -385,25 +388,9 @@ class thermal(mupif.Model.Model):
         # print (b)
 
         # add boundary terms
-        # print ('Convection BC', self.convectionBC)
-        for i in self.convectionBC:
-            # print "Processing bc:", i
-            elem = mesh.getCell(i[0])
-            side = i[1]
-            h = i[2]
-            Te = i[3]
+        # print ('Convection BC', self.convectionNodes)
+        for (n1, n2), h, Te, length in zip(self.convectionNodes, self.convectionH, self.convectionTe, self.convectionLengths):
             # print ("h:%f Te:%f" % (h, Te))
-
-            n1 = elem.getVertices()[side]
-            # print n1
-            if side == 3:
-                n2 = elem.getVertices()[0]
-            else:
-                n2 = elem.getVertices()[side + 1]
-
-            length = math.sqrt((n2.coords[0] - n1.coords[0]) * (n2.coords[0] - n1.coords[0]) +
-                               (n2.coords[1] - n1.coords[1]) * (n2.coords[1] - n1.coords[1]))
-
             # print h, Te, length
 
             # boundary_lhs=h*(np.dot(N.T,N))
@@ -425,7 +412,7 @@ class thermal(mupif.Model.Model):
             boundary_rhs[1] = h * (1. / 2.) * length * Te
 
             # #Assemble
-            loci = [n1.number, n2.number]
+            loci = [n1, n2]
             # print loci
             for i_i in range(2):  # loop nb of dofs
                 ii = self.loc[loci[i_i]]
@@ -564,15 +551,15 @@ class thermal(mupif.Model.Model):
     def getProperty(self, propID, time, objectID=0):
         if propID == mupif.PropertyID.PID_effective_conductivity:
             # average reactions from solution - use nodes on edge 4 (coordinate x==0.)
-            sumQ = 0.
-            for i in range(self.mesh.getNumberOfVertices()):
-                coord = (self.mesh.getVertex(i).getCoordinates())
-                if coord[0] < 1.e-6:
-                    ipneq = self.loc[i]
-                    if ipneq >= self.neq:
-                        sumQ -= self.r[ipneq - self.neq]
+            ipneq = self.loc[self.getCoordinates()[:, 0] < 1.e-6]
+            sumQ = -np.sum(self.r[ipneq[ipneq >= self.neq] - self.neq])
+            # the temperatures of the first and the last vertex have to be prescribed
+            corners = [0, (self.ny + 1) * (self.nx + 1) - 1]
+            if not np.all(self.dirichletMask[corners]):
+                raise mupif.APIError.APIError('Dirichlet b.c. is not prescribed at vertices %s' %
+                                              [i for i in corners if not self.dirichletMask[i]])
             eff_conductivity = sumQ / self.yl * self.xl / (
-                        self.dirichletBCs[(self.ny + 1) * (self.nx + 1) - 1] - self.dirichletBCs[0])
+                        self.dirichletValues[corners[1]] - self.dirichletValues[corners[0]])
             return mupif.Property.ConstantProperty(
                 eff_conductivity,
                 mupif.PropertyID.PID_effective_conductivity,
@@ -778,7 +765,7 @@ class thermal_nonstat(thermal):
             return
 
         # numNodes = mesh.getNumberOfVertices()
-        numElements = mesh.getNumberOfCells()
+        # numElements = mesh.getNumberOfCells()
 
         ndofs = 3 if self.tria else 4
 
@@ -790,12 +777,7 @@ class thermal_nonstat(thermal):
         log.info(self.getApplicationSignature())
         log.info("Number of equations: %d" % self.neq)
         # connectivity
-        c = np.zeros((numElements, ndofs), dtype=np.int32)
-        c.fill(-1)
-        for e in range(0, numElements):
-            numVert = self.mesh.getCell(e).getNumberOfVertices()
-            for i in range(0, numVert):
-                c[e, i] = self.mesh.getVertex(mesh.getCell(e).vertices[i]).label
+        c = self.getConnectivity()
         # print ('connectivity :',c)
 
         if self.init:  # do only once
@@ -834,23 +816,10 @@ class thermal_nonstat(thermal):
                         self.P[ii, jj] += P_e[i, j]
 
             # add boundary terms
-            # print ('convection BC', self.convectionBC)
+            # print ('convection BC', self.convectionNodes)
             # exit(0)
-            for i in self.convectionBC:
-                # print "Processing bc:", i
-                elem = mesh.getCell(i[0])
-                side = i[1]
-                h = i[2]
-                # Te = i[3]
-                # print ("h:%f Te:%f" % (h, Te))
-
-                n1 = elem.getVertices()[side]
-                n2 = elem.getVertices()[0 if side + 1 == elem.getNumberOfVertices() else side + 1]
-
-                length = math.sqrt((n2.coords[0] - n1.coords[0]) * (n2.coords[0] - n1.coords[0]) +
-                                   (n2.coords[1] - n1.coords[1]) * (n2.coords[1] - n1.coords[1]))
-
-                # print (h, Te, length)
+            for (n1, n2), h, length in zip(self.convectionNodes, self.convectionH, self.convectionLengths):
+                # print (h, length)
 
                 # boundary_lhs=h*(np.dot(N.T,N))
                 boundary_lhs = np.zeros((2, 2))
@@ -866,7 +835,7 @@ class thermal_nonstat(thermal):
                     boundary_lhs[1, 1] = h * (1. / 3.) * length
 
                 # Assemble
-                loci = [n1.number, n2.number]
+                loci = [n1, n2]
                 # print loci
                 for i_i in range(2):  # loop nb of dofs
                     ii = self.loc[loci[i_i]]
@@ -892,29 +861,12 @@ class thermal_nonstat(thermal):
         self.bp = np.copy(self.b)
 
         # initialize prescribed Temperatures in current solution vector (T):
-        for i in range(self.mesh.getNumberOfVertices()):
-            if i in self.dirichletBCs:
-                ii = self.loc[i]
-                self.T[ii] = self.dirichletBCs[i]  # assign temperature
+        self.T[self.loc[self.dirichletMask]] = self.dirichletValues[self.dirichletMask]
 
         # evaluate RHS
         # add boundary terms due to prescribed fluxes
         self.b = np.zeros(self.neq)
-        for i in self.convectionBC:
-            # print "Processing bc:", i
-            elem = mesh.getCell(i[0])
-            side = i[1]
-            h = i[2]
-            Te = i[3]
-            # print ("h:%f Te:%f" % (h, Te))
-
-            n1 = elem.getVertices()[side]
-            # print n1
-            n2 = elem.getVertices()[0 if side + 1 == elem.getNumberOfVertices() else side + 1]
-
-            length = math.sqrt((n2.coords[0] - n1.coords[0]) * (n2.coords[0] - n1.coords[0]) +
-                               (n2.coords[1] - n1.coords[1]) * (n2.coords[1] - n1.coords[1]))
-
+        for (n1, n2), h, Te, length in zip(self.convectionNodes, self.convectionH, self.convectionTe, self.convectionLengths):
             # print h, Te, length
             # boundary_rhs=h*Te*N.T
             boundary_rhs = np.zeros((2, 1))
@@ -922,7 +874,7 @@ class thermal_nonstat(thermal):
             boundary_rhs[1] = h * (1. / 2.) * length * Te
 
             # #Assemble
-            loci = [n1.number, n2.number]
+            loci = [n1, n2]
             # print loci
             for i_i in range(2):  # loop nb of dofs
                 ii = self.loc[loci[i_i]]
@@ -1023,14 +975,28 @@ class mechanical(mupif.Model.Model):
         self.ny = None
 
         self.mesh = None
-        self.dirichletBCs = None
-        self.loadBC = None
+        self.meshParams = None
+        self.connectivity = None
+        self.connectivityMesh = None
+        self.coordinates = None
+        self.coordinatesMesh = None
+        self.dirichletMask = None
+        self.dirichletValues = None
+        self.loadNodes = None
+        self.loadLengths = None
+        self.loadF = None
         self.loc = None
         self.neq = 0
         self.volume = 0.0
         self.integral = 0.0
         self.T = None
 
+        self.batchedAssembly = scipy is not None  # the batched assembly builds a scipy sparse matrix
+        self.elementGeometries = {}  # integration point data of elements, key is element geometry
+        self.elementGeometriesMesh = None
+        self.temperatureMapping = None
+        self.temperatureMappingMeshes = None
+
     def initialize(self, file='', workdir='', metaData={}, validateMetaData=False, **kwargs):
         super().initialize(file, workdir, metaData, validateMetaData, **kwargs)
 
@@ -1091,6 +1057,28 @@ class mechanical(mupif.Model.Model):
             log.exception(e)
             exit(1)
 
+    def generateMesh(self):
+        # the mesh is regenerated only when its geometry changes, so that the cached connectivity stays valid
+        params = (self.xl, self.yl, self.nx, self.ny)
+        if self.mesh is None or self.meshParams != params:
+            self.mesh = meshgen.meshgen((0., 0.), (self.xl, self.yl), self.nx, self.ny)
+            self.meshParams = params
+        return self.mesh
+
+    def getConnectivity(self):
+        # connectivity array (vertex indices of each cell) computed once per mesh instance
+        if self.connectivityMesh is not self.mesh:
+            self.connectivity = meshgen.connectivity(self.nx, self.ny)
+            self.connectivityMesh = self.mesh
+        return self.connectivity
+
+    def getCoordinates(self):
+        # vertex coordinates array computed once per mesh instance
+        if self.coordinatesMesh is not self.mesh:
+            self.coordinates = meshgen.coordinates((0., 0.), (self.xl, self.yl), self.nx, self.ny)
+            self.coordinatesMesh = self.mesh
+        return self.coordinates
+
     def prepareTask(self):
 
         # self.mesh = mupif.Mesh.UnstructuredMesh()
@@ -1101,7 +1089,7 @@ class mechanical(mupif.Model.Model):
         # self.ny = 10 # number of elements in y direction
         # self.dx = self.xl / self.nx
         # self.dy = self.yl / self.ny
-        self.mesh = meshgen.meshgen((0., 0.), (self.xl, self.yl), self.nx, self.ny)
+        self.generateMesh()
 
         #
         # Model edges
@@ -1113,61 +1101,51 @@ class mechanical(mupif.Model.Model):
         #
 
         # self.dirichletModelEdges=(3,4,1)#
-        self.dirichletBCs = {}  # key is node number, value is prescribed temperature (zero supported only now)
+        # Dirichlet b.c. as mask of prescribed vertices and prescribed displacements (zero supported only now)
+        numVertices = self.mesh.getNumberOfVertices()
+        self.dirichletMask = np.zeros(numVertices, dtype=bool)
+        self.dirichletValues = np.zeros((numVertices, 3))
         for ide in self.dirichletModelEdges:
-            if ide == 1:
-                for i in range(self.nx + 1):
-                    self.dirichletBCs[i * (self.ny + 1)] = (0.0, 0.0, 0.0)
-            elif ide == 2:
-                for i in range(self.ny + 1):
-                    self.dirichletBCs[self.nx * (self.ny + 1) + i] = (0.0, 0.0, 0.0)
-            elif ide == 3:
-                for i in range(self.nx + 1):
-                    self.dirichletBCs[self.ny + i * (self.ny + 1)] = (0.0, 0.0, 0.0)
-            elif ide == 4:
-                for i in range(self.ny + 1):
-                    self.dirichletBCs[i] = (0.0, 0.0, 0.0)
+            self.dirichletMask[meshgen.edgeVertices(self.nx, self.ny, ide)] = True
 
         # convectionModelEdges=(2,)
-        self.loadBC = []
+        # load b.c. as arrays of boundary segments (vertex pairs), their lengths and load intensities
+        c = self.getConnectivity()
+        coords = self.getCoordinates()
+        nodes = [np.zeros((0, 2), dtype=np.int32)]
+        lengths = [np.zeros(0)]
+        forces = [np.zeros((0, 2))]
         for ice in self.loadModelEdges:
-            if ice == 1:
-                for i in range(self.nx):
-                    self.loadBC.append((self.ny * i, 0, self.fx[ice - 1], self.fy[ice - 1]))
-            elif ice == 2:
-                for i in range(self.ny):
-                    self.loadBC.append(((self.nx - 1) * self.ny + i, 1, self.fx[ice - 1], self.fy[ice - 1]))
-            elif ice == 3:
-                for i in range(self.nx):
-                    self.loadBC.append((self.ny * (i + 1) - 1, 2, self.fx[ice - 1], self.fy[ice - 1]))
-            elif ice == 4:
-                for i in range(self.ny):
-                    self.loadBC.append((i, 3, self.fx[ice - 1], self.fy[ice - 1]))
-
-        self.loc = np.zeros((self.mesh.getNumberOfVertices(), 2), dtype=np.int32)  # Du, Dv dofs per node
-        for i in self.dirichletBCs:
-            self.loc[i, 0] = -1
-            self.loc[i, 1] = -1
-        self.neq = 0
-        for i in range(self.mesh.getNumberOfVertices()):
-            for j in range(2):  # loop over nodal DOFs
-                if self.loc[i, j] >= 0:
-                    self.loc[i, j] = self.neq
-                    self.neq = self.neq + 1
+            cells, side = meshgen.edgeCells(self.nx, self.ny, ice)
+            edge_nodes, edge_lengths = meshgen.edgeSegments(c, coords, cells, side)
+            nodes.append(edge_nodes)
+            lengths.append(edge_lengths)
+            forces.append(np.tile((self.fx[ice - 1], self.fy[ice - 1]), (len(cells), 1)))
+        self.loadNodes = np.concatenate(nodes)
+        self.loadLengths = np.concatenate(lengths)
+        self.loadF = np.concatenate(forces)
+
+        # Du, Dv dofs per node, -1 for prescribed ones
+        free = ~self.dirichletMask
+        first = 2 * (np.cumsum(free) - 1)
+        self.loc = np.where(free[:, None], np.stack((first, first + 1), axis=1), -1).astype(np.int32)
+        self.neq = 2 * int(np.count_nonzero(free))
+
+        # integration point data of element geometries are computed again only for a new mesh
+        if self.elementGeometriesMesh is not self.mesh:
+            self.elementGeometries = {}
+            self.elementGeometriesMesh = self.mesh
 
         # print "loc:", self.loc
 
     def getField(self, fieldID, time, objectID=0):
         if fieldID == mupif.FieldID.FID_Displacement:
-            values = []
-            for i in range(self.mesh.getNumberOfVertices()):
-                if time.getValue() == 0.0:  # put zeros everywhere
-                    values.append((0., 0., 0.))
-                else:
-                    if i in self.dirichletBCs:
-                        values.append(self.dirichletBCs[i])
-                    else:
-                        values.append((self.T[self.loc[i, 0], 0], self.T[self.loc[i, 1], 0], 0.0))
+            values = np.zeros((self.mesh.getNumberOfVertices(), 3))  # put zeros everywhere
+            if time.getValue() != 0.0:
+                free = self.loc[:, 0] >= 0
+                values[free, 0] = self.T[self.loc[free, 0], 0]
+                values[free, 1] = self.T[self.loc[free, 1], 0]
+                values[self.dirichletMask] = self.dirichletValues[self.dirichletMask]
 
             return mupif.Field.Field(
                 self.mesh,
@@ -1187,15 +1165,61 @@ class mechanical(mupif.Model.Model):
     def solveStep(self, tstep, stageID=0, runInBackground=False):
         # self.readInput()
         self.prepareTask()
-        mesh = self.mesh
         if tstep and tstep.getNumber() == 0:  # assign mesh only for 0th time step
             return
-        rule = mupif.IntegrationRule.GaussIntegrationRule()
         self.volume = 0.0
         self.integral = 0.0
 
+        start = timeTime.time()
+        log.info(self.getApplicationSignature())
+        log.info("Number of equations: %d" % self.neq)
+
+        log.info("Assembling ...")
+        if self.batchedAssembly:
+            A, b = self.assembleBatched()
+        else:
+            A, b = self.assembleLoop()
+
+        # add boundary terms
+        for (n1, n2), (fx, fy), length in zip(self.loadNodes, self.loadF, self.loadLengths):
+            # fx, fy specified as intensity per edge length [N/m]
+            # print(fx,fy)
+
+            # boundary_rhs=h*Te*N.T
+            boundary_rhs = np.zeros((2, 2))
+            boundary_rhs[0, 0] = (1. / 2.) * length * fx
+            boundary_rhs[1, 0] = (1. / 2.) * length * fx
+            boundary_rhs[0, 1] = (1. / 2.) * length * fy
+            boundary_rhs[1, 1] = (1. / 2.) * length * fy
+
+            # #Assemble
+            loci = [n1, n2]
+            # print loci
+            for i_i in range(2):  # loop nb of nodes
+                for idx in range(2):  # loop over dofs
+                    ii = self.loc[loci[i_i], idx]
+                    if ii >= 0:
+                        b[ii] += boundary_rhs[i_i, idx]
+
+                        # print A
+        # print b
+
+        # solve linear system
+        log.info("Solving mechanical problem")
+        if scipy is not None and scipy.sparse.issparse(A):
+            self.T = scipy.sparse.linalg.spsolve(A, b[:, 0]).reshape(self.neq, 1)
+        else:
+            self.T = np.linalg.solve(A, b)
+        log.info("Done")
+        log.info("Time consumed %f s" % (timeTime.time() - start))
+
+    def assembleLoop(self):
+        # assembles global stiffness matrix and temperature load vector element by element
+        mesh = self.mesh
+        rule = mupif.IntegrationRule.GaussIntegrationRule()
+
         # numNodes = mesh.getNumberOfVertices()
-        numElements = mesh.getNumberOfCells()
+        # numElements = mesh.getNumberOfCells()
         elemNodes = 4
         nodalDofs = 2
         elemDofs = elemNodes * nodalDofs
@@ -1204,22 +1228,14 @@ class mechanical(mupif.Model.Model):
         # print numElements
         # print ndofs
 
-        start = timeTime.time()
-        log.info(self.getApplicationSignature())
-        log.info("Number of equations: %d" % self.neq)
-
         # connectivity
-        c = np.zeros((numElements, elemNodes), dtype=np.int32)
-        for e in range(0, numElements):
-            for i in range(0, elemNodes):
-                c[e, i] = self.mesh.getVertex(mesh.getCell(e).vertices[i]).label
+        c = self.getConnectivity()
         # print "connectivity :",c
 
         # Global matrix and global vector
         A = np.zeros((self.neq, self.neq))
         b = np.zeros((self.neq, 1))
 
-        log.info("Assembling ...")
         for e in mesh.cells():
             # element matrix and element vector
             A_e = np.zeros((elemDofs, elemDofs))
@@ -1267,7 +1283,7 @@ class mechanical(mupif.Model.Model):
                     et[0] = self.alpha * t.getValue()[0]
                     et[1] = self.alpha * t.getValue()[0]
                     et[2] = 0.0
-                    b_e = np.dot(Grad.T, np.dot(D, et)) * dv
+                    b_e += np.dot(Grad.T, np.dot(D, et)) * dv
             # print "A_e :",A_e
             # print "b_e :",b_e
 
@@ -1286,50 +1302,141 @@ class mechanical(mupif.Model.Model):
 
                         # print A
         # print b
-
-        # add boundary terms
-        for i in self.loadBC:
-            # print "Processing bc:", i
-            elem = mesh.getCell(i[0])
-            side = i[1]
-            fx = i[2]  # specified as intensity per edge length [N/m]
-            fy = i[3]  # specified as intensity per edge length [N/m]
-            # print(fx,fy)
-
-            n1 = elem.getVertices()[side]
-            # print n1
-            if side == 3:
-                n2 = elem.getVertices()[0]
-            else:
-                n2 = elem.getVertices()[side + 1]
-
-            length = math.sqrt((n2.coords[0] - n1.coords[0]) * (n2.coords[0] - n1.coords[0]) +
-                               (n2.coords[1] - n1.coords[1]) * (n2.coords[1] - n1.coords[1]))
-
-            # boundary_rhs=h*Te*N.T
-            boundary_rhs = np.zeros((2, 2))
-            boundary_rhs[0, 0] = (1. / 2.) * length * fx
-            boundary_rhs[1, 0] = (1. / 2.) * length * fx
-            boundary_rhs[0, 1] = (1. / 2.) * length * fy
-            boundary_rhs[1, 1] = (1. / 2.) * length * fy
-
-            # #Assemble
-            loci = [n1.number, n2.number]
-            # print loci
-            for i_i in range(2):  # loop nb of nodes
-                for idx in range(2):  # loop over dofs
-                    ii = self.loc[loci[i_i], idx]
-                    if ii >= 0:
-                        b[ii] += boundary_rhs[i_i, idx]
-
-                        # print A
-        # print b
-
-        # solve linear system
-        log.info("Solving mechanical problem")
-        self.T = np.linalg.solve(A, b)
-        log.info("Done")
-        log.info("Time consumed %f s" % (timeTime.time() - start))
+        return A, b
+
+    def assembleBatched(self):
+        # assembles global stiffness matrix and temperature load vector, element matrices are computed only once
+        # for each distinct element geometry and scattered into the global sparse matrix from (row, column, value)
+        # triplets, duplicate triplets are summed by the conversion into CSR format
+        c = self.getConnectivity()
+        coords = self.getCoordinates()
+        D = self.compute_D(self.E, self.nu)
+        numElements = len(c)
+        elemDofs = 2 * c.shape[1]
+        edofs = self.loc[c].reshape(numElements, elemDofs).astype(np.int64)  # code numbers of element dofs
+
+        # elements are grouped by their vertex coordinates relative to the first vertex
+        keys = np.round((coords[c, :2] - coords[c[:, :1], :2]).reshape(numElements, -1), 12)
+        geometries, first, groups = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        groups = groups.reshape(-1)
+
+        elements = []
+        for g in range(len(geometries)):
+            key = geometries[g].tobytes()
+            if key not in self.elementGeometries:
+                self.elementGeometries[key] = self.compute_elem_geometry(self.mesh.getCell(int(first[g])))
+            elements.append(np.flatnonzero(groups == g))
+
+        # temperatures at integration points of all elements, evaluated at once
+        t = None
+        if self.temperatureField:
+            Ns = np.array([self.elementGeometries[key.tobytes()][2] for key in geometries])[groups]
+            t = self.evaluateTemperature(np.einsum('epi,eik->epk', Ns, coords[c]), Ns)
+
+        rows = []
+        cols = []
+        vals = []
+        b = np.zeros(self.neq)
+        for g, elems in enumerate(elements):
+            Grads, dvs = self.elementGeometries[geometries[g].tobytes()][:2]
+            A_e = np.einsum('p,pji,jk,pkl->il', dvs, Grads, D, Grads)
+
+            dofs = edofs[elems]
+            ii = np.broadcast_to(dofs[:, :, None], (len(elems), elemDofs, elemDofs))
+            jj = np.broadcast_to(dofs[:, None, :], (len(elems), elemDofs, elemDofs))
+            mask = (ii >= 0) & (jj >= 0)
+            rows.append(ii[mask])
+            cols.append(jj[mask])
+            vals.append(np.broadcast_to(A_e, (len(elems), elemDofs, elemDofs))[mask])
+
+            # temperature load if temperature field registered
+            if t is not None:
+                # load vectors due to unit temperature at integration points
+                b_p = self.alpha * dvs[:, None] * np.einsum('pji,jk,k->pi', Grads, D, (1., 1., 0.))
+                b_e = np.dot(t[elems], b_p)
+                mask = dofs >= 0
+                b += np.bincount(dofs[mask], weights=b_e[mask], minlength=self.neq)
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        vals = np.concatenate(vals)
+        A = scipy.sparse.coo_matrix((vals, (rows, cols)), shape=(self.neq, self.neq)).tocsr()
+        return A, b.reshape(self.neq, 1)
+
+    def compute_elem_geometry(self, e):
+        # integration point data of given element: B matrices, integration weights dv and shape functions N
+        rule = mupif.IntegrationRule.GaussIntegrationRule()
+        ngp = rule.getRequiredNumberOfPoints(e.getGeometryType(), 2)
+        pnts = rule.getIntegrationPoints(e.getGeometryType(), ngp)
+        Grads = np.array([self.compute_B(e, p[0]) for p in pnts])
+        dvs = np.array([e.getTransformationJacobian(p[0]) * p[1] for p in pnts])
+        Ns = np.array([np.asarray(e._evalN(p[0])).ravel() for p in pnts])
+        return Grads, dvs, Ns
+
+    def evaluateTemperature(self, points, Ns):
+        # evaluates the registered temperature field at integration points of all elements at once
+        # points are their global coords with shape (numElements, ngp, 3), Ns their shape functions (numElements, ngp, 4)
+        field = self.temperatureField
+        if field.getFieldType() != mupif.Field.FieldType.FT_vertexBased:
+            return np.array([[field.evaluate(tuple(x)).getValue()[0] for x in elem_points] for elem_points in points])
+
+        vertices, weights = self.getTemperatureMapping(field.getMesh(), points, Ns)
+        values = np.asarray(field.value, dtype=float).reshape(len(field.value), -1)[:, 0]
+        t = np.sum(values[vertices] * weights, axis=-1)
+        # points not found in the temperature mesh are left to the field itself
+        for e, p in zip(*np.nonzero(vertices[:, :, 0] < 0)):
+            t[e, p] = field.evaluate(tuple(points[e, p])).getValue()[0]
+        return t
+
+    def getTemperatureMapping(self, fieldMesh, points, Ns):
+        # returns vertices of the temperature mesh and their interpolation weights for all integration points,
+        # computed once for a pair of temperature and mechanical mesh instances
+        if self.temperatureMappingMeshes is not None and self.temperatureMappingMeshes[0] is fieldMesh and \
+                self.temperatureMappingMeshes[1] is self.mesh:
+            return self.temperatureMapping
+
+        c = self.getConnectivity()
+        if self.sharesDiscretization(fieldMesh):
+            # integration points lie in the same cell of the temperature mesh, N are the interpolation weights
+            vertices = np.broadcast_to(c[:, None, :], Ns.shape)
+            weights = Ns
+        else:
+            # point-to-cell index, weights are obtained by interpolating unit vertex values
+            numVert = max(cell.getNumberOfVertices() for cell in fieldMesh.cells())
+            vertices = np.full(points.shape[:2] + (numVert,), -1, dtype=np.int64)
+            weights = np.zeros(points.shape[:2] + (numVert,))
+            localizer = fieldMesh.giveCellLocalizer()
+            eps = 1.e-6
+            for e in range(points.shape[0]):
+                for p in range(points.shape[1]):
+                    x = tuple(points[e, p])
+                    bbox = mupif.BBox.BBox([xi - eps for xi in x], [xi + eps for xi in x])
+                    for cell in localizer.giveItemsInBBox(bbox):
+                        if cell.containsPoint(x):
+                            cell_vertices = [v.number for v in cell.getVertices()]
+                            unit_values = np.eye(len(cell_vertices)).tolist()
+                            vertices[e, p, :len(cell_vertices)] = cell_vertices
+                            weights[e, p, :len(cell_vertices)] = cell.interpolate(x, unit_values)
+                            # padded entries point to vertex 0 with zero weight
+                            vertices[e, p, len(cell_vertices):] = 0
+                            break
+
+        self.temperatureMapping = (vertices, weights)
+        self.temperatureMappingMeshes = (fieldMesh, self.mesh)
+        return self.temperatureMapping
+
+    def sharesDiscretization(self, fieldMesh):
+        # True if given mesh has the same vertices and cells as the mesh of this model
+        if fieldMesh is self.mesh:
+            return True
+        if fieldMesh.getNumberOfVertices() != self.mesh.getNumberOfVertices() or \
+                fieldMesh.getNumberOfCells() != self.mesh.getNumberOfCells():
+            return False
+        coords = np.array([fieldMesh.getVertex(i).getCoordinates() for i in range(fieldMesh.getNumberOfVertices())])
+        if not np.allclose(coords, self.getCoordinates()):
+            return False
+        cells = [fieldMesh.getCell(i).vertices for i in range(fieldMesh.getNumberOfCells())]
+        return all(len(vertices) == 4 for vertices in cells) and np.array_equal(cells, self.getConnectivity())
 
     def compute_B(self, elem, lc):
         vertices = elem.getVertices()
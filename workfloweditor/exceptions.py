@@ -19,3 +19,7 @@ class KnobConnectionError(QtNodesError):
 
 class DuplicateKnobNameError(QtNodesError):
     """A Node's Knobs must have unique names."""
+
+
+class OperationCancelledError(QtNodesError):
+    """The background operation was cancelled by the user."""
@@ -3,6 +3,7 @@
 import json
 from PyQt5 import QtGui
 from PyQt5 import QtCore
+from . import instrumentation
 
 
 def readFileContent(filePath):
@@ -21,6 +22,31 @@ def fromJson(jsonString):
     return json.loads(jsonString, encoding="utf-8")
 
 
+MODIFIER_OF_KEY = {
+    QtCore.Qt.Key_Shift: QtCore.Qt.ShiftModifier,
+    QtCore.Qt.Key_Control: QtCore.Qt.ControlModifier,
+    QtCore.Qt.Key_Alt: QtCore.Qt.AltModifier,
+    QtCore.Qt.Key_Meta: QtCore.Qt.MetaModifier,
+}
+
+
+def getModifiersAfterKeyEvent(event):
+    """Return the keyboard modifiers held after given key press or release.
+
+    The modifiers of the event of a modifier key itself differ between platforms, so the modifier of the pressed key
+    is added and the one of the released key removed.
+    """
+    modifiers = event.modifiers()
+    modifier = MODIFIER_OF_KEY.get(event.key())
+    if modifier is not None:
+        if event.type() == QtCore.QEvent.KeyPress:
+            modifiers |= modifier
+        else:
+            modifiers &= ~modifier
+    return modifiers
+
+
+@instrumentation.timed('getTextSize')
 def getTextSize(text, painter=None):
     """Return a QSize based on given string.
 
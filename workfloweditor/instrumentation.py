@@ -0,0 +1,127 @@
+"""Optional instrumentation of the hot paths of the editor.
+
+The statistics are switched on by the environment variable WORKFLOWEDITOR_INSTRUMENTATION=1 set before the editor
+is started. The decorated functions then record their call counts and cumulative time, which are shown in
+the Diagnostics dock and can be dumped to JSON.
+
+The calls can be also recorded as spans of a trace in the Chrome trace event format, which can be opened in
+chrome://tracing or https://ui.perfetto.dev, the recording is started from the Diagnostics menu at any time. While
+neither is active, the decorated functions only check a flag.
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+import contextlib
+
+
+ENVIRONMENT_VARIABLE = 'WORKFLOWEDITOR_INSTRUMENTATION'
+
+enabled = os.environ.get(ENVIRONMENT_VARIABLE, '') not in ('', '0')
+
+MAX_TRACE_EVENTS = 2000000
+
+_statistics = {}
+_trace_events = None
+# whether the decorated functions record their calls, switched on by the environment variable or a trace
+_active = enabled
+# the operations are recorded also from the worker threads
+_lock = threading.Lock()
+
+
+def record(name, start, end):
+    """Add one call of given operation from start to end given by time.perf_counter."""
+    with _lock:
+        entry = _statistics.get(name)
+        if entry is None:
+            _statistics[name] = [1, end - start]
+        else:
+            entry[0] += 1
+            entry[1] += end - start
+        if _trace_events is not None and len(_trace_events) < MAX_TRACE_EVENTS:
+            _trace_events.append({'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                                  'pid': os.getpid(), 'tid': threading.get_ident()})
+
+
+def timed(name):
+    """Return decorator recording the calls of the function as given operation."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def _measure(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter())
+
+
+def measure(name):
+    """Return context manager recording the enclosed code as one call of given operation."""
+    if not _active:
+        return contextlib.nullcontext()
+    return _measure(name)
+
+
+def getStatistics():
+    """
+    Return the call count and cumulative time in seconds of the recorded operations.
+
+    :rtype: dict
+    """
+    with _lock:
+        return dict((name, {'count': count, 'total': total}) for name, (count, total) in _statistics.items())
+
+
+def reset():
+    with _lock:
+        _statistics.clear()
+
+
+def dumpToFile(file_path):
+    with open(file_path, 'w') as f:
+        json.dump({'statistics': getStatistics()}, f, indent=2)
+
+
+def isTracing():
+    return _trace_events is not None
+
+
+def startTrace():
+    """Start recording of the spans of the decorated functions."""
+    global _trace_events, _active
+    with _lock:
+        _trace_events = []
+        _active = True
+
+
+def stopTrace(file_path=None):
+    """
+    Stop recording of the spans and save them into given file in the Chrome trace event format.
+
+    :return: number of the recorded spans
+    :rtype: int
+    """
+    global _trace_events, _active
+    with _lock:
+        events = _trace_events or []
+        _trace_events = None
+        _active = enabled
+    if file_path:
+        with open(file_path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
@@ -0,0 +1,152 @@
+"""Static extraction of the model metadata.
+
+The metadata of the model classes are read from the source code without importing it, so that the model
+constructors are not run in the editor. Supported are literal dictionaries assigned in the constructor, e.g.
+
+    metaData = {'Name': ..., 'Inputs': [...], 'Outputs': [...]}
+    self.metadata = {...}
+    self.metadata.update({...})
+    super().__init__({...})
+
+which may also refer to dictionaries assigned at the module level. The metadata of a class without such constructor
+are inherited from its base class defined in the same file. A class derived from a base class imported from another
+module may be a model as well, so it is reported as unresolved when its metadata are not found.
+"""
+
+import ast
+import builtins
+
+
+MODEL_BASE_NAMES = ('Model', 'Application')
+
+
+class UnresolvedMetadataError(Exception):
+    """The metadata cannot be determined without running the code."""
+
+
+def _getDottedName(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _getDottedName(node.value)
+        return "%s.%s" % (value, node.attr) if value is not None else None
+    return None
+
+
+def _evaluate(node, constants):
+    """Return value of the literal node, names are looked up in given module-level constants."""
+    if isinstance(node, ast.Name):
+        if node.id in constants:
+            return constants[node.id]
+        raise UnresolvedMetadataError("Name '%s' is not a module-level literal." % node.id)
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        raise UnresolvedMetadataError("Expression at line %d is not a literal." % node.lineno)
+
+
+def _evaluateDict(node, constants):
+    value = _evaluate(node, constants)
+    if not isinstance(value, dict):
+        raise UnresolvedMetadataError("Expression at line %d is not a dictionary." % node.lineno)
+    return dict(value)
+
+
+def _getModuleConstants(tree):
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except (ValueError, TypeError, SyntaxError):
+                pass
+    return constants
+
+
+def _getConstructorMetadata(class_node, constants):
+    """
+    Return metadata assigned in the constructor of the class and whether they replace the inherited ones.
+
+    :rtype: (dict or None, bool)
+    """
+    init = None
+    for node in class_node.body:
+        if isinstance(node, ast.FunctionDef) and node.name == '__init__':
+            init = node
+    if init is None:
+        return None, False
+
+    metadata = None
+    replaced = False
+    for node in sorted((n for n in ast.walk(init) if isinstance(n, (ast.Assign, ast.Call))),
+                       key=lambda n: (n.lineno, n.col_offset)):
+        if isinstance(node, ast.Assign):
+            names = [_getDottedName(target) for target in node.targets]
+            if any(name in ('metaData', 'metadata', 'self.metadata') for name in names):
+                metadata = _evaluateDict(node.value, constants)
+                replaced = True
+        else:
+            function_name = _getDottedName(node.func) or ''
+            if function_name == 'self.metadata.update' and node.args:
+                if metadata is None:
+                    metadata = {}
+                metadata.update(_evaluateDict(node.args[0], constants))
+            elif isinstance(node.func, ast.Attribute) and node.func.attr == '__init__':
+                # super().__init__(metaData) or Base.__init__(self, metaData)
+                args = [arg for arg in node.args if not (isinstance(arg, ast.Name) and arg.id == 'self')]
+                args += [keyword.value for keyword in node.keywords if keyword.arg in ('metaData', 'metadata')]
+                if args and not (isinstance(args[0], ast.Name) and args[0].id in ('metaData', 'metadata')):
+                    metadata = _evaluateDict(args[0], constants)
+                    replaced = True
+    return metadata, replaced
+
+
+def extractMetadataFromSource(source):
+    """
+    Return metadata of the model classes defined in given source code and classnames of the models whose metadata
+    cannot be determined statically.
+
+    :rtype: (dict, list of str)
+    """
+    tree = ast.parse(source)
+    constants = _getModuleConstants(tree)
+    answer = {}
+    unresolved = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        base_names = [_getDottedName(base) or '' for base in node.bases]
+        local_bases = [name for name in base_names if name in answer]
+        unresolved_bases = [name for name in base_names if name in unresolved]
+        is_model = bool(local_bases or unresolved_bases) or any(
+            name.split('.')[-1] in MODEL_BASE_NAMES for name in base_names)
+        imported_bases = [name for name in base_names
+                          if name not in answer and name not in unresolved and not hasattr(builtins, name)]
+        try:
+            metadata, replaced = _getConstructorMetadata(node, constants)
+        except UnresolvedMetadataError:
+            if is_model or imported_bases:
+                unresolved.append(node.name)
+            continue
+        if not replaced and unresolved_bases:
+            unresolved.append(node.name)
+            continue
+        if not replaced and local_bases:
+            inherited = dict(answer[local_bases[0]])
+            inherited.update(metadata or {})
+            metadata = inherited
+        if metadata is not None and (is_model or 'Name' in metadata):
+            answer[node.name] = metadata
+        elif is_model or imported_bases:
+            unresolved.append(node.name)
+    return answer, unresolved
+
+
+def extractMetadataFromFile(file_path):
+    """
+    Return metadata of the model classes defined in given Python file without importing it.
+
+    :rtype: (dict, list of str)
+    """
+    with open(file_path, 'rb') as f:
+        return extractMetadataFromSource(f.read())
@@ -0,0 +1,492 @@
+"""Saving and loading of workflow files.
+
+The workflow is stored as JSON document {"elements": [...]}. With the orjson codec it is written with one element per
+line, which allows to write and read it element by element instead of handling the whole document as a single string.
+The standard library codec handles the whole document at once, which is faster for it.
+
+Alternatively, the workflow elements can be stored in a compact binary container. When the optional msgpack package is
+installed, they are stored as zlib compressed msgpack, which is encoded and decoded in C. Otherwise, repeated strings
+(classnames, types, dictionary keys) are stored once in a string table and UUIDs as 16 bytes by a pure Python codec,
+which is several times slower to decode than JSON. Workflows with integers out of the 64 bit range of msgpack are
+stored by the pure Python codec as well. The msgpack files are readable without the msgpack package, they are then
+decoded in pure Python.
+"""
+
+import os
+import json
+import uuid
+import zlib
+import struct
+import contextlib
+import collections
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+DOCUMENT_HEADER = b'{"elements": [\n'
+DOCUMENT_FOOTER = b']}\n'
+CHUNK_SIZE = 1000
+BINARY_MAGIC = b'MWFB'
+
+
+class JsonCodec:
+    """Standard library JSON codec.
+
+    Its per call overhead makes encoding and decoding element by element slower than a single call for the whole
+    document, so the workflow files are written and read by it at once.
+    """
+    name = 'json'
+    chunked = False
+
+    @staticmethod
+    def encode(obj):
+        """Return UTF-8 encoded JSON of given native Python datatypes."""
+        return json.dumps(obj).encode('utf-8')
+
+    @staticmethod
+    def decode(data):
+        """Return native Python datatypes from UTF-8 encoded JSON."""
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec based on the optional orjson package."""
+    name = 'orjson'
+    chunked = True
+
+    @staticmethod
+    def encode(obj):
+        """Return UTF-8 encoded JSON of given native Python datatypes."""
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # e.g. integers out of 64 bit range
+            return JsonCodec.encode(obj)
+
+    @staticmethod
+    def decode(data):
+        """Return native Python datatypes from UTF-8 encoded JSON."""
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. Infinity or NaN written by the json module
+            return JsonCodec.decode(data)
+
+
+CODECS = {JsonCodec.name: JsonCodec}
+if orjson is not None:
+    CODECS[OrjsonCodec.name] = OrjsonCodec
+
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _STR_REF, _UUID, _LIST, _DICT = range(10)
+_FLOAT_STRUCT = struct.Struct('<d')
+
+
+def _isUUID(val):
+    """Return True if given string is UUID in its canonical form."""
+    if len(val) != 36:
+        return False
+    try:
+        return str(uuid.UUID(val)) == val
+    except ValueError:
+        return False
+
+
+def _writeVarint(out, val):
+    while val > 0x7f:
+        out.append((val & 0x7f) | 0x80)
+        val >>= 7
+    out.append(val)
+
+
+def _readVarint(data, pos):
+    val = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        val |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return val, pos
+        shift += 7
+
+
+def _writeStr(out, val):
+    encoded = val.encode('utf-8')
+    _writeVarint(out, len(encoded))
+    out += encoded
+
+
+def _readStr(data, pos):
+    length, pos = _readVarint(data, pos)
+    return data[pos:pos + length].decode('utf-8'), pos + length
+
+
+class BinaryCodec:
+    """Compact binary codec of native Python datatypes with a string table and 16 byte UUIDs.
+
+    Tuples are decoded as lists, same as in JSON.
+    """
+    name = 'binary'
+    version = 1
+
+    @classmethod
+    def encode(cls, obj):
+        """Return binary representation of given native Python datatypes."""
+        counts = collections.Counter()
+        uuids = {}
+        cls._countStrings(obj, counts, uuids)
+        table = [val for val, count in counts.most_common() if count > 1]
+        index = {val: i for i, val in enumerate(table)}
+        out = bytearray()
+        _writeVarint(out, len(table))
+        for val in table:
+            _writeStr(out, val)
+        cls._encodeValue(out, obj, index, uuids)
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        """Return native Python datatypes from their binary representation."""
+        count, pos = _readVarint(data, 0)
+        table = []
+        for i in range(count):
+            val, pos = _readStr(data, pos)
+            table.append(val)
+        obj, pos = cls._decodeValue(data, pos, table)
+        return obj
+
+    @classmethod
+    def _countStrings(cls, obj, counts, uuids):
+        if isinstance(obj, str):
+            if _isUUID(obj):
+                uuids[obj] = uuid.UUID(obj).bytes
+            else:
+                counts[obj] += 1
+        elif isinstance(obj, dict):
+            for key, val in obj.items():
+                counts[key] += 1
+                cls._countStrings(val, counts, uuids)
+        elif isinstance(obj, (list, tuple)):
+            for val in obj:
+                cls._countStrings(val, counts, uuids)
+
+    @classmethod
+    def _encodeValue(cls, out, obj, index, uuids):
+        if obj is None:
+            out.append(_NONE)
+        elif obj is False:
+            out.append(_FALSE)
+        elif obj is True:
+            out.append(_TRUE)
+        elif isinstance(obj, int):
+            out.append(_INT)
+            _writeVarint(out, obj << 1 if obj >= 0 else (-obj << 1) - 1)  # zigzag encoding
+        elif isinstance(obj, float):
+            out.append(_FLOAT)
+            out += _FLOAT_STRUCT.pack(obj)
+        elif isinstance(obj, str):
+            if obj in index:
+                out.append(_STR_REF)
+                _writeVarint(out, index[obj])
+            elif obj in uuids:
+                out.append(_UUID)
+                out += uuids[obj]
+            else:
+                out.append(_STR)
+                _writeStr(out, obj)
+        elif isinstance(obj, dict):
+            out.append(_DICT)
+            _writeVarint(out, len(obj))
+            for key, val in obj.items():
+                if not isinstance(key, str):
+                    raise TypeError("Dictionary keys must be strings, got %r." % (key,))
+                cls._encodeValue(out, key, index, uuids)
+                cls._encodeValue(out, val, index, uuids)
+        elif isinstance(obj, (list, tuple)):
+            out.append(_LIST)
+            _writeVarint(out, len(obj))
+            for val in obj:
+                cls._encodeValue(out, val, index, uuids)
+        else:
+            raise TypeError("Object of type %s is not serializable." % obj.__class__.__name__)
+
+    @classmethod
+    def _decodeValue(cls, data, pos, table):
+        tag = data[pos]
+        pos += 1
+        if tag == _STR_REF:
+            i, pos = _readVarint(data, pos)
+            return table[i], pos
+        elif tag == _UUID:
+            return str(uuid.UUID(bytes=bytes(data[pos:pos + 16]))), pos + 16
+        elif tag == _DICT:
+            length, pos = _readVarint(data, pos)
+            answer = {}
+            for i in range(length):
+                key, pos = cls._decodeValue(data, pos, table)
+                answer[key], pos = cls._decodeValue(data, pos, table)
+            return answer, pos
+        elif tag == _LIST:
+            length, pos = _readVarint(data, pos)
+            answer = []
+            for i in range(length):
+                val, pos = cls._decodeValue(data, pos, table)
+                answer.append(val)
+            return answer, pos
+        elif tag == _STR:
+            return _readStr(data, pos)
+        elif tag == _INT:
+            val, pos = _readVarint(data, pos)
+            return (val >> 1) if not val & 1 else -((val + 1) >> 1), pos
+        elif tag == _FLOAT:
+            return _FLOAT_STRUCT.unpack_from(data, pos)[0], pos + _FLOAT_STRUCT.size
+        elif tag == _NONE:
+            return None, pos
+        elif tag == _FALSE:
+            return False, pos
+        elif tag == _TRUE:
+            return True, pos
+        raise ValueError("Unknown tag %d at position %d of the binary workflow data." % (tag, pos - 1))
+
+
+_MSGPACK_STRUCTS = {
+    0xca: struct.Struct('>f'), 0xcb: struct.Struct('>d'),
+    0xcc: struct.Struct('>B'), 0xcd: struct.Struct('>H'), 0xce: struct.Struct('>I'), 0xcf: struct.Struct('>Q'),
+    0xd0: struct.Struct('>b'), 0xd1: struct.Struct('>h'), 0xd2: struct.Struct('>i'), 0xd3: struct.Struct('>q'),
+}
+_MSGPACK_LENGTHS = {
+    0xc4: struct.Struct('>B'), 0xc5: struct.Struct('>H'), 0xc6: struct.Struct('>I'),
+    0xd9: struct.Struct('>B'), 0xda: struct.Struct('>H'), 0xdb: struct.Struct('>I'),
+    0xdc: struct.Struct('>H'), 0xdd: struct.Struct('>I'), 0xde: struct.Struct('>H'), 0xdf: struct.Struct('>I'),
+}
+
+
+def _unpackMsgpack(data, pos):
+    """Return value decoded from msgpack data at given position and the position after it.
+
+    Only the types written by msgpack.packb for native Python datatypes are supported, extension types are not.
+    """
+    tag = data[pos]
+    pos += 1
+    if tag <= 0x7f:
+        return tag, pos
+    elif tag >= 0xe0:
+        return tag - 0x100, pos
+    elif 0xa0 <= tag <= 0xbf or 0xd9 <= tag <= 0xdb:
+        if tag <= 0xbf:
+            length = tag & 0x1f
+        else:
+            length = _MSGPACK_LENGTHS[tag].unpack_from(data, pos)[0]
+            pos += _MSGPACK_LENGTHS[tag].size
+        return bytes(data[pos:pos + length]).decode('utf-8'), pos + length
+    elif 0x80 <= tag <= 0x8f or tag in (0xde, 0xdf):
+        if tag <= 0x8f:
+            length = tag & 0x0f
+        else:
+            length = _MSGPACK_LENGTHS[tag].unpack_from(data, pos)[0]
+            pos += _MSGPACK_LENGTHS[tag].size
+        answer = {}
+        for i in range(length):
+            key, pos = _unpackMsgpack(data, pos)
+            answer[key], pos = _unpackMsgpack(data, pos)
+        return answer, pos
+    elif 0x90 <= tag <= 0x9f or tag in (0xdc, 0xdd):
+        if tag <= 0x9f:
+            length = tag & 0x0f
+        else:
+            length = _MSGPACK_LENGTHS[tag].unpack_from(data, pos)[0]
+            pos += _MSGPACK_LENGTHS[tag].size
+        answer = []
+        for i in range(length):
+            val, pos = _unpackMsgpack(data, pos)
+            answer.append(val)
+        return answer, pos
+    elif tag in _MSGPACK_STRUCTS:
+        return _MSGPACK_STRUCTS[tag].unpack_from(data, pos)[0], pos + _MSGPACK_STRUCTS[tag].size
+    elif tag == 0xc0:
+        return None, pos
+    elif tag == 0xc2:
+        return False, pos
+    elif tag == 0xc3:
+        return True, pos
+    elif tag in (0xc4, 0xc5, 0xc6):
+        length = _MSGPACK_LENGTHS[tag].unpack_from(data, pos)[0]
+        pos += _MSGPACK_LENGTHS[tag].size
+        return bytes(data[pos:pos + length]), pos + length
+    raise ValueError("Unsupported msgpack type 0x%02x at position %d of the binary workflow data." % (tag, pos - 1))
+
+
+class MsgpackCodec:
+    """Binary codec based on the optional msgpack package, compressed with zlib.
+
+    The compression makes the repeated strings and UUIDs compact without a string table, which would have to be
+    resolved in Python. Tuples are decoded as lists, same as in JSON. Without the msgpack package, the data are
+    decoded in pure Python and cannot be encoded.
+    """
+    name = 'msgpack'
+    version = 2
+
+    @staticmethod
+    def encode(obj):
+        """Return binary representation of given native Python datatypes.
+
+        OverflowError is raised for integers out of the 64 bit range of msgpack.
+        """
+        return zlib.compress(msgpack.packb(obj), 1)
+
+    @staticmethod
+    def decode(data):
+        """Return native Python datatypes from their binary representation."""
+        data = zlib.decompress(data)
+        if msgpack is not None:
+            return msgpack.unpackb(data)
+        obj, pos = _unpackMsgpack(data, 0)
+        return obj
+
+
+BINARY_CODECS = {BinaryCodec.version: BinaryCodec}
+if msgpack is not None:
+    BINARY_CODECS[MsgpackCodec.version] = MsgpackCodec
+
+
+def getCodec(name=None):
+    """Return codec of given name, the fastest available one if no name is given."""
+    if name is None:
+        return CODECS.get(OrjsonCodec.name, JsonCodec)
+    return CODECS[name]
+
+
+def writeElements(f, elements, codec=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Write workflow elements into given binary file, encoding and writing them in chunks.
+
+    Codecs, which are not chunked, encode the whole document at once. The optional progress callback gets the written
+    fraction of the elements after each chunk.
+    """
+    codec = getCodec() if codec is None else codec
+    if not codec.chunked:
+        f.write(codec.encode({'elements': elements}))
+        if progress is not None:
+            progress(1.)
+        return
+    f.write(DOCUMENT_HEADER)
+    chunk = []
+    count = 0
+    for elem in elements:
+        if count:
+            chunk.append(b',\n')
+        chunk.append(codec.encode(elem))
+        count += 1
+        if not count % chunk_size:
+            f.write(b''.join(chunk))
+            chunk = []
+            if progress is not None:
+                progress(count / len(elements))
+    chunk.append(b'\n')
+    f.write(b''.join(chunk))
+    f.write(DOCUMENT_FOOTER)
+
+
+def iterElements(f, codec=None, progress=None, chunk_size=CHUNK_SIZE):
+    """Yield workflow elements from given binary file one by one.
+
+    Files written by writeElements with a chunked codec are decoded line by line, any other JSON document with the
+    "elements" list is decoded at once. The optional progress callback gets the read fraction of the file after each
+    chunk of elements.
+    """
+    codec = getCodec() if codec is None else codec
+    if codec.chunked and f.readline() == DOCUMENT_HEADER:
+        size = os.fstat(f.fileno()).st_size if progress is not None else 0
+        count = 0
+        for line in f:
+            line = line.rstrip()
+            if line == DOCUMENT_FOOTER.rstrip():
+                return
+            if line:
+                yield codec.decode(line.rstrip(b','))
+                count += 1
+                if progress is not None and not count % chunk_size:
+                    progress(f.tell() / size)
+        raise ValueError("Unexpected end of the workflow file.")
+    else:
+        f.seek(0)
+        elements = codec.decode(f.read())['elements']
+        if progress is not None:
+            progress(1.)
+        for elem in elements:
+            yield elem
+
+
+def _replaceFile(file_path, write):
+    """Write the file through given function into a temporary file, which replaces the original one when done.
+
+    The original file is kept untouched when the writing fails or is cancelled from the progress callback.
+    """
+    temporary_path = file_path + '.part'
+    try:
+        with open(temporary_path, 'wb') as f:
+            write(f)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, file_path)
+
+
+def saveWorkflowToFile(file_path, elements, codec=None, progress=None):
+    """Save workflow elements (output of BlockWorkflow.convertToJSON) into JSON file."""
+    _replaceFile(file_path, lambda f: writeElements(f, elements, codec, progress=progress))
+
+
+def getBinaryCodec():
+    """Return the fastest binary codec available for writing, files of all the versions are readable."""
+    return BINARY_CODECS[max(BINARY_CODECS)]
+
+
+def saveWorkflowToBinaryFile(file_path, elements, progress=None, codec=None):
+    """Save workflow elements (output of BlockWorkflow.convertToJSON) into binary file.
+
+    The file starts with BINARY_MAGIC followed by a byte with the version of the codec of the rest of the file.
+    Integers out of 64 bit range of the msgpack codec are encoded by the BinaryCodec instead.
+    """
+    codec = getBinaryCodec() if codec is None else codec
+
+    def _write(f):
+        try:
+            version, data = codec.version, codec.encode(elements)
+        except OverflowError:
+            version, data = BinaryCodec.version, BinaryCodec.encode(elements)
+        f.write(BINARY_MAGIC + bytes((version,)))
+        f.write(data)
+        if progress is not None:
+            progress(1.)
+    _replaceFile(file_path, _write)
+
+
+def loadWorkflowFromFile(file_path, codec=None, progress=None):
+    """Return list of workflow elements (input of BlockWorkflow.constructFromJSON) loaded from JSON or binary file.
+
+    The given codec is used for JSON files only, binary files are decoded by the codec of their version.
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(len(BINARY_MAGIC) + 1)
+        if header[:len(BINARY_MAGIC)] == BINARY_MAGIC and len(header) > len(BINARY_MAGIC):
+            version = header[-1]
+            # the msgpack files are decoded in pure Python without the msgpack package
+            codecs = {BinaryCodec.version: BinaryCodec, MsgpackCodec.version: MsgpackCodec}
+            if version not in codecs:
+                raise ValueError("Unknown version %d of the binary workflow file." % version)
+            elements = codecs[version].decode(f.read())
+            if progress is not None:
+                progress(1.)
+            return elements
+        f.seek(0)
+        return list(iterElements(f, codec, progress))
@@ -0,0 +1,134 @@
+"""Synthetic workflows for benchmarking and profiling of the editor.
+
+The workflows are built of the workflowgenerator blocks. Each level contains a constant property and given number of
+model blocks, all but the deepest level contain also a timeloop holding the next level. The input slots of the models
+are connected to randomly chosen outputs of the blocks created before with given probability.
+
+The models are instances of SyntheticModel, which is not registered as model API in the workflowgenerator, so the saved
+synthetic workflows cannot be loaded back. They are meant for benchmarks of saving and of the editor only.
+
+    python -m workfloweditor.synthetic --depth 2 --width 50 --slots 4 --density 0.5 -o synthetic.json
+    python -m workfloweditor.synthetic --width 100 --show
+"""
+
+import random
+import argparse
+import workflowgenerator
+
+
+SLOT_TYPE = 'mupif.Property'
+SLOT_TYPE_ID = 'mupif.PropertyID.PID_Temperature'
+
+
+class SyntheticModel:
+    """
+    Model API stub providing only the metadata, which are needed to construct BlockModel.
+
+    It is not registered as model API, so the workflows containing it cannot be constructed from their JSON.
+    """
+    def __init__(self, number_of_inputs=2, number_of_outputs=2):
+        self.metadata = {
+            'Name': 'Synthetic model',
+            'ID': 'Synthetic-1',
+            'Description': 'Synthetic model with %d inputs and %d outputs' % (number_of_inputs, number_of_outputs),
+            'Inputs': [{'Name': 'input', 'Type': SLOT_TYPE, 'Required': False, 'Type_ID': SLOT_TYPE_ID,
+                        'Obj_ID': [str(i) for i in range(number_of_inputs)]}],
+            'Outputs': [{'Name': 'output', 'Type': SLOT_TYPE, 'Required': False, 'Type_ID': SLOT_TYPE_ID,
+                         'Obj_ID': [str(i) for i in range(number_of_outputs)]}],
+            'Solver': {'Software': 'own', 'Language': 'Python', 'License': 'LGPL', 'Creator': 'synthetic',
+                       'Version_date': '1.0.0', 'Type': 'None', 'Documentation': 'None', 'Estim_time_step': 1,
+                       'Estim_comp_time': 0, 'Estim_execution_cost': 0, 'Estim_personnel_cost': 0,
+                       'Required_expertise': 'None', 'Accuracy': 'High', 'Sensitivity': 'Low',
+                       'Complexity': 'Low', 'Robustness': 'High'},
+            'Physics': {'Type': 'Other', 'Entity': 'Other'},
+        }
+
+    def getMetadata(self, key):
+        value = self.metadata
+        for item in key.split('.'):
+            value = value[item]
+        return value
+
+    def getAllMetadata(self):
+        return self.metadata
+
+    def hasMetadata(self, key):
+        try:
+            self.getMetadata(key)
+        except KeyError:
+            return False
+        return True
+
+
+def _getSlots(block, slot_class):
+    return [slot for slot in block.getDataSlots() if isinstance(slot, slot_class)]
+
+
+def generateWorkflow(depth=0, width=10, slots_per_block=2, link_density=0.5, seed=0):
+    """
+    Return synthetic workflow.
+
+    :param int depth: number of nested timeloops
+    :param int width: number of model blocks on each level
+    :param int slots_per_block: number of input and output slots of each model block
+    :param float link_density: probability of connection of each model input
+    :param seed: seed of the random generator, the same parameters give the same workflow
+    :rtype: workflowgenerator.BlockWorkflow.BlockWorkflow
+    """
+    generator = random.Random(seed)
+    workflow = workflowgenerator.BlockWorkflow.BlockWorkflow()
+    container = workflow
+    outputs = []
+    for level in range(depth + 1):
+        prop = workflowgenerator.BlockConstProperty.BlockConstProperty()
+        prop.setValue((float(level),))
+        prop.setPropertyID(SLOT_TYPE_ID)
+        prop.setValueType('mupif.ValueType.Scalar')
+        prop.setUnits('degC')
+        container.addBlock(prop)
+        outputs.append(prop.getDataSlotWithName('value'))
+
+        for i in range(width):
+            model = workflowgenerator.BlockModel.BlockModel(SyntheticModel(slots_per_block, slots_per_block))
+            model.constructFromModelMetaData()
+            container.addBlock(model)
+            for slot in _getSlots(model, workflowgenerator.DataSlot.InputDataSlot):
+                if outputs and generator.random() < link_density:
+                    generator.choice(outputs).connectTo(slot)
+            outputs.extend(_getSlots(model, workflowgenerator.DataSlot.OutputDataSlot))
+
+        if level < depth:
+            timeloop = workflowgenerator.BlockTimeloop.BlockTimeloop()
+            container.addBlock(timeloop)
+            container = timeloop
+
+    # results of the last level are the outputs of the workflow
+    for i, output in enumerate(outputs[-slots_per_block:] if slots_per_block > 0 else []):
+        slot = workflowgenerator.DataSlot.ExternalInputDataSlot('result_%d' % i, SLOT_TYPE)
+        workflow.addDataSlot(slot)
+        output.connectTo(slot)
+    return workflow
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic workflow.")
+    parser.add_argument('--depth', type=int, default=0, help="number of nested timeloops")
+    parser.add_argument('--width', type=int, default=10, help="number of model blocks on each level")
+    parser.add_argument('--slots', type=int, default=2, help="number of inputs and outputs of each model")
+    parser.add_argument('--density', type=float, default=0.5, help="probability of connection of each input")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="save the workflow into given file, which cannot be loaded back")
+    parser.add_argument('--show', action='store_true', help="open the workflow in the editor")
+    args = parser.parse_args()
+
+    workflow = generateWorkflow(args.depth, args.width, args.slots, args.density, args.seed)
+    if args.output:
+        from workfloweditor import serialization
+        serialization.saveWorkflowToFile(args.output, workflow.convertToJSON())
+    if args.show:
+        from workfloweditor import Application
+        application = Application.Application(workflow)
+        application.generateAll()
+        application.run()
+    if not args.output and not args.show:
+        workflow.printStructure()